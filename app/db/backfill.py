@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import json
+from .connection import get_db_connection
+from .models import AnalysisEmbedding, index_terms
+
+async def backfill_term_index(batch_size: int = 1000) -> int:
+    """Fill analysis_keywords/analysis_topics for rows saved before they existed.
+
+    Safe to re-run: existing entries are ignored. Returns the number of
+    analyses processed.
+    """
+    processed = 0
+    last_id = 0
+    while True:
+        async with get_db_connection() as conn:
+            cursor = await conn.execute("""
+                SELECT id, keywords, topics FROM analyses
+                WHERE id > ?
+                ORDER BY id
+                LIMIT ?
+            """, (last_id, batch_size))
+            rows = await cursor.fetchall()
+            if not rows:
+                break
+            await index_terms(conn, [
+                (row['id'],
+                 json.loads(row['keywords']) if row['keywords'] else [],
+                 json.loads(row['topics']) if row['topics'] else [])
+                for row in rows
+            ])
+        last_id = rows[-1]['id']
+        processed += len(rows)
+        print(f"Indexed {processed} analyses (up to id {last_id})")
+    return processed
+
+async def backfill_embeddings(batch_size: int = 256) -> int:
+    """Embed analyses that have no vector for the current embedding model.
+
+    Covers rows saved before /search/similar existed, rows whose embedding
+    failed at save time, and a switch of EMBEDDING_BACKEND. Returns the
+    number of analyses embedded.
+    """
+    from app.services import embedding_service
+
+    model = embedding_service.embedding_model()
+    processed = 0
+    last_id = 0
+    while True:
+        rows = await AnalysisEmbedding.missing(model, last_id, batch_size)
+        if not rows:
+            break
+        if not await embedding_service.index_analyses(rows):
+            print(f"Stopping: embedding failed at id {rows[0][0]}")
+            break
+        last_id = rows[-1][0]
+        processed += len(rows)
+        print(f"Embedded {processed} analyses (up to id {last_id})")
+    return processed
+
+def main():
+    """Main entry point for backfilling the keyword/topic index or embeddings."""
+    parser = argparse.ArgumentParser(description="Backfill the keyword/topic lookup tables.")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--embeddings", action="store_true",
+                        help="embed analyses missing from the similarity index instead")
+    args = parser.parse_args()
+    if args.embeddings:
+        total = asyncio.run(backfill_embeddings(args.batch_size))
+        print(f"Backfill completed: {total} analyses embedded")
+        return
+    total = asyncio.run(backfill_term_index(args.batch_size))
+    print(f"Backfill completed: {total} analyses indexed")
+
+if __name__ == "__main__":
+    main()
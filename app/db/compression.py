@@ -0,0 +1,22 @@
+import hashlib
+import zlib
+
+# zlib level 6 is within a few percent of level 9 at a fraction of the CPU.
+COMPRESSION_LEVEL = 6
+
+
+def content_hash(text: str) -> str:
+    """Key of a document body: sha256 of its exact UTF-8 bytes."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def compress_text(text: str) -> bytes:
+    return zlib.compress(text.encode("utf-8"), COMPRESSION_LEVEL)
+
+
+def decompress_text(body) -> str:
+    """Inverse of compress_text; None passes through."""
+    if body is None:
+        return None
+    return zlib.decompress(body).decode("utf-8")
+
@@ -1,13 +1,127 @@
+import asyncio
 import aiosqlite
 import os
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
 
 DB_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'knowledge.db')
 
+DB_READERS = int(os.getenv("DB_READERS", "4"))
+DB_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", str(256 * 1024 * 1024)))
+DB_CACHE_SIZE_KB = int(os.getenv("DB_CACHE_SIZE_KB", str(64 * 1024)))
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+
+
+class ConnectionPool:
+    """One writer connection plus a fixed set of reader connections.
+
+    SQLite allows a single writer at a time, so writes are serialized on the
+    writer connection instead of contending for the database lock. With WAL
+    enabled, readers never block on (or behind) the writer.
+    """
+
+    def __init__(self, path: str, readers: int = DB_READERS):
+        self.path = path
+        self.readers = readers
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._write_lock = asyncio.Lock()
+        self._idle_readers: "asyncio.Queue[aiosqlite.Connection]" = asyncio.Queue()
+        self._all_readers = []
+
+    async def open(self) -> None:
+        self._writer = await self._connect()
+        try:
+            await self._writer.execute_fetchall("PRAGMA journal_mode=WAL")
+            for _ in range(self.readers):
+                conn = await self._connect()
+                self._all_readers.append(conn)
+                await conn.execute("PRAGMA query_only=1")
+                self._idle_readers.put_nowait(conn)
+        except Exception:
+            await self.close()
+            raise
+
+    async def close(self) -> None:
+        for conn in self._all_readers:
+            await conn.close()
+        self._all_readers.clear()
+        if self._writer is not None:
+            await self._writer.close()
+            self._writer = None
+
+    @asynccontextmanager
+    async def writer(self) -> AsyncGenerator[aiosqlite.Connection, None]:
+        async with self._write_lock:
+            try:
+                yield self._writer
+                await self._writer.commit()
+            except Exception:
+                await self._writer.rollback()
+                raise
+
+    @asynccontextmanager
+    async def reader(self) -> AsyncGenerator[aiosqlite.Connection, None]:
+        if not self._all_readers:
+            async with self.writer() as conn:
+                yield conn
+            return
+        conn = await self._idle_readers.get()
+        try:
+            yield conn
+        finally:
+            self._idle_readers.put_nowait(conn)
+
+    async def _connect(self) -> aiosqlite.Connection:
+        conn = await aiosqlite.connect(self.path)
+        conn.row_factory = aiosqlite.Row
+        for pragma in (
+            f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}",
+            "PRAGMA synchronous=NORMAL",
+            f"PRAGMA mmap_size={DB_MMAP_SIZE}",
+            f"PRAGMA cache_size=-{DB_CACHE_SIZE_KB}",
+            "PRAGMA temp_store=MEMORY",
+        ):
+            # Fetch so result-returning pragmas do not leave a statement open.
+            await conn.execute_fetchall(pragma)
+        return conn
+
+
+_pool: Optional[ConnectionPool] = None
+
+
+async def open_pool(readers: int = DB_READERS) -> ConnectionPool:
+    """Open the process-wide connection pool (called from the app lifespan)."""
+    global _pool
+    if _pool is None:
+        pool = ConnectionPool(DB_PATH, readers)
+        await pool.open()
+        _pool = pool
+    return _pool
+
+
+def pool_is_open() -> bool:
+    return _pool is not None
+
+
+async def close_pool() -> None:
+    global _pool
+    if _pool is not None:
+        pool, _pool = _pool, None
+        await pool.close()
+
+
 @asynccontextmanager
-async def get_db_connection() -> AsyncGenerator[aiosqlite.Connection, None]:
-    """Async context manager for database connections."""
+async def get_db_connection(readonly: bool = False) -> AsyncGenerator[aiosqlite.Connection, None]:
+    """Async context manager for database connections.
+
+    Uses the pool when one is open; otherwise opens a short-lived connection.
+    Pass readonly=True for queries that do not write.
+    """
+    if _pool is not None:
+        async with (_pool.reader() if readonly else _pool.writer()) as conn:
+            yield conn
+        return
+
     async with aiosqlite.connect(DB_PATH) as conn:
         conn.row_factory = aiosqlite.Row
         try:
@@ -25,4 +139,4 @@ async def init_db():
             await conn.execute("SELECT 1")
         print(f"Database created at: {DB_PATH}")
     else:
-        print(f"Database already exists at: {DB_PATH}")
\ No newline at end of file
+        print(f"Database already exists at: {DB_PATH}")
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import sys
+from app.services.export_service import iter_ndjson, parse_since
+
+async def export_analyses(output, since=None, gzip=False):
+    """Write the analyses table to a binary file object as NDJSON."""
+    async for chunk in iter_ndjson(since=parse_since(since), gzip=gzip):
+        output.write(chunk)
+
+def main():
+    """Main entry point for exporting analyses."""
+    parser = argparse.ArgumentParser(description="Export analyses as NDJSON.")
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    parser.add_argument("--since", help="only rows with a greater id, or created at/after a timestamp")
+    parser.add_argument("--gzip", action="store_true", help="gzip-compress the output")
+    args = parser.parse_args()
+
+    if args.output:
+        with open(args.output, "wb") as output:
+            asyncio.run(export_analyses(output, args.since, args.gzip))
+    else:
+        asyncio.run(export_analyses(sys.stdout.buffer, args.since, args.gzip))
+
+if __name__ == "__main__":
+    main()
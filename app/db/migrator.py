@@ -1,12 +1,25 @@
+from .compression import decompress_text
 from .connection import get_db_connection
 
 async def run_migrations():
     """Run all database migrations."""
     async with get_db_connection() as conn:
+        # Analyzed texts, stored once per distinct body (zlib-compressed UTF-8).
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY,
+                content_hash TEXT NOT NULL UNIQUE,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL
+            )
+        """)
+        # input_text is only filled for rows saved before `documents` existed
+        # (python -m app.db.storage compact moves them); newer rows store ''.
         await conn.execute("""
             CREATE TABLE IF NOT EXISTS analyses (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
-                input_text TEXT NOT NULL,
+                input_text TEXT NOT NULL DEFAULT '',
+                document_id INTEGER REFERENCES documents(id),
                 summary TEXT,
                 title TEXT,
                 topics TEXT,
@@ -15,10 +28,231 @@ async def run_migrations():
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
+        cursor = await conn.execute("PRAGMA table_info(analyses)")
+        if "document_id" not in [row['name'] for row in await cursor.fetchall()]:
+            await conn.execute("ALTER TABLE analyses ADD COLUMN document_id INTEGER REFERENCES documents(id)")
+        await conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_analyses_sentiment_created
+            ON analyses (sentiment, created_at, id)
+        """)
+        # Lookup tables for keyword/topic search; the primary key doubles as
+        # the (term, created_at) index.
+        for table in ("analysis_keywords", "analysis_topics"):
+            await conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    term TEXT NOT NULL,
+                    created_at TIMESTAMP NOT NULL,
+                    analysis_id INTEGER NOT NULL REFERENCES analyses(id),
+                    PRIMARY KEY (term, created_at, analysis_id)
+                ) WITHOUT ROWID
+            """)
+        await _create_fts_index(conn)
+        await _create_stats_tables(conn)
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS analysis_cache (
+                cache_key TEXT PRIMARY KEY,
+                result TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        # One vector per analysis for /search/similar, stored as float32 bytes.
+        # `model` names the embedding, so switching models re-embeds.
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS analysis_embeddings (
+                analysis_id INTEGER PRIMARY KEY REFERENCES analyses(id),
+                model TEXT NOT NULL,
+                vector BLOB NOT NULL
+            )
+        """)
+        # Queue for POST /analyze?async=true. Times used for scheduling are
+        # unix epoch seconds so claims can compare them directly.
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL DEFAULT 'queued',
+                input_text TEXT NOT NULL,
+                backend TEXT,
+                result TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                available_at REAL NOT NULL,
+                lease_owner TEXT,
+                lease_expires_at REAL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        await conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_jobs_status_available
+            ON jobs (status, available_at)
+        """)
     print("Database migrations completed successfully")
 
+async def _create_fts_index(conn):
+    """Full-text index over the analyzed text and summary.
+
+    The index is contentless (content=''): it stores only the inverted
+    index, not another copy of the text; search snippets are built from
+    the decompressed document (see models.build_snippet). Rows with a
+    document are indexed by Analysis._insert_many, which has the plain
+    text at hand; rows with inline input_text (legacy rows, raw inserts)
+    are indexed by trigger. Removing a contentless entry needs the
+    original text, which SQL cannot decompress, so deleted or re-summarized
+    rows with a document keep a stale entry until the index is rebuilt;
+    searches join back to analyses and skip deleted rows.
+    """
+    cursor = await conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'analyses_fts'"
+    )
+    row = await cursor.fetchone()
+    if row is not None and "content=''" not in row['sql']:
+        # External-content or self-contained index from earlier versions.
+        for trigger in ("analyses_fts_insert", "analyses_fts_delete",
+                        "analyses_fts_update", "analyses_fts_update_summary"):
+            await conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        await conn.execute("DROP TABLE analyses_fts")
+        row = None
+    await conn.execute("DROP VIEW IF EXISTS analyses_content")
+    exists = row is not None
+
+    await conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS analyses_fts USING fts5(
+            input_text,
+            summary,
+            content='',
+            tokenize='porter unicode61'
+        )
+    """)
+    await conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS analyses_fts_insert
+        AFTER INSERT ON analyses WHEN new.document_id IS NULL BEGIN
+            INSERT INTO analyses_fts (rowid, input_text, summary)
+            VALUES (new.id, new.input_text, new.summary);
+        END
+    """)
+    await conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS analyses_fts_delete
+        AFTER DELETE ON analyses WHEN old.document_id IS NULL BEGIN
+            INSERT INTO analyses_fts (analyses_fts, rowid, input_text, summary)
+            VALUES ('delete', old.id, old.input_text, old.summary);
+        END
+    """)
+    # Moving inline text into a document (storage compact) leaves the
+    # indexed text as it is; only edits of inline rows reindex.
+    await conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS analyses_fts_update
+        AFTER UPDATE OF input_text, summary ON analyses
+        WHEN old.document_id IS NULL AND new.document_id IS NULL BEGIN
+            INSERT INTO analyses_fts (analyses_fts, rowid, input_text, summary)
+            VALUES ('delete', old.id, old.input_text, old.summary);
+            INSERT INTO analyses_fts (rowid, input_text, summary)
+            VALUES (new.id, new.input_text, new.summary);
+        END
+    """)
+    await conn.execute("DROP TRIGGER IF EXISTS analyses_fts_update_summary")
+
+    if not exists:
+        # Index rows that were stored before the FTS table existed.
+        await conn.execute("""
+            INSERT INTO analyses_fts (rowid, input_text, summary)
+            SELECT id, input_text, summary FROM analyses WHERE document_id IS NULL
+        """)
+        cursor = await conn.execute("""
+            SELECT a.id, d.body, a.summary FROM analyses a JOIN documents d ON d.id = a.document_id
+        """)
+        while True:
+            rows = await cursor.fetchmany(1000)
+            if not rows:
+                break
+            await conn.executemany(
+                "INSERT INTO analyses_fts (rowid, input_text, summary) VALUES (?, ?, ?)",
+                [(row['id'], decompress_text(row['body']), row['summary']) for row in rows],
+            )
+
+async def _create_stats_tables(conn):
+    """Summary tables behind GET /stats, maintained by triggers on insert and delete.
+
+    stats_hourly counts analyses per UTC hour and sentiment; stats_terms_daily
+    counts keyword/topic occurrences per UTC day, fed by the term index
+    tables so terms are normalized and counted once per analysis.
+    """
+    cursor = await conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'stats_hourly'"
+    )
+    exists = await cursor.fetchone() is not None
+
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS stats_hourly (
+            bucket TEXT NOT NULL,
+            sentiment TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (bucket, sentiment)
+        ) WITHOUT ROWID
+    """)
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS stats_terms_daily (
+            kind TEXT NOT NULL,
+            day TEXT NOT NULL,
+            term TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (kind, day, term)
+        ) WITHOUT ROWID
+    """)
+    await conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS analyses_stats_insert AFTER INSERT ON analyses BEGIN
+            INSERT INTO stats_hourly (bucket, sentiment, count)
+            VALUES (strftime('%Y-%m-%d %H:00:00', new.created_at), coalesce(new.sentiment, ''), 1)
+            ON CONFLICT (bucket, sentiment) DO UPDATE SET count = count + 1;
+        END
+    """)
+    await conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS analyses_stats_delete AFTER DELETE ON analyses BEGIN
+            UPDATE stats_hourly SET count = count - 1
+            WHERE bucket = strftime('%Y-%m-%d %H:00:00', old.created_at)
+              AND sentiment = coalesce(old.sentiment, '');
+        END
+    """)
+    for table, kind in (("analysis_keywords", "keyword"), ("analysis_topics", "topic")):
+        await conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_stats_insert AFTER INSERT ON {table} BEGIN
+                INSERT INTO stats_terms_daily (kind, day, term, count)
+                VALUES ('{kind}', date(new.created_at), new.term, 1)
+                ON CONFLICT (kind, day, term) DO UPDATE SET count = count + 1;
+            END
+        """)
+        await conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_stats_delete AFTER DELETE ON {table} BEGIN
+                UPDATE stats_terms_daily SET count = count - 1
+                WHERE kind = '{kind}' AND day = date(old.created_at) AND term = old.term;
+            END
+        """)
+
+    if not exists:
+        # Count rows that were stored before the summary tables existed.
+        await conn.execute("""
+            INSERT INTO stats_hourly (bucket, sentiment, count)
+            SELECT strftime('%Y-%m-%d %H:00:00', created_at), coalesce(sentiment, ''), COUNT(*)
+            FROM analyses GROUP BY 1, 2
+        """)
+        for table, kind in (("analysis_keywords", "keyword"), ("analysis_topics", "topic")):
+            await conn.execute(f"""
+                INSERT INTO stats_terms_daily (kind, day, term, count)
+                SELECT '{kind}', date(created_at), term, COUNT(*)
+                FROM {table} GROUP BY 2, 3
+            """)
+
 async def drop_tables():
     """Drop all tables (for development/testing)."""
     async with get_db_connection() as conn:
+        await conn.execute("DROP TABLE IF EXISTS jobs")
+        await conn.execute("DROP TABLE IF EXISTS stats_terms_daily")
+        await conn.execute("DROP TABLE IF EXISTS stats_hourly")
+        await conn.execute("DROP TABLE IF EXISTS analysis_embeddings")
+        await conn.execute("DROP TABLE IF EXISTS analysis_cache")
+        await conn.execute("DROP TABLE IF EXISTS analyses_fts")
+        await conn.execute("DROP VIEW IF EXISTS analyses_content")
+        await conn.execute("DROP TABLE IF EXISTS analysis_topics")
+        await conn.execute("DROP TABLE IF EXISTS analysis_keywords")
         await conn.execute("DROP TABLE IF EXISTS analyses")
+        await conn.execute("DROP TABLE IF EXISTS documents")
     print("All tables dropped successfully")
\ No newline at end of file
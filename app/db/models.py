@@ -1,6 +1,192 @@
+import base64
 import json
-from typing import List
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Iterable, List, Optional, Sequence, Set, Tuple, Union
+from app.services.metrics_service import stage
+from .compression import compress_text, content_hash, decompress_text
 from .connection import get_db_connection
+from .write_batcher import DB_WRITE_BATCHING, WriteBatcher
+
+# Columns that search results can be projected onto.
+SEARCH_FIELDS = ("id", "input_text", "summary", "title", "topics", "sentiment", "keywords", "created_at")
+# Rows pulled from SQLite per fetchmany() call.
+FETCH_SIZE = 200
+# Tokens per search snippet, as FTS5 snippet() would return.
+SNIPPET_TOKENS = 16
+
+# Approximates the FTS5 'porter unicode61' tokenizer for highlighting.
+_TOKEN = re.compile(r"[^\W_]+")
+_stemmer = None
+
+
+def _select_columns(fields: Optional[Sequence[str]] = None, alias: str = "a") -> str:
+    """SELECT list for the requested fields; id and created_at are always included."""
+    wanted = SEARCH_FIELDS if fields is None else fields
+    columns = ["id", "created_at"] + [f for f in SEARCH_FIELDS if f in wanted and f not in ("id", "created_at")]
+    return ", ".join(_column(column, alias) for column in columns)
+
+
+def _column(column: str, alias: str) -> str:
+    if column == "input_text":
+        # Compressed document body, or the inline text of rows saved before documents existed.
+        return (f"coalesce((SELECT d.body FROM documents d WHERE d.id = {alias}.document_id), "
+                f"{alias}.input_text) AS input_text")
+    return f"{alias}.{column}"
+
+
+def _text(value) -> str:
+    """input_text as selected by _select_columns: bytes are a compressed document body."""
+    return decompress_text(value) if isinstance(value, bytes) else value
+
+
+def encode_cursor(*values) -> str:
+    """Opaque pagination cursor for the sort key of the last row of a page."""
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    """Inverse of encode_cursor; raises ValueError for malformed cursors."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(values, list) or len(values) != 2:
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def normalize_term(term: str) -> str:
+    """Canonical form of a keyword/topic for the lookup tables."""
+    return " ".join(str(term).split()).lower()
+
+
+def to_fts_query(query: str) -> str:
+    """Turn free text into an FTS5 query matching all of its words.
+
+    Each word is quoted so user input cannot inject FTS5 syntax; a trailing
+    `*` is kept as a prefix match.
+    """
+    terms = []
+    for word in query.split():
+        prefix = word.endswith("*")
+        word = word.rstrip("*").replace('"', '""')
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+def build_snippet(texts: Sequence[Optional[str]], query: str, size: int = SNIPPET_TOKENS) -> str:
+    """Excerpt of the first of `texts` that matches `query`, matches wrapped in <mark> tags.
+
+    The full-text index is contentless, so FTS5 snippet() has no text to
+    work from; this mirrors it on the decompressed text. Words match by
+    Porter stem, words ending in `*` by prefix.
+    """
+    global _stemmer
+    if _stemmer is None:
+        # Imported on first search so startup does not load NLTK.
+        from nltk.stem.porter import PorterStemmer
+        _stemmer = PorterStemmer(mode=PorterStemmer.ORIGINAL_ALGORITHM)
+
+    stems, prefixes = set(), []
+    for word in query.split():
+        for token in _TOKEN.findall(word.lower()):
+            if word.endswith("*"):
+                prefixes.append(token)
+            else:
+                stems.add(_stemmer.stem(token))
+
+    def matches(token: str) -> bool:
+        token = token.lower()
+        return token.startswith(tuple(prefixes)) or _stemmer.stem(token) in stems
+
+    candidates = [text for text in texts if text]
+    for text in candidates:
+        tokens = list(_TOKEN.finditer(text))
+        hits = [i for i, token in enumerate(tokens) if matches(token.group())]
+        if hits:
+            break
+    else:
+        if not candidates:
+            return ""
+        text, hits = candidates[0], []
+        tokens = list(_TOKEN.finditer(text))
+    if not tokens:
+        return ""
+
+    # Window with the most matches, starting a few tokens before one of them.
+    start = 0
+    if hits:
+        starts = {max(0, min(hit - 3, len(tokens) - size)) for hit in hits}
+        start = max(sorted(starts), key=lambda s: sum(s <= hit < s + size for hit in hits))
+    end = min(start + size, len(tokens))
+    hit_set = set(hits)
+    parts = ["…"] if start > 0 else []
+    position = tokens[start].start()
+    for i in range(start, end):
+        token = tokens[i]
+        parts.append(text[position:token.start()])
+        parts.append(f"<mark>{token.group()}</mark>" if i in hit_set else token.group())
+        position = token.end()
+    if end < len(tokens):
+        parts.append("…")
+    return "".join(parts)
+
+
+async def store_documents(conn, texts: Sequence[str]) -> List[int]:
+    """Document ids for `texts`, inserting compressed bodies for texts not stored yet.
+
+    Identical texts share one row. Must run on the writing connection, in
+    the transaction that references the ids.
+    """
+    hashes = [content_hash(text) for text in texts]
+    unique = dict(zip(hashes, texts))
+    ids = await _document_ids(conn, list(unique))
+    new = [(h, compress_text(text), len(text.encode("utf-8"))) for h, text in unique.items() if h not in ids]
+    if new:
+        await conn.executemany("INSERT INTO documents (content_hash, body, size) VALUES (?, ?, ?)", new)
+        ids.update(await _document_ids(conn, [h for h, _, _ in new]))
+    return [ids[h] for h in hashes]
+
+
+async def stored_content_hashes(hashes: Sequence[str]) -> Set[str]:
+    """The subset of `hashes` (see compression.content_hash) already stored as documents."""
+    async with get_db_connection(readonly=True) as conn:
+        return set(await _document_ids(conn, list(hashes)))
+
+
+async def _document_ids(conn, hashes: List[str]) -> dict:
+    ids = {}
+    for start in range(0, len(hashes), 500):
+        chunk = hashes[start:start + 500]
+        cursor = await conn.execute(
+            f"SELECT id, content_hash FROM documents WHERE content_hash IN ({', '.join('?' * len(chunk))})",
+            chunk,
+        )
+        ids.update((row['content_hash'], row['id']) for row in await cursor.fetchall())
+    return ids
+
+
+async def index_terms(conn, entries: Iterable[Tuple[int, List[str], List[str]]]) -> None:
+    """Populate analysis_keywords/analysis_topics for (analysis_id, keywords, topics) entries.
+
+    Must run on the connection that inserted the analyses so the rows are
+    written in the same transaction.
+    """
+    keyword_rows, topic_rows = [], []
+    for analysis_id, keywords, topics in entries:
+        keyword_rows.extend((term, analysis_id) for term in {normalize_term(k) for k in keywords} if term)
+        topic_rows.extend((term, analysis_id) for term in {normalize_term(t) for t in topics} if term)
+
+    for table, rows in (("analysis_keywords", keyword_rows), ("analysis_topics", topic_rows)):
+        if rows:
+            await conn.executemany(f"""
+                INSERT OR IGNORE INTO {table} (term, created_at, analysis_id)
+                SELECT ?, created_at, id FROM analyses WHERE id = ?
+            """, rows)
+
 
 class Analysis:
     def __init__(self, input_text: str, summary: str = "", title: str = "", 
@@ -13,56 +199,569 @@ class Analysis:
         self.keywords = keywords or []
     
     async def save(self) -> int:
-        """Save the analysis to the database."""
-        topics_str = json.dumps(self.topics) if self.topics else ""
-        keywords_str = json.dumps(self.keywords) if self.keywords else ""
-        
-        async with get_db_connection() as conn:
-            cursor = await conn.execute("""
-                INSERT INTO analyses (input_text, summary, title, topics, sentiment, keywords)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (self.input_text, self.summary, self.title, topics_str, 
-                  self.sentiment, keywords_str))
-            return cursor.lastrowid
+        """Save the analysis to the database.
+
+        While the group-commit writer is running (see start_write_batcher),
+        the row shares a transaction with other concurrent saves.
+        """
+        with stage("save"):
+            if _write_batcher is not None:
+                return await _write_batcher.submit(self)
+            analysis_id = (await self._insert_many([self]))[0]
+        await self._index_embeddings([self], [analysis_id])
+        return analysis_id
     
     @classmethod
-    async def search_by_keyword(cls, keyword: str) -> List['Analysis']:
-        """Search analyses by keyword in keywords field."""
+    async def save_many(cls, analyses: List['Analysis']) -> None:
+        """Save several analyses in a single transaction."""
+        with stage("save_many"):
+            ids = await cls._insert_many(analyses)
+        await cls._index_embeddings(analyses, ids)
+    
+    @staticmethod
+    async def _insert_many(analyses: List['Analysis']) -> List[int]:
+        """Insert analyses, their documents and term index rows in one transaction; returns their ids."""
         async with get_db_connection() as conn:
-            cursor = await conn.execute("""
-                SELECT * FROM analyses 
-                WHERE keywords LIKE ?
-                ORDER BY created_at DESC
-            """, (f'%"{keyword}"%',))
-            rows = await cursor.fetchall()
-            return [cls._from_row(row) for row in rows]
+            document_ids = await store_documents(conn, [a.input_text for a in analyses])
+            rows = [
+                (document_id, a.summary, a.title, json.dumps(a.topics) if a.topics else "",
+                 a.sentiment, json.dumps(a.keywords) if a.keywords else "")
+                for document_id, a in zip(document_ids, analyses)
+            ]
+            # input_text is set explicitly: databases created before documents
+            # existed still declare it NOT NULL without a default.
+            await conn.executemany("""
+                INSERT INTO analyses (input_text, document_id, summary, title, topics, sentiment, keywords)
+                VALUES ('', ?, ?, ?, ?, ?, ?)
+            """, rows)
+            # The writer is serialized, so the new AUTOINCREMENT ids are contiguous.
+            cursor = await conn.execute("SELECT last_insert_rowid()")
+            last_id = (await cursor.fetchone())[0]
+            ids = list(range(last_id - len(analyses) + 1, last_id + 1))
+            await conn.executemany(
+                "INSERT INTO analyses_fts (rowid, input_text, summary) VALUES (?, ?, ?)",
+                [(analysis_id, a.input_text, a.summary) for analysis_id, a in zip(ids, analyses)],
+            )
+            await index_terms(conn, [
+                (analysis_id, a.keywords, a.topics) for analysis_id, a in zip(ids, analyses)
+            ])
+        return ids
+    
+    @staticmethod
+    async def _index_embeddings(analyses: List['Analysis'], ids: List[int]) -> None:
+        # Embedded after the commit so the writer is not held while it runs.
+        from app.services import embedding_service
+        await embedding_service.index_analyses([
+            (analysis_id, a.input_text) for analysis_id, a in zip(ids, analyses)
+        ])
     
     @classmethod
-    async def search_by_sentiment(cls, sentiment: str) -> List['Analysis']:
-        """Search analyses by sentiment."""
-        async with get_db_connection() as conn:
-            cursor = await conn.execute("""
-                SELECT * FROM analyses 
-                WHERE sentiment = ?
-                ORDER BY created_at DESC
-            """, (sentiment,))
-            rows = await cursor.fetchall()
-            return [cls._from_row(row) for row in rows]
+    async def search_by_keyword(cls, keyword: str, limit: Optional[int] = None,
+                                after: Optional[Sequence] = None,
+                                fields: Optional[Sequence[str]] = None, raw: bool = False) -> List['Analysis']:
+        """Search analyses by keyword (case-insensitive) via the keyword index.
+
+        Results are ordered newest first. `after` is the (created_at, id) of
+        the last row of the previous page; `fields` limits the columns read.
+        `raw` returns dicts instead of Analysis objects (see _fetch).
+        """
+        return await cls._search_by_term("analysis_keywords", keyword, limit, after, fields, raw)
+    
+    @classmethod
+    async def search_by_topic(cls, topic: str, limit: Optional[int] = None,
+                              after: Optional[Sequence] = None,
+                              fields: Optional[Sequence[str]] = None, raw: bool = False) -> List['Analysis']:
+        """Search analyses by topic (case-insensitive) via the topic index."""
+        return await cls._search_by_term("analysis_topics", topic, limit, after, fields, raw)
+    
+    @classmethod
+    async def _search_by_term(cls, table: str, term: str, limit: Optional[int],
+                              after: Optional[Sequence],
+                              fields: Optional[Sequence[str]], raw: bool = False) -> List['Analysis']:
+        query = f"""
+            SELECT {_select_columns(fields)} FROM {table} t
+            JOIN analyses a ON a.id = t.analysis_id
+            WHERE t.term = ?
+        """
+        params = [normalize_term(term)]
+        if after:
+            query += " AND (t.created_at, t.analysis_id) < (?, ?)"
+            params.extend(after)
+        query += " ORDER BY t.created_at DESC, t.analysis_id DESC LIMIT ?"
+        params.append(-1 if limit is None else limit)
+        return await cls._fetch(query, params, raw)
+    
+    @classmethod
+    async def search_by_sentiment(cls, sentiment: str, limit: Optional[int] = None,
+                                  after: Optional[Sequence] = None,
+                                  fields: Optional[Sequence[str]] = None, raw: bool = False) -> List['Analysis']:
+        """Search analyses by sentiment, newest first (see search_by_keyword)."""
+        query = f"SELECT {_select_columns(fields)} FROM analyses a WHERE a.sentiment = ?"
+        params = [sentiment]
+        if after:
+            query += " AND (a.created_at, a.id) < (?, ?)"
+            params.extend(after)
+        query += " ORDER BY a.created_at DESC, a.id DESC LIMIT ?"
+        params.append(-1 if limit is None else limit)
+        return await cls._fetch(query, params, raw)
+    
+    @classmethod
+    async def search_text(cls, query: str, limit: Optional[int] = 50,
+                          after: Optional[Sequence] = None,
+                          fields: Optional[Sequence[str]] = None, raw: bool = False) -> List['Analysis']:
+        """Full-text search over input_text and summary, best matches first.
+
+        Each result carries `rank` (bm25, lower is better) and `snippet`, an
+        excerpt with matches wrapped in <mark> tags (see build_snippet).
+        `after` is the (rank, id) of the last row of the previous page.
+        """
+        match = to_fts_query(query)
+        if not match:
+            return []
+        sql = f"""
+            SELECT * FROM (
+                SELECT {_select_columns(fields)},
+                       bm25(analyses_fts) AS rank,
+                       coalesce((SELECT d.body FROM documents d WHERE d.id = a.document_id),
+                                a.input_text) AS snippet_text,
+                       a.summary AS snippet_summary
+                FROM analyses_fts
+                JOIN analyses a ON a.id = analyses_fts.rowid
+                WHERE analyses_fts MATCH ?
+            )
+        """
+        params = [match]
+        if after:
+            sql += " WHERE (rank, id) > (?, ?)"
+            params.extend(after)
+        sql += " ORDER BY rank, id LIMIT ?"
+        params.append(-1 if limit is None else limit)
+        rows = await cls._fetch(sql, params, raw=True)
+        for row in rows:
+            row['snippet'] = build_snippet(
+                [_text(row.pop('snippet_text')), row.pop('snippet_summary')], query)
+        return rows if raw else [cls._from_row(row) for row in rows]
+    
+    @classmethod
+    async def get_many(cls, ids: Sequence[int],
+                       fields: Optional[Sequence[str]] = None, raw: bool = False) -> List['Analysis']:
+        """Fetch analyses by id, in the order of `ids`; unknown ids are skipped."""
+        found = {}
+        for start in range(0, len(ids), 500):
+            chunk = list(ids[start:start + 500])
+            rows = await cls._fetch(
+                f"SELECT {_select_columns(fields)} FROM analyses a WHERE a.id IN ({', '.join('?' * len(chunk))})",
+                chunk, raw,
+            )
+            found.update((row['id'] if raw else row.id, row) for row in rows)
+        return [found[i] for i in ids if i in found]
+    
+    @classmethod
+    async def _fetch(cls, query: str, params: Sequence, raw: bool = False) -> List['Analysis']:
+        """Run a search query, reading rows in FETCH_SIZE chunks.
+
+        With `raw`, rows come back as dicts of the selected columns, with
+        topics/keywords left as their stored JSON text ('' for none) so
+        responses can embed them without a decode/encode round-trip.
+        """
+        convert = cls._raw_row if raw else cls._from_row
+        results = []
+        async with get_db_connection(readonly=True) as conn:
+            cursor = await conn.execute(query, params)
+            while True:
+                rows = await cursor.fetchmany(FETCH_SIZE)
+                if not rows:
+                    break
+                results.extend(convert(row) for row in rows)
+        return results
+
+    @staticmethod
+    def _raw_row(row) -> dict:
+        item = dict(zip(row.keys(), row))
+        if 'input_text' in item:
+            item['input_text'] = _text(item['input_text'])
+        return item
+    
+    @classmethod
+    async def iter_rows(cls, since: Optional[Union[int, str]] = None,
+                        chunk_size: int = 1000) -> AsyncIterator[dict]:
+        """Yield every analysis as a dict in id order, chunk_size rows at a time.
+
+        `since` is either an id (rows with a greater id) or a created_at
+        timestamp (rows created at or after it). Each chunk is a separate
+        keyset query, so memory stays flat and no read snapshot is held
+        open between chunks.
+        """
+        last_id = since if isinstance(since, int) else 0
+        created_filter = ""
+        params_tail = []
+        if isinstance(since, str):
+            created_filter = "AND created_at >= ?"
+            params_tail.append(since)
+
+        while True:
+            async with get_db_connection(readonly=True) as conn:
+                cursor = await conn.execute(f"""
+                    SELECT {_select_columns(alias="analyses")} FROM analyses
+                    WHERE id > ? {created_filter}
+                    ORDER BY id
+                    LIMIT ?
+                """, [last_id, *params_tail, chunk_size])
+                rows = await cursor.fetchall()
+            if not rows:
+                return
+            for row in rows:
+                item = {
+                    field: (json.loads(row[field]) if row[field] else [])
+                    if field in ("topics", "keywords") else row[field]
+                    for field in SEARCH_FIELDS
+                }
+                item["input_text"] = _text(item["input_text"])
+                yield item
+            last_id = rows[-1]['id']
     
     @classmethod
     def _from_row(cls, row) -> 'Analysis':
-        """Create Analysis instance from database row."""
-        topics = json.loads(row['topics']) if row['topics'] else []
-        keywords = json.loads(row['keywords']) if row['keywords'] else []
+        """Create Analysis instance from database row.
+
+        Columns missing from the row (see `fields` on the search methods) are
+        left at their defaults; `rank` and `snippet` are copied when present.
+        """
+        keys = row.keys()
+        topics = json.loads(row['topics']) if 'topics' in keys and row['topics'] else []
+        keywords = json.loads(row['keywords']) if 'keywords' in keys and row['keywords'] else []
         
         analysis = cls(
-            input_text=row['input_text'],
-            summary=row['summary'] or "",
-            title=row['title'] or "",
+            input_text=_text(row['input_text']) if 'input_text' in keys else "",
+            summary=(row['summary'] if 'summary' in keys else "") or "",
+            title=(row['title'] if 'title' in keys else "") or "",
             topics=topics,
-            sentiment=row['sentiment'] or "",
+            sentiment=(row['sentiment'] if 'sentiment' in keys else "") or "",
             keywords=keywords
         )
         analysis.id = row['id']
         analysis.created_at = row['created_at']
-        return analysis
\ No newline at end of file
+        if 'rank' in keys:
+            analysis.rank = row['rank']
+            analysis.snippet = row['snippet']
+        return analysis
+
+_write_batcher: Optional[WriteBatcher] = None
+
+
+def start_write_batcher() -> None:
+    """Route Analysis.save() through the group-commit writer (no-op when DB_WRITE_BATCHING=0)."""
+    global _write_batcher
+    if _write_batcher is None and DB_WRITE_BATCHING:
+        _write_batcher = WriteBatcher(Analysis._insert_many, after_commit=Analysis._index_embeddings)
+        _write_batcher.start()
+
+
+async def stop_write_batcher() -> None:
+    """Commit the rows still queued, then send saves straight to the database again."""
+    global _write_batcher
+    if _write_batcher is not None:
+        batcher, _write_batcher = _write_batcher, None
+        await batcher.stop()
+
+class AnalysisCacheEntry:
+    """Persisted tier of the analysis result cache."""
+
+    @staticmethod
+    async def get(cache_key: str, max_age_seconds: Optional[int] = None) -> Optional[dict]:
+        """Return the stored result for a cache key, or None if missing or expired."""
+        query = "SELECT result FROM analysis_cache WHERE cache_key = ?"
+        params = [cache_key]
+        if max_age_seconds is not None:
+            query += " AND created_at >= datetime('now', ?)"
+            params.append(f"-{int(max_age_seconds)} seconds")
+
+        async with get_db_connection(readonly=True) as conn:
+            cursor = await conn.execute(query, params)
+            row = await cursor.fetchone()
+            return json.loads(row['result']) if row else None
+
+    @staticmethod
+    async def get_many(cache_keys: List[str], max_age_seconds: Optional[int] = None) -> dict:
+        """Return {cache_key: result} for the keys that are stored and fresh."""
+        found = {}
+        async with get_db_connection(readonly=True) as conn:
+            # Stay well under SQLite's bound-parameter limit.
+            for start in range(0, len(cache_keys), 500):
+                chunk = cache_keys[start:start + 500]
+                query = f"""
+                    SELECT cache_key, result FROM analysis_cache
+                    WHERE cache_key IN ({", ".join("?" * len(chunk))})
+                """
+                params = list(chunk)
+                if max_age_seconds is not None:
+                    query += " AND created_at >= datetime('now', ?)"
+                    params.append(f"-{int(max_age_seconds)} seconds")
+                cursor = await conn.execute(query, params)
+                for row in await cursor.fetchall():
+                    found[row['cache_key']] = json.loads(row['result'])
+        return found
+
+    @staticmethod
+    async def put_many(entries: List[tuple]) -> None:
+        """Store several (cache_key, result) pairs in one transaction."""
+        async with get_db_connection() as conn:
+            await conn.executemany("""
+                INSERT OR REPLACE INTO analysis_cache (cache_key, result, created_at)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+            """, [(key, json.dumps(result)) for key, result in entries])
+
+    @staticmethod
+    async def put(cache_key: str, result: dict) -> None:
+        """Store (or refresh) the result for a cache key."""
+        async with get_db_connection() as conn:
+            await conn.execute("""
+                INSERT OR REPLACE INTO analysis_cache (cache_key, result, created_at)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+            """, (cache_key, json.dumps(result)))
+
+
+class AnalysisEmbedding:
+    """Stored embedding vectors (raw float32 bytes) behind /search/similar."""
+
+    @staticmethod
+    async def put_many(model: str, entries: List[Tuple[int, bytes]]) -> None:
+        """Store (analysis_id, vector) pairs computed with `model`."""
+        async with get_db_connection() as conn:
+            await conn.executemany("""
+                INSERT OR REPLACE INTO analysis_embeddings (analysis_id, model, vector)
+                VALUES (?, ?, ?)
+            """, [(analysis_id, model, vector) for analysis_id, vector in entries])
+
+    @staticmethod
+    async def get(model: str, analysis_id: int) -> Optional[bytes]:
+        async with get_db_connection(readonly=True) as conn:
+            cursor = await conn.execute(
+                "SELECT vector FROM analysis_embeddings WHERE analysis_id = ? AND model = ?",
+                (analysis_id, model),
+            )
+            row = await cursor.fetchone()
+            return row['vector'] if row else None
+
+    @staticmethod
+    async def iter_chunks(model: str, chunk_size: int = 10000) -> AsyncIterator[List[Tuple[int, bytes]]]:
+        """Yield every (analysis_id, vector) stored for `model`, in id order."""
+        last_id = 0
+        while True:
+            async with get_db_connection(readonly=True) as conn:
+                cursor = await conn.execute("""
+                    SELECT analysis_id, vector FROM analysis_embeddings
+                    WHERE model = ? AND analysis_id > ?
+                    ORDER BY analysis_id
+                    LIMIT ?
+                """, (model, last_id, chunk_size))
+                rows = await cursor.fetchall()
+            if not rows:
+                return
+            yield [(row['analysis_id'], row['vector']) for row in rows]
+            last_id = rows[-1]['analysis_id']
+
+    @staticmethod
+    async def missing(model: str, after_id: int = 0, limit: int = 1000) -> List[Tuple[int, str]]:
+        """(id, input_text) of analyses with no `model` embedding, in id order."""
+        async with get_db_connection(readonly=True) as conn:
+            cursor = await conn.execute(f"""
+                SELECT {_select_columns(["input_text"])} FROM analyses a
+                LEFT JOIN analysis_embeddings e ON e.analysis_id = a.id AND e.model = ?
+                WHERE a.id > ? AND e.analysis_id IS NULL
+                ORDER BY a.id
+                LIMIT ?
+            """, (model, after_id, limit))
+            return [(row['id'], _text(row['input_text'])) for row in await cursor.fetchall()]
+
+
+class AnalysisStats:
+    """Reads of the trigger-maintained summary tables behind GET /stats.
+
+    Every query is bounded by the window (hours/days x sentiments or terms),
+    never by the number of analyses.
+    """
+
+    INTERVALS = ("day", "hour")
+
+    @staticmethod
+    async def summary(days: int = 30, interval: str = "day", top: int = 10,
+                      now: Optional[datetime] = None) -> dict:
+        """Counts for the last `days` UTC days (today included).
+
+        Returns the window, the total and sentiment distribution, the `top`
+        keywords and topics, and a dense per-`interval` series of counts.
+        """
+        now = now or datetime.now(timezone.utc)
+        start = (now - timedelta(days=days - 1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        start_day = start.strftime("%Y-%m-%d")
+        width = 10 if interval == "day" else 19
+
+        async with get_db_connection(readonly=True) as conn:
+            cursor = await conn.execute(f"""
+                SELECT substr(bucket, 1, {width}) AS bucket, sentiment, SUM(count) AS count
+                FROM stats_hourly
+                WHERE bucket >= ?
+                GROUP BY 1, 2
+                HAVING SUM(count) > 0
+            """, (f"{start_day} 00:00:00",))
+            rows = await cursor.fetchall()
+            top_terms = {}
+            for kind in ("keyword", "topic"):
+                cursor = await conn.execute("""
+                    SELECT term, SUM(count) AS count
+                    FROM stats_terms_daily
+                    WHERE kind = ? AND day >= ?
+                    GROUP BY term
+                    HAVING SUM(count) > 0
+                    ORDER BY count DESC, term
+                    LIMIT ?
+                """, (kind, start_day, top))
+                top_terms[kind] = [{"term": row['term'], "count": row['count']} for row in await cursor.fetchall()]
+
+        step = timedelta(days=1) if interval == "day" else timedelta(hours=1)
+        end = now.replace(minute=0, second=0, microsecond=0)
+        series = {}
+        bucket = start
+        while bucket <= end:
+            key = bucket.strftime("%Y-%m-%d" if interval == "day" else "%Y-%m-%d %H:00:00")
+            series[key] = {"bucket": key, "count": 0, "sentiment": {}}
+            bucket += step
+
+        sentiment = {}
+        for row in rows:
+            sentiment[row['sentiment']] = sentiment.get(row['sentiment'], 0) + row['count']
+            point = series.get(row['bucket'])
+            if point is not None:
+                point["count"] += row['count']
+                point["sentiment"][row['sentiment']] = row['count']
+
+        return {
+            "window": {"start": start_day, "end": now.strftime("%Y-%m-%d"), "days": days, "interval": interval},
+            "total": sum(sentiment.values()),
+            "sentiment": sentiment,
+            "top_keywords": top_terms["keyword"],
+            "top_topics": top_terms["topic"],
+            "counts": list(series.values()),
+        }
+
+
+class Job:
+    """Rows of the `jobs` queue used by asynchronous /analyze requests.
+
+    Workers claim jobs with a lease; a job whose lease expires (its worker
+    died or hung) becomes claimable again. Completing or failing a job only
+    succeeds for the worker that still holds its lease.
+    """
+
+    TERMINAL = ("succeeded", "failed")
+
+    @staticmethod
+    async def create(job_id: str, input_text: str, backend: Optional[str] = None) -> None:
+        async with get_db_connection() as conn:
+            await conn.execute("""
+                INSERT INTO jobs (id, input_text, backend, available_at)
+                VALUES (?, ?, ?, ?)
+            """, (job_id, input_text, backend, time.time()))
+
+    @staticmethod
+    async def get(job_id: str) -> Optional[dict]:
+        """Public view of a job, or None if it does not exist."""
+        async with get_db_connection(readonly=True) as conn:
+            cursor = await conn.execute("""
+                SELECT id, status, attempts, result, error, created_at, updated_at
+                FROM jobs WHERE id = ?
+            """, (job_id,))
+            row = await cursor.fetchone()
+        if row is None:
+            return None
+        job = {
+            "id": row['id'],
+            "status": row['status'],
+            "attempts": row['attempts'],
+            "created_at": row['created_at'],
+            "updated_at": row['updated_at'],
+        }
+        if row['result'] is not None:
+            job["result"] = json.loads(row['result'])
+        if row['error'] is not None:
+            job["error"] = row['error']
+        return job
+
+    @staticmethod
+    async def claim(owner: str, lease_seconds: float, limit: int = 1,
+                    max_attempts: Optional[int] = None) -> List[dict]:
+        """Lease up to `limit` runnable jobs (queued and due, or with an expired lease).
+
+        Jobs whose lease expired on their last allowed attempt (`max_attempts`)
+        are failed instead of being run again.
+        """
+        now = time.time()
+        async with get_db_connection() as conn:
+            if max_attempts is not None:
+                await conn.execute("""
+                    UPDATE jobs
+                    SET status = 'failed', error = 'Lease expired after ' || attempts || ' attempts',
+                        lease_owner = NULL, lease_expires_at = NULL, updated_at = CURRENT_TIMESTAMP
+                    WHERE status = 'running' AND lease_expires_at <= ? AND attempts >= ?
+                """, (now, max_attempts))
+            cursor = await conn.execute("""
+                UPDATE jobs
+                SET status = 'running', lease_owner = ?, lease_expires_at = ?,
+                    attempts = attempts + 1, updated_at = CURRENT_TIMESTAMP
+                WHERE id IN (
+                    SELECT id FROM jobs
+                    WHERE (status = 'queued' AND available_at <= ?)
+                       OR (status = 'running' AND lease_expires_at <= ?)
+                    ORDER BY available_at
+                    LIMIT ?
+                )
+                RETURNING id, input_text, backend, attempts
+            """, (owner, now + lease_seconds, now, now, limit))
+            rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    async def renew(job_id: str, owner: str, lease_seconds: float) -> bool:
+        """Extend a held lease; False if the lease was lost."""
+        async with get_db_connection() as conn:
+            cursor = await conn.execute("""
+                UPDATE jobs SET lease_expires_at = ?
+                WHERE id = ? AND lease_owner = ? AND status = 'running'
+            """, (time.time() + lease_seconds, job_id, owner))
+            return cursor.rowcount == 1
+
+    @staticmethod
+    async def complete(job_id: str, owner: str, result: dict) -> bool:
+        async with get_db_connection() as conn:
+            cursor = await conn.execute("""
+                UPDATE jobs
+                SET status = 'succeeded', result = ?, error = NULL, lease_owner = NULL,
+                    lease_expires_at = NULL, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND lease_owner = ? AND status = 'running'
+            """, (json.dumps(result), job_id, owner))
+            return cursor.rowcount == 1
+
+    @staticmethod
+    async def fail(job_id: str, owner: str, error: str, retry_at: Optional[float] = None) -> bool:
+        """Record a failed attempt; requeue it for `retry_at` or fail it for good."""
+        async with get_db_connection() as conn:
+            cursor = await conn.execute("""
+                UPDATE jobs
+                SET status = ?, error = ?, available_at = COALESCE(?, available_at),
+                    lease_owner = NULL, lease_expires_at = NULL, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND lease_owner = ? AND status = 'running'
+            """, ("queued" if retry_at is not None else "failed", error, retry_at, job_id, owner))
+            return cursor.rowcount == 1
+
+    @staticmethod
+    async def release(owner: str) -> int:
+        """Put every job leased by `owner` back in the queue (used on shutdown)."""
+        async with get_db_connection() as conn:
+            cursor = await conn.execute("""
+                UPDATE jobs
+                SET status = 'queued', attempts = MAX(attempts - 1, 0), lease_owner = NULL,
+                    lease_expires_at = NULL, updated_at = CURRENT_TIMESTAMP
+                WHERE lease_owner = ? AND status = 'running'
+            """, (owner,))
+            return cursor.rowcount
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import sqlite3
+from .connection import get_db_connection
+from .models import store_documents
+
+async def storage_stats() -> dict:
+    """Sizes behind the analyzed texts: logical vs. stored bytes and the database file."""
+    async with get_db_connection(readonly=True) as conn:
+        cursor = await conn.execute("""
+            SELECT count(*) AS analyses,
+                   count(document_id) AS with_document,
+                   coalesce(sum(length(CAST(input_text AS BLOB))), 0) AS inline_bytes
+            FROM analyses
+        """)
+        analyses = await cursor.fetchone()
+        cursor = await conn.execute("""
+            SELECT count(*) AS documents,
+                   coalesce(sum(size), 0) AS text_bytes,
+                   coalesce(sum(length(body)), 0) AS stored_bytes
+            FROM documents
+        """)
+        documents = await cursor.fetchone()
+        cursor = await conn.execute("""
+            SELECT coalesce(sum(d.size), 0) FROM analyses a JOIN documents d ON d.id = a.document_id
+        """)
+        referenced_bytes = (await cursor.fetchone())[0]
+        fts_bytes = await _fts_bytes(conn)
+        pages = {}
+        for pragma in ("page_count", "page_size", "freelist_count"):
+            cursor = await conn.execute(f"PRAGMA {pragma}")
+            pages[pragma] = (await cursor.fetchone())[0]
+
+    return {
+        "analyses": analyses['analyses'],
+        "legacy_rows": analyses['analyses'] - analyses['with_document'],
+        "legacy_inline_bytes": analyses['inline_bytes'],
+        "documents": documents['documents'],
+        # Text bytes as if every analysis stored its own copy.
+        "logical_text_bytes": referenced_bytes + analyses['inline_bytes'],
+        "document_text_bytes": documents['text_bytes'],
+        "document_stored_bytes": documents['stored_bytes'],
+        "dedup_ratio": round(referenced_bytes / documents['text_bytes'], 3) if documents['text_bytes'] else 1.0,
+        "compression_ratio": (round(documents['text_bytes'] / documents['stored_bytes'], 3)
+                              if documents['stored_bytes'] else 1.0),
+        "fts_index_bytes": fts_bytes,
+        "file_bytes": pages['page_count'] * pages['page_size'],
+        "free_bytes": pages['freelist_count'] * pages['page_size'],
+    }
+
+async def _fts_bytes(conn) -> int:
+    """Bytes used by the full-text index's shadow tables (analyses_fts_*)."""
+    cursor = await conn.execute(r"""
+        SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'analyses\_fts\_%' ESCAPE '\'
+    """)
+    tables = [row['name'] for row in await cursor.fetchall()]
+    if not tables:
+        return 0
+    try:
+        cursor = await conn.execute(
+            f"SELECT coalesce(sum(pgsize), 0) FROM dbstat WHERE name IN ({', '.join('?' * len(tables))})",
+            tables,
+        )
+    except sqlite3.OperationalError:
+        # SQLite built without the dbstat table: count the index segments only.
+        cursor = await conn.execute("SELECT coalesce(sum(length(block)), 0) FROM analyses_fts_data")
+    return (await cursor.fetchone())[0]
+
+async def compact(batch_size: int = 1000, vacuum: bool = False) -> int:
+    """Move inline input_text of rows saved before documents existed into documents.
+
+    Safe to re-run and to run against a live database: each batch is its own
+    transaction. The freed space is reused by SQLite; `vacuum` also returns
+    it to the filesystem (rewrites the whole file). Returns rows moved.
+    """
+    moved = 0
+    while True:
+        async with get_db_connection() as conn:
+            cursor = await conn.execute("""
+                SELECT id, input_text FROM analyses
+                WHERE document_id IS NULL
+                ORDER BY id
+                LIMIT ?
+            """, (batch_size,))
+            rows = await cursor.fetchall()
+            if not rows:
+                break
+            document_ids = await store_documents(conn, [row['input_text'] for row in rows])
+            await conn.executemany(
+                "UPDATE analyses SET document_id = ?, input_text = '' WHERE id = ?",
+                [(document_id, row['id']) for document_id, row in zip(document_ids, rows)],
+            )
+        moved += len(rows)
+        print(f"Moved {moved} analyses into documents (up to id {rows[-1]['id']})")
+    if vacuum:
+        async with get_db_connection() as conn:
+            await conn.execute("VACUUM")
+    return moved
+
+def main():
+    """Main entry point for storage statistics and compaction."""
+    parser = argparse.ArgumentParser(description="Inspect or compact analyzed-text storage.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("stats", help="print storage statistics")
+    compact_parser = subparsers.add_parser("compact", help="move legacy inline texts into documents")
+    compact_parser.add_argument("--batch-size", type=int, default=1000)
+    compact_parser.add_argument("--vacuum", action="store_true", help="rewrite the file to release free pages")
+    args = parser.parse_args()
+
+    if args.command == "compact":
+        total = asyncio.run(compact(args.batch_size, args.vacuum))
+        print(f"Compaction completed: {total} analyses moved")
+    for key, value in asyncio.run(storage_stats()).items():
+        print(f"{key}: {value}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import asyncio
+import os
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from app.services.metrics_service import Gauge, Histogram, stage
+
+# 0 sends each Analysis.save() straight to the database in its own transaction.
+DB_WRITE_BATCHING = os.getenv("DB_WRITE_BATCHING", "1") == "1"
+# Commit once this many rows are pending, or once the oldest has waited this long.
+DB_WRITE_BATCH_ROWS = int(os.getenv("DB_WRITE_BATCH_ROWS", "100"))
+DB_WRITE_BATCH_MS = float(os.getenv("DB_WRITE_BATCH_MS", "2"))
+
+WRITE_BATCH_SIZE = Histogram(
+    "db_write_batch_rows", "Rows committed per group-commit transaction.",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512))
+WRITE_QUEUE_DEPTH = Gauge("db_write_queue_depth", "Rows waiting for the group-commit writer.")
+
+_STOP = object()
+
+
+class WriteBatcher:
+    """Group commit: one background task writes many callers' rows per transaction.
+
+    `submit(item)` queues a row and resolves to its id once the transaction
+    holding it commits. The writer takes the first pending row, keeps
+    collecting for up to `max_wait` seconds or `max_rows` rows, and hands
+    the batch to `write(items) -> ids`. If a batch fails, its rows are
+    retried one per transaction so only the bad row's caller sees the error.
+    `after_commit(items, ids)` runs in the background for side work such
+    as indexing.
+    """
+
+    def __init__(self, write: Callable[[List], Awaitable[List[int]]],
+                 after_commit: Optional[Callable[[List, List[int]], Awaitable]] = None,
+                 max_rows: int = DB_WRITE_BATCH_ROWS, max_wait: float = DB_WRITE_BATCH_MS / 1000):
+        self.write = write
+        self.after_commit = after_commit
+        self.max_rows = max_rows
+        self.max_wait = max_wait
+        self._queue: "asyncio.Queue[Tuple[object, asyncio.Future]]" = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self._background = set()
+        self._closed = False
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop accepting rows, commit everything already queued, then return."""
+        self._closed = True
+        self._queue.put_nowait(_STOP)
+        if self._task is not None:
+            await self._task
+            self._task = None
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+
+    async def submit(self, item) -> int:
+        if self._closed:
+            raise RuntimeError("Write batcher is stopped")
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((item, future))
+        WRITE_QUEUE_DEPTH.set(self._queue.qsize())
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            entry = await self._queue.get()
+            if entry is _STOP:
+                break
+            batch = [entry]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_rows:
+                try:
+                    entry = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        entry = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if entry is _STOP:
+                    stopping = True
+                    break
+                batch.append(entry)
+            WRITE_QUEUE_DEPTH.set(self._queue.qsize())
+            await self._commit(batch)
+
+    async def _commit(self, batch: List[Tuple[object, asyncio.Future]]) -> None:
+        items = [item for item, _ in batch]
+        try:
+            with stage("write_batch"):
+                ids = await self.write(items)
+        except Exception as e:
+            if len(batch) == 1:
+                if not batch[0][1].done():
+                    batch[0][1].set_exception(e)
+                return
+            for entry in batch:
+                await self._commit([entry])
+            return
+
+        WRITE_BATCH_SIZE.observe(len(batch))
+        for (_, future), row_id in zip(batch, ids):
+            if not future.done():
+                future.set_result(row_id)
+        if self.after_commit is not None:
+            task = asyncio.create_task(self.after_commit(items, ids))
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+from app.db.connection import open_pool, close_pool
+from app.db.migrator import run_migrations
+from app.services.ingest_service import ingest
+from app.services.nlp_service import ensure_nltk_data, start_nlp_pool, shutdown_nlp_pool
+from app.services.openai_service import close_client
+
+async def run_ingest(args):
+    """Open the same resources as the app lifespan and run the pipeline."""
+    ensure_nltk_data()
+    await open_pool()
+    start_nlp_pool()
+    try:
+        await run_migrations()
+        await ingest(
+            args.path,
+            concurrency=args.concurrency,
+            rate=args.rate,
+            batch_size=args.batch_size,
+            text_field=args.text_field,
+            checkpoint_path=args.checkpoint,
+            report_seconds=args.report_seconds,
+        )
+    finally:
+        shutdown_nlp_pool()
+        await close_client()
+        await close_pool()
+
+def main():
+    """Main entry point for bulk-ingesting a corpus."""
+    parser = argparse.ArgumentParser(description="Analyze and store a JSONL or text corpus.")
+    parser.add_argument("path", help=".jsonl/.ndjson file (one object per line) or text file (one document per line)")
+    parser.add_argument("--text-field", default="text", help="JSONL field holding the text (default: text)")
+    parser.add_argument("--concurrency", type=int, default=8, help="LLM calls in flight")
+    parser.add_argument("--rate", type=float, default=5.0, help="max LLM calls per second (0 = unlimited)")
+    parser.add_argument("--batch-size", type=int, default=100, help="rows per database transaction")
+    parser.add_argument("--checkpoint", help="checkpoint file; an existing one resumes the run")
+    parser.add_argument("--report-seconds", type=float, default=5.0, help="progress report interval")
+    args = parser.parse_args()
+    asyncio.run(run_ingest(args))
+
+if __name__ == "__main__":
+    main()
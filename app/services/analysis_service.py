@@ -0,0 +1,114 @@
+import asyncio
+from typing import List, Optional
+
+from app.db.models import Analysis
+from app.services import backend_service, nlp_service
+from app.services.cache_service import SingleFlight, analysis_cache, make_cache_key
+
+# Concurrent analyze_and_store calls for the same text share one analysis.
+in_flight = SingleFlight()
+
+
+def build_analysis(text: str, openai_response: dict, keywords: List[str]) -> Analysis:
+    """Analysis row for an LLM response plus NLTK keywords."""
+    return Analysis(
+        input_text=text,
+        summary=openai_response.get("summary", ""),
+        title=openai_response.get("title", ""),
+        topics=openai_response.get("key_topics", []),
+        sentiment=openai_response.get("sentiment", ""),
+        keywords=keywords
+    )
+
+
+async def analyze_and_store(text: str, backend: Optional[str] = None) -> dict:
+    """Analyze `text`, persist the result and return the /analyze response.
+
+    `backend` picks the analysis backend by name; by default the
+    ANALYSIS_BACKEND routing policy decides. Identical (whitespace-normalized)
+    texts are served from the analysis cache without calling the backend or
+    NLTK; concurrent calls for the same text share one analysis and one row.
+    """
+    try:
+        selected = backend_service.select_backend(text, backend)
+    except ValueError as e:
+        return {"error": str(e)}
+
+    cache_key = make_cache_key(text, selected.model, selected.prompt_version)
+    cached = await analysis_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    return await in_flight.do(cache_key, lambda: _analyze_and_save(text, selected, cache_key))
+
+
+async def _analyze_and_save(text: str, selected, cache_key: str) -> dict:
+    openai_response = await backend_service.analyze(selected, text)
+    if "error" in openai_response:
+        return {"error": openai_response["error"]}
+
+    nlp_response = await nlp_service.extract_keywords(text)
+
+    await build_analysis(text, openai_response, nlp_response).save()
+
+    response = {
+        **openai_response,
+        "keywords": nlp_response,
+    }
+    await analysis_cache.set(cache_key, response)
+    return response
+
+
+async def analyze_and_store_many(texts: List[str], backend: Optional[str] = None) -> List[dict]:
+    """Batch version of analyze_and_store.
+
+    Cached texts are answered directly, duplicates within the batch are
+    analyzed once, texts routed to the same backend are analyzed together
+    (short texts share LLM prompts), keywords are extracted in one NLTK pass
+    and all new rows are written in a single transaction. Results come back
+    in input order with per-item {"error": ...} entries.
+    """
+    try:
+        selected = [backend_service.select_backend(text, backend) for text in texts]
+    except ValueError as e:
+        return [{"error": str(e)} for _ in texts]
+
+    keys = [make_cache_key(text, b.model, b.prompt_version) for text, b in zip(texts, selected)]
+    cached = await analysis_cache.get_many(keys)
+
+    # First occurrence of each uncached key -> its text, grouped by backend.
+    pending = {}
+    groups = {}
+    for key, text, b in zip(keys, texts, selected):
+        if key not in cached and key not in pending:
+            pending[key] = text
+            groups.setdefault(b.name, (b, []))[1].append(key)
+
+    pending_keys = [key for _, group_keys in groups.values() for key in group_keys]
+    group_results = await asyncio.gather(*(
+        backend_service.analyze_many(b, [pending[key] for key in group_keys])
+        for b, group_keys in groups.values()
+    ))
+    llm_results = [result for results in group_results for result in results]
+    succeeded = [
+        (key, result) for key, result in zip(pending_keys, llm_results)
+        if "error" not in result
+    ]
+    keywords = await nlp_service.extract_keywords_many([pending[key] for key, _ in succeeded])
+
+    fresh = {}
+    analyses = []
+    for (key, openai_response), nlp_response in zip(succeeded, keywords):
+        analyses.append(build_analysis(pending[key], openai_response, nlp_response))
+        fresh[key] = {**openai_response, "keywords": nlp_response}
+
+    if analyses:
+        await Analysis.save_many(analyses)
+        await analysis_cache.set_many(list(fresh.items()))
+
+    errors = {
+        key: {"error": result["error"]}
+        for key, result in zip(pending_keys, llm_results)
+        if "error" in result
+    }
+    return [dict(cached.get(key) or fresh.get(key) or errors[key]) for key in keys]
@@ -0,0 +1,142 @@
+import asyncio
+import os
+from abc import ABC, abstractmethod
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from app.services import openai_service, local_analysis_service
+from app.services.openai_service import estimate_tokens
+
+# "openai", "local", or "auto" (local for texts up to LOCAL_MAX_CHARS).
+ANALYSIS_BACKEND = os.getenv("ANALYSIS_BACKEND", "openai")
+LOCAL_MAX_CHARS = int(os.getenv("LOCAL_MAX_CHARS", "500"))
+# Blended input/output price used for the cost estimate.
+OPENAI_COST_PER_1K_TOKENS = float(os.getenv("OPENAI_COST_PER_1K_TOKENS", "0.0003"))
+# Prompt wrapper plus a typical JSON answer, added to each text's estimate.
+OPENAI_OVERHEAD_TOKENS = 200
+
+
+@dataclass
+class BackendStats:
+    calls: int = 0
+    texts: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+    tokens: int = 0
+    cost: float = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "texts": self.texts,
+            "errors": self.errors,
+            "avg_latency_ms": round(1000 * self.seconds / self.calls, 2) if self.calls else 0.0,
+            "estimated_tokens": self.tokens,
+            "estimated_cost_usd": round(self.cost, 6),
+        }
+
+
+class AnalysisBackend(ABC):
+    """Produces {"summary", "title", "key_topics", "sentiment"} for texts.
+
+    `model` and `prompt_version` feed the cache key, so results from
+    different backends are cached separately. Subclasses implement
+    `analyze_many`; `analyze` defaults to a batch of one.
+    """
+
+    name = ""
+    model = ""
+    prompt_version = ""
+    cost_per_1k_tokens = 0.0
+
+    def __init__(self):
+        self.stats = BackendStats()
+
+    async def analyze(self, text: str) -> dict:
+        return (await self.analyze_many([text]))[0]
+
+    @abstractmethod
+    async def analyze_many(self, texts: List[str]) -> List[dict]:
+        """One result (or {"error": ...}) per text, in order."""
+
+    def estimate_tokens(self, texts: List[str]) -> int:
+        return 0
+
+
+class OpenAIBackend(AnalysisBackend):
+    name = "openai"
+    model = openai_service.MODEL
+    prompt_version = openai_service.PROMPT_VERSION
+    cost_per_1k_tokens = OPENAI_COST_PER_1K_TOKENS
+
+    async def analyze(self, text: str) -> dict:
+        return await openai_service.analyze_text(text)
+
+    async def analyze_many(self, texts: List[str]) -> List[dict]:
+        return await openai_service.analyze_texts(texts)
+
+    def estimate_tokens(self, texts: List[str]) -> int:
+        return sum(estimate_tokens(text) + OPENAI_OVERHEAD_TOKENS for text in texts)
+
+
+class LocalBackend(AnalysisBackend):
+    """Extractive summary, TF-IDF topics and VADER sentiment; no network."""
+
+    name = "local"
+    model = "local"
+    prompt_version = local_analysis_service.LOCAL_VERSION
+
+    async def analyze_many(self, texts: List[str]) -> List[dict]:
+        try:
+            return await asyncio.to_thread(
+                lambda: [local_analysis_service.analyze_local(text) for text in texts]
+            )
+        except LookupError:
+            # Startup only checks the local NLTK data when ANALYSIS_BACKEND
+            # can pick local, but requests may still ask for it by name.
+            missing = ", ".join(local_analysis_service.NLTK_RESOURCES)
+            return [{"error": f"Local backend unavailable: missing NLTK data ({missing})"}] * len(texts)
+
+
+BACKENDS: Dict[str, AnalysisBackend] = {
+    backend.name: backend for backend in (OpenAIBackend(), LocalBackend())
+}
+
+
+def select_backend(text: str, requested: Optional[str] = None) -> AnalysisBackend:
+    """Backend for `text`: the requested one, else the ANALYSIS_BACKEND policy.
+
+    Raises ValueError for an unknown backend name.
+    """
+    name = requested or ANALYSIS_BACKEND
+    if name == "auto":
+        name = "local" if len(text) <= LOCAL_MAX_CHARS else "openai"
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend: {name}")
+    return BACKENDS[name]
+
+
+async def analyze_many(backend: AnalysisBackend, texts: List[str]) -> List[dict]:
+    """Run `backend` over `texts`, recording latency, errors and estimated cost."""
+    if not texts:
+        return []
+    start = time.perf_counter()
+    results = await backend.analyze_many(texts) if len(texts) > 1 else [await backend.analyze(texts[0])]
+    stats = backend.stats
+    stats.seconds += time.perf_counter() - start
+    stats.calls += 1
+    stats.texts += len(texts)
+    stats.errors += sum(1 for result in results if "error" in result)
+    tokens = backend.estimate_tokens(texts)
+    stats.tokens += tokens
+    stats.cost += tokens / 1000 * backend.cost_per_1k_tokens
+    return results
+
+
+async def analyze(backend: AnalysisBackend, text: str) -> dict:
+    return (await analyze_many(backend, [text]))[0]
+
+
+def backend_stats() -> dict:
+    return {name: backend.stats.as_dict() for name, backend in BACKENDS.items()}
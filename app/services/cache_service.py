@@ -0,0 +1,177 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.db.models import AnalysisCacheEntry
+from app.services.openai_service import MODEL, PROMPT_VERSION
+
+CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "10000"))
+CACHE_MAX_BYTES = int(os.getenv("ANALYSIS_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CACHE_TTL_SECONDS = int(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially different submissions share a key."""
+    return " ".join(text.split())
+
+
+def make_cache_key(text: str, model: str = MODEL, prompt_version: str = PROMPT_VERSION) -> str:
+    """Content-addressed key for an analysis of `text`."""
+    payload = f"{model}\0{prompt_version}\0{normalize_text(text)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AnalysisCache:
+    """Two-tier cache of analysis results: an in-process LRU backed by SQLite."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, max_bytes: int = CACHE_MAX_BYTES,
+                 ttl_seconds: int = CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        # key -> (expires_at, size, result)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[dict]:
+        """Return a cached result, promoting persisted hits into memory."""
+        result = self._get_memory(key)
+        if result is not None:
+            self.memory_hits += 1
+            return result
+
+        result = await AnalysisCacheEntry.get(key, max_age_seconds=self.ttl_seconds)
+        if result is not None:
+            self.db_hits += 1
+            self._set_memory(key, result)
+            return dict(result)
+
+        self.misses += 1
+        return None
+
+    async def get_many(self, keys: List[str]) -> Dict[str, dict]:
+        """Batched get(); returns only the keys that were found."""
+        found = {}
+        pending = []
+        for key in dict.fromkeys(keys):
+            result = self._get_memory(key)
+            if result is not None:
+                self.memory_hits += 1
+                found[key] = result
+            else:
+                pending.append(key)
+
+        if pending:
+            persisted = await AnalysisCacheEntry.get_many(pending, max_age_seconds=self.ttl_seconds)
+            for key, result in persisted.items():
+                self.db_hits += 1
+                self._set_memory(key, result)
+                found[key] = dict(result)
+            self.misses += len(pending) - len(persisted)
+        return found
+
+    async def set(self, key: str, result: dict) -> None:
+        """Store a result in both tiers."""
+        self._set_memory(key, result)
+        await AnalysisCacheEntry.put(key, result)
+
+    async def set_many(self, entries: List[Tuple[str, dict]]) -> None:
+        """Store several (key, result) pairs, persisting them in one transaction."""
+        for key, result in entries:
+            self._set_memory(key, result)
+        if entries:
+            await AnalysisCacheEntry.put_many(entries)
+
+    def clear(self) -> None:
+        """Drop the in-memory tier (the persisted tier is left untouched)."""
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict:
+        hits = self.memory_hits + self.db_hits
+        lookups = hits + self.misses
+        return {
+            "hits": hits,
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
+
+    def _get_memory(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, size, result = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self._bytes -= size
+            return None
+        self._entries.move_to_end(key)
+        return dict(result)
+
+    def _set_memory(self, key: str, result: dict) -> None:
+        size = len(json.dumps(result))
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, size, dict(result))
+        self._bytes += size
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+
+analysis_cache = AnalysisCache()
+
+
+class SingleFlight:
+    """Shares one in-flight computation among concurrent callers of the same key.
+
+    Covers the window before a result is cached: the first caller starts the
+    work and later callers with the same key await that same task. The task
+    is shielded, so a disconnecting caller does not cancel it for the rest.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable]):
+        task = self._tasks.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.followers += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+
+    def stats(self) -> dict:
+        calls = self.leaders + self.followers
+        return {
+            "in_flight": len(self._tasks),
+            "leaders": self.leaders,
+            "coalesced": self.followers,
+            "coalesced_ratio": self.followers / calls if calls else 0.0,
+        }
@@ -0,0 +1,350 @@
+import asyncio
+import math
+import os
+import re
+import zlib
+from collections import Counter
+from typing import TYPE_CHECKING, Iterable, List, Optional, Sequence, Tuple
+
+from app.db.models import AnalysisEmbedding
+from app.services import openai_service
+from app.services.metrics_service import log_event
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# "local" (hashed term frequencies, no network) or "openai".
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "local")
+# Width of local vectors; a power of two keeps hashing uniform.
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "256"))
+# IVF partitioning: rows are bucketed by nearest of VECTOR_INDEX_LISTS
+# centroids once the index holds VECTOR_INDEX_IVF_MIN_ROWS vectors, and a
+# query scores only the rows of its VECTOR_INDEX_PROBES nearest buckets.
+VECTOR_INDEX_LISTS = int(os.getenv("VECTOR_INDEX_LISTS", "1024"))
+VECTOR_INDEX_PROBES = int(os.getenv("VECTOR_INDEX_PROBES", "16"))
+VECTOR_INDEX_IVF_MIN_ROWS = int(os.getenv("VECTOR_INDEX_IVF_MIN_ROWS", "200000"))
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def embedding_model() -> str:
+    """Name stored with each vector; vectors of other models are ignored."""
+    if EMBEDDING_BACKEND == "openai":
+        return f"openai:{openai_service.EMBEDDING_MODEL}"
+    return f"hashed-tf:{EMBEDDING_DIM}:1"
+
+
+def embed_local(texts: Sequence[str], dim: int = EMBEDDING_DIM) -> "np.ndarray":
+    """Unit-length float32 vectors from signed feature hashing.
+
+    Words and adjacent word pairs are hashed (crc32, stable across
+    processes) into `dim` buckets with a hash-derived sign, weighted by
+    1 + log(count) so repeated terms do not dominate.
+    """
+    import numpy as np
+
+    vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        words = _WORD.findall(text.lower())
+        counts = Counter(words)
+        counts.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+        for term, count in counts.items():
+            h = zlib.crc32(term.encode())
+            vectors[row, h % dim] += (1.0 if h & 0x80000000 else -1.0) * (1.0 + math.log(count))
+    return _normalize(vectors)
+
+
+def _normalize(vectors: "np.ndarray") -> "np.ndarray":
+    import numpy as np
+
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+async def embed(texts: Sequence[str]) -> Optional["np.ndarray"]:
+    """Vectors for `texts` from the configured backend, or None on upstream failure."""
+    import numpy as np
+
+    if EMBEDDING_BACKEND == "openai":
+        result = await openai_service.create_embeddings(list(texts))
+        if isinstance(result, dict):
+            log_event("embedding.failed", sample_rate=1.0, error=result["error"])
+            return None
+        return _normalize(np.asarray(result, dtype=np.float32))
+    return await asyncio.to_thread(embed_local, texts)
+
+
+class VectorIndex:
+    """In-memory cosine-similarity index over unit float32 vectors.
+
+    Vectors live in one contiguous (capacity, dim) array that grows by
+    doubling, so appends are amortized O(1) and a full scan is a single
+    matrix-vector product. Once trained, IVF buckets restrict a query to
+    the rows nearest its closest centroids. `add` never trains: training
+    takes seconds at IVF sizes, so callers run `fit` off the event loop and
+    `install` the result (see train_in_background).
+    """
+
+    def __init__(self, dim: int, lists: int = VECTOR_INDEX_LISTS, probes: int = VECTOR_INDEX_PROBES,
+                 ivf_min_rows: int = VECTOR_INDEX_IVF_MIN_ROWS):
+        import numpy as np
+
+        self.dim = dim
+        self.lists = lists
+        self.probes = probes
+        self.ivf_min_rows = ivf_min_rows
+        self.size = 0
+        self._vectors = np.zeros((1024, dim), dtype=np.float32)
+        self._ids = np.zeros(1024, dtype=np.int64)
+        self._rows = {}
+        self.centroids: Optional["np.ndarray"] = None
+        self._buckets: List[List[int]] = []
+        self._bucket_arrays: List[Optional["np.ndarray"]] = []
+        self.training = False
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, analysis_id: int) -> bool:
+        return analysis_id in self._rows
+
+    def vector(self, analysis_id: int) -> Optional["np.ndarray"]:
+        row = self._rows.get(analysis_id)
+        return None if row is None else self._vectors[row]
+
+    def add(self, ids: Sequence[int], vectors: "np.ndarray") -> None:
+        """Append vectors; ids already in the index are skipped."""
+        import numpy as np
+
+        keep = [i for i, analysis_id in enumerate(ids) if analysis_id not in self._rows]
+        if not keep:
+            return
+        ids = [ids[i] for i in keep]
+        vectors = vectors[keep]
+        needed = self.size + len(ids)
+        if needed > len(self._ids):
+            capacity = max(needed, 2 * len(self._ids))
+            self._vectors = np.resize(self._vectors, (capacity, self.dim))
+            self._ids = np.resize(self._ids, capacity)
+        start = self.size
+        self._vectors[start:needed] = vectors
+        self._ids[start:needed] = ids
+        self._rows.update((analysis_id, start + i) for i, analysis_id in enumerate(ids))
+        self.size = needed
+
+        if self.centroids is not None:
+            self._assign(range(start, needed))
+
+    @property
+    def needs_training(self) -> bool:
+        return self.centroids is None and bool(self.lists) and self.size >= self.ivf_min_rows
+
+    def train(self, iterations: int = 10, seed: int = 0) -> None:
+        """Fit and install IVF buckets in the calling thread (tests, offline tools)."""
+        size = self.size
+        self.install(*self.fit(size, iterations, seed), size)
+
+    def fit(self, size: int, iterations: int = 10, seed: int = 0) -> Tuple["np.ndarray", List["np.ndarray"]]:
+        """Spherical k-means centroids and per-bucket row arrays for the first `size` rows.
+
+        Only reads rows below `size`, which `add` never rewrites (growing
+        replaces the array), so it can run in a worker thread while rows
+        are appended.
+        """
+        import numpy as np
+
+        vectors = self._vectors
+        lists = min(self.lists, size)
+        rng = np.random.default_rng(seed)
+        sample = vectors[rng.choice(size, size=min(size, lists * 64), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            filled = np.bincount(assignment, minlength=lists) > 0
+            # Empty clusters keep their previous centroid.
+            centroids[filled] = _normalize(sums[filled])
+        nearest = np.concatenate([
+            np.argmax(vectors[start:min(start + 65536, size)] @ centroids.T, axis=1)
+            for start in range(0, size, 65536)
+        ])
+        order = np.argsort(nearest, kind="stable")
+        bounds = np.cumsum(np.bincount(nearest, minlength=lists))[:-1]
+        return centroids, np.split(order, bounds)
+
+    def install(self, centroids: "np.ndarray", buckets: List["np.ndarray"], size: int) -> None:
+        """Switch to IVF search with buckets from `fit(size)`; later rows are bucketed here."""
+        self.centroids = centroids
+        self._buckets = [rows.tolist() for rows in buckets]
+        self._bucket_arrays = list(buckets)
+        if size < self.size:
+            self._assign(range(size, self.size))
+
+    def _assign(self, rows: Iterable[int]) -> None:
+        import numpy as np
+
+        rows = np.fromiter(rows, dtype=np.int64)
+        for start in range(0, len(rows), 65536):
+            chunk = rows[start:start + 65536]
+            nearest = np.argmax(self._vectors[chunk] @ self.centroids.T, axis=1)
+            for row, bucket in zip(chunk.tolist(), nearest.tolist()):
+                self._buckets[bucket].append(row)
+                self._bucket_arrays[bucket] = None
+
+    def _candidates(self, query: "np.ndarray") -> Optional["np.ndarray"]:
+        """Rows of the probed IVF buckets, or None to scan everything."""
+        import numpy as np
+
+        if self.centroids is None:
+            return None
+        probes = min(self.probes, len(self.centroids))
+        nearest = np.argpartition(-(self.centroids @ query), probes - 1)[:probes]
+        arrays = []
+        for bucket in nearest.tolist():
+            if self._bucket_arrays[bucket] is None:
+                self._bucket_arrays[bucket] = np.asarray(self._buckets[bucket], dtype=np.int64)
+            arrays.append(self._bucket_arrays[bucket])
+        return np.concatenate(arrays)
+
+    def search(self, query: "np.ndarray", k: int = 10,
+               exclude: Optional[int] = None) -> List[Tuple[int, float]]:
+        """The k most similar (analysis_id, cosine score) pairs, best first."""
+        import numpy as np
+
+        rows = self._candidates(query)
+        if rows is None:
+            scores = self._vectors[:self.size] @ query
+            rows = np.arange(self.size)
+        else:
+            scores = self._vectors[rows] @ query
+        if exclude is not None and exclude in self._rows:
+            keep = rows != self._rows[exclude]
+            rows, scores = rows[keep], scores[keep]
+        if not len(rows):
+            return []
+        k = min(k, len(rows))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(self._ids[rows[i]]), float(scores[i])) for i in top]
+
+
+_index: Optional[VectorIndex] = None
+_lock: Optional[asyncio.Lock] = None
+_training_tasks = set()
+
+
+def _get_lock() -> asyncio.Lock:
+    global _lock
+    if _lock is None:
+        _lock = asyncio.Lock()
+    return _lock
+
+
+def reset_index() -> None:
+    """Forget the loaded index; the next query reloads it from the database."""
+    global _index, _lock
+    _index = None
+    _lock = None
+
+
+async def get_index() -> VectorIndex:
+    """The vector index, loaded from analysis_embeddings on first use."""
+    global _index
+    async with _get_lock():
+        if _index is None:
+            import numpy as np
+
+            index = None
+            async for chunk in AnalysisEmbedding.iter_chunks(embedding_model()):
+                vectors = np.stack([np.frombuffer(vector, dtype=np.float32) for _, vector in chunk])
+                if index is None:
+                    index = VectorIndex(vectors.shape[1])
+                index.add([analysis_id for analysis_id, _ in chunk], vectors)
+            _index = index or VectorIndex(EMBEDDING_DIM)
+            train_in_background(_index)
+        return _index
+
+
+def train_in_background(index: VectorIndex) -> None:
+    """Start IVF training in a worker thread if `index` has grown large enough.
+
+    Until it finishes, queries keep scanning every row; the trained buckets
+    are swapped in under the index lock.
+    """
+    if not index.needs_training or index.training:
+        return
+    index.training = True
+    task = asyncio.create_task(_train(index))
+    _training_tasks.add(task)
+    task.add_done_callback(_training_tasks.discard)
+
+
+async def _train(index: VectorIndex) -> None:
+    try:
+        size = index.size
+        centroids, buckets = await asyncio.to_thread(index.fit, size)
+        async with _get_lock():
+            index.install(centroids, buckets, size)
+    except Exception as e:
+        log_event("vector_index.train_failed", sample_rate=1.0, error=f"{type(e).__name__}: {e}")
+    finally:
+        index.training = False
+
+
+async def index_analyses(entries: List[Tuple[int, str]]) -> int:
+    """Embed and store (analysis_id, text) pairs and add them to the loaded index.
+
+    Called by Analysis.save(); failures are logged rather than raised, and
+    `python -m app.db.backfill --embeddings` fills in what was missed.
+    Returns the number of analyses indexed.
+    """
+    if not entries:
+        return 0
+    try:
+        vectors = await embed([text for _, text in entries])
+        if vectors is None:
+            return 0
+        ids = [analysis_id for analysis_id, _ in entries]
+        await AnalysisEmbedding.put_many(
+            embedding_model(), [(analysis_id, vector.tobytes()) for analysis_id, vector in zip(ids, vectors)]
+        )
+        # Under the lock, so rows saved while the index loads are not lost.
+        async with _get_lock():
+            if _index is not None and _index.dim == vectors.shape[1]:
+                _index.add(ids, vectors)
+                train_in_background(_index)
+        return len(ids)
+    except Exception as e:
+        log_event("embedding.index_failed", sample_rate=1.0, rows=len(entries),
+                  error=f"{type(e).__name__}: {e}")
+        return 0
+
+
+async def similar_to_text(text: str, k: int = 10) -> Optional[List[Tuple[int, float]]]:
+    """Stored analyses most similar to `text`, or None if it could not be embedded."""
+    vectors = await embed([text])
+    if vectors is None:
+        return None
+    index = await get_index()
+    if index.dim != vectors.shape[1]:
+        return []
+    return index.search(vectors[0], k)
+
+
+async def similar_to_id(analysis_id: int, k: int = 10) -> Optional[List[Tuple[int, float]]]:
+    """Stored analyses most similar to analysis `analysis_id` (excluding itself).
+
+    None means the analysis has no stored embedding.
+    """
+    import numpy as np
+
+    index = await get_index()
+    vector = index.vector(analysis_id)
+    if vector is None:
+        stored = await AnalysisEmbedding.get(embedding_model(), analysis_id)
+        if stored is None:
+            return None
+        vector = np.frombuffer(stored, dtype=np.float32)
+    return index.search(vector, k, exclude=analysis_id)
@@ -0,0 +1,37 @@
+import json
+import zlib
+from typing import AsyncIterator, Optional, Union
+
+from app.db.models import Analysis
+
+EXPORT_CHUNK_ROWS = 1000
+
+
+def parse_since(since: Optional[str]) -> Optional[Union[int, str]]:
+    """`since` is an analysis id when numeric, otherwise a created_at timestamp."""
+    if not since:
+        return None
+    return int(since) if since.isdigit() else since
+
+
+async def iter_ndjson(since: Optional[Union[int, str]] = None, gzip: bool = False,
+                      chunk_size: int = EXPORT_CHUNK_ROWS) -> AsyncIterator[bytes]:
+    """Stream the analyses table as NDJSON, optionally gzip-compressed.
+
+    Lines are buffered per database chunk so each yield is a reasonably
+    sized write while memory stays bounded by chunk_size rows.
+    """
+    compressor = zlib.compressobj(wbits=31) if gzip else None
+    buffer = []
+    async for row in Analysis.iter_rows(since=since, chunk_size=chunk_size):
+        buffer.append(json.dumps(row, ensure_ascii=False))
+        if len(buffer) >= chunk_size:
+            data = ("\n".join(buffer) + "\n").encode("utf-8")
+            buffer.clear()
+            yield compressor.compress(data) if compressor else data
+
+    if buffer:
+        data = ("\n".join(buffer) + "\n").encode("utf-8")
+        yield compressor.compress(data) if compressor else data
+    if compressor:
+        yield compressor.flush()
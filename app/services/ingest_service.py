@@ -0,0 +1,246 @@
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from app.db.compression import content_hash
+from app.db.models import Analysis, stored_content_hashes
+from app.services import openai_service, nlp_service
+from app.services.analysis_service import build_analysis
+from app.services.cache_service import analysis_cache, make_cache_key
+
+_DONE = object()
+
+
+@dataclass
+class IngestStats:
+    read: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    analyzed: int = 0
+    failed: int = 0
+    written: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    def report(self) -> str:
+        elapsed = max(time.monotonic() - self.started_at, 1e-9)
+        return (
+            f"read={self.read} duplicates={self.duplicates} invalid={self.invalid} "
+            f"analyzed={self.analyzed} failed={self.failed} written={self.written} "
+            f"rate={self.written / elapsed:.1f} docs/s"
+        )
+
+
+class Checkpoint:
+    """Tracks the highest line number below which every line is finished.
+
+    Lines finish out of order under concurrency; only the contiguous prefix
+    is recorded so a resumed run never skips unfinished work. Failed lines
+    are never marked done, so the watermark stays below the first failure
+    and a resumed run retries it. Lines past the watermark that were already
+    written are caught by the hash dedupe.
+    """
+
+    def __init__(self, path: Optional[str], source: str):
+        self.path = path
+        self.source = source
+        self.line = 0
+        self._finished: Set[int] = set()
+        if path and os.path.exists(path):
+            with open(path) as f:
+                state = json.load(f)
+            if state.get("source") == source:
+                self.line = state.get("line", 0)
+
+    def mark_done(self, line: int) -> None:
+        self._finished.add(line)
+        while self.line + 1 in self._finished:
+            self.line += 1
+            self._finished.discard(self.line)
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"source": self.source, "line": self.line}, f)
+        os.replace(tmp_path, self.path)
+
+
+class RateLimiter:
+    """Spaces out acquisitions to at most `rate` per second."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+async def read_corpus(path: str, text_field: str = "text",
+                      start_line: int = 0) -> AsyncIterator[Tuple[int, Optional[str]]]:
+    """Yield (line_number, text) for a JSONL or plain-text corpus.
+
+    `.jsonl` files take `text_field` from each object; other files are one
+    document per line. Lines up to `start_line` are skipped; unusable lines
+    yield None so they can still be checkpointed.
+    """
+    is_jsonl = path.endswith(".jsonl") or path.endswith(".ndjson")
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, start=1):
+            if number <= start_line:
+                continue
+            text = line.strip()
+            if is_jsonl and text:
+                try:
+                    value = json.loads(text).get(text_field)
+                    text = value if isinstance(value, str) else None
+                except (json.JSONDecodeError, AttributeError):
+                    text = None
+            yield number, (text or None)
+            if number % 1000 == 0:
+                # Let the rest of the pipeline run between reads.
+                await asyncio.sleep(0)
+
+
+async def ingest(path: str, concurrency: int = 8, rate: float = 5.0, batch_size: int = 100,
+                 flush_seconds: float = 2.0, text_field: str = "text",
+                 checkpoint_path: Optional[str] = None, report_seconds: float = 5.0,
+                 dedupe_batch: int = 200) -> IngestStats:
+    """Analyze a corpus file and store it, without the HTTP server.
+
+    Stages are connected by bounded queues, so a slow stage (usually the LLM)
+    pauses the reader instead of buffering the corpus in memory:
+
+        read -> dedupe -> analyze (concurrency, rate/s) -> keywords + write (batch_size)
+
+    Texts already stored (same document content hash) or in the analysis
+    cache are skipped. Rows saved before the documents table existed are
+    only recognized after `python -m app.db.storage compact`.
+    """
+    stats = IngestStats()
+    checkpoint = Checkpoint(checkpoint_path, os.path.abspath(path))
+    limiter = RateLimiter(rate)
+    analyze_queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 4)
+    write_queue: asyncio.Queue = asyncio.Queue(maxsize=batch_size * 2)
+    # Cache key being analyzed -> (line, text) of duplicates waiting on it.
+    in_flight: Dict[str, List[Tuple[int, str]]] = {}
+
+    async def dedupe(pending):
+        keys = [make_cache_key(text) for _, text in pending]
+        hashes = [content_hash(text) for _, text in pending]
+        known = await analysis_cache.get_many(keys)
+        stored = await stored_content_hashes(hashes)
+        for (line, text), key, text_hash in zip(pending, keys, hashes):
+            if key in known or text_hash in stored:
+                stats.duplicates += 1
+                checkpoint.mark_done(line)
+            elif key in in_flight:
+                # Finishes with its leader, or takes over if the leader fails.
+                in_flight[key].append((line, text))
+            else:
+                in_flight[key] = []
+                await analyze_queue.put((line, key, text))
+
+    async def reader():
+        pending = []
+        async for line, text in read_corpus(path, text_field, checkpoint.line):
+            stats.read += 1
+            if text is None:
+                stats.invalid += 1
+                checkpoint.mark_done(line)
+                continue
+            pending.append((line, text))
+            if len(pending) >= dedupe_batch:
+                await dedupe(pending)
+                pending = []
+        if pending:
+            await dedupe(pending)
+        for _ in range(concurrency):
+            await analyze_queue.put(_DONE)
+
+    async def analyzer():
+        while True:
+            item = await analyze_queue.get()
+            if item is _DONE:
+                await write_queue.put(_DONE)
+                return
+            line, key, text = item
+            while True:
+                await limiter.acquire()
+                try:
+                    result = await openai_service.analyze_text(text)
+                except Exception as e:
+                    # Non-retryable API errors (e.g. a 400) are raised, not
+                    # returned; they fail this document, not the whole run.
+                    result = {"error": f"{type(e).__name__}: {e}"}
+                if "error" not in result:
+                    break
+                # The failed line stays unfinished for a resumed run; a
+                # waiting duplicate is analyzed in its place.
+                stats.failed += 1
+                if not in_flight[key]:
+                    del in_flight[key]
+                    break
+                line, text = in_flight[key].pop(0)
+            if "error" in result:
+                continue
+            stats.analyzed += 1
+            await write_queue.put((line, key, text, result))
+
+    async def write(batch):
+        keywords = await nlp_service.extract_keywords_many([text for _, _, text, _ in batch])
+        analyses, cache_entries = [], []
+        for (line, key, text, result), nlp_response in zip(batch, keywords):
+            analyses.append(build_analysis(text, result, nlp_response))
+            cache_entries.append((key, {**result, "keywords": nlp_response}))
+        await Analysis.save_many(analyses)
+        await analysis_cache.set_many(cache_entries)
+        for line, key, _, _ in batch:
+            checkpoint.mark_done(line)
+            for duplicate_line, _ in in_flight.pop(key, []):
+                stats.duplicates += 1
+                checkpoint.mark_done(duplicate_line)
+        stats.written += len(batch)
+        checkpoint.save()
+
+    async def writer():
+        batch = []
+        remaining = concurrency
+        while remaining:
+            try:
+                item = await asyncio.wait_for(write_queue.get(), timeout=flush_seconds)
+            except asyncio.TimeoutError:
+                item = None
+            if item is _DONE:
+                remaining -= 1
+            elif item is not None:
+                batch.append(item)
+            if batch and (item is None or len(batch) >= batch_size or not remaining):
+                await write(batch)
+                batch = []
+
+    async def reporter():
+        while True:
+            await asyncio.sleep(report_seconds)
+            print(stats.report(), flush=True)
+
+    progress = asyncio.create_task(reporter())
+    try:
+        await asyncio.gather(reader(), writer(), *(analyzer() for _ in range(concurrency)))
+    finally:
+        progress.cancel()
+        checkpoint.save()
+    print(stats.report(), flush=True)
+    return stats
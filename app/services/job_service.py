@@ -0,0 +1,184 @@
+import asyncio
+import os
+import random
+import time
+import uuid
+from typing import AsyncIterator, Dict, List, Optional
+
+from app.db.models import Job
+from app.services import analysis_service, backend_service
+from app.services.metrics_service import log_event
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+# Leases are renewed every third of this while a job runs, so it only bounds
+# how long a crashed worker's job waits before another worker picks it up.
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "2"))
+# Idle workers re-check the table this often (new jobs from this process
+# wake them immediately; this covers other processes and retries coming due).
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "1"))
+
+
+class JobWorkerPool:
+    """Background tasks that run queued analyses from the `jobs` table."""
+
+    def __init__(self, concurrency: int = JOB_WORKERS, lease_seconds: float = JOB_LEASE_SECONDS,
+                 max_attempts: int = JOB_MAX_ATTEMPTS, poll_seconds: float = JOB_POLL_SECONDS):
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.poll_seconds = poll_seconds
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        """Cancel the workers and hand their unfinished jobs back to the queue."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        released = await Job.release(self.owner)
+        if released:
+            log_event("jobs.released", sample_rate=1.0, count=released)
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    async def _worker(self) -> None:
+        while True:
+            # Cleared before claiming so a job queued meanwhile still wakes us.
+            self._wakeup.clear()
+            try:
+                jobs = await Job.claim(self.owner, self.lease_seconds, max_attempts=self.max_attempts)
+            except Exception as e:
+                log_event("jobs.claim_failed", sample_rate=1.0, error=f"{type(e).__name__}: {e}")
+                jobs = []
+            if not jobs:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                await self.run(jobs[0])
+            except Exception as e:
+                # E.g. the database was unavailable for complete()/fail(); the
+                # lease expires and claim() retries or fails the job; the worker
+                # carries on.
+                log_event("jobs.run_failed", sample_rate=1.0, job_id=jobs[0]["id"],
+                          error=f"{type(e).__name__}: {e}")
+
+    async def run(self, job: dict) -> None:
+        """Process one claimed job, renewing its lease while it runs.
+
+        If the lease cannot be renewed, the analysis is cancelled and the
+        attempt fails, rather than running on while another worker may
+        claim the job.
+        """
+        work = asyncio.create_task(analysis_service.analyze_and_store(job["input_text"], job["backend"]))
+        heartbeat = asyncio.create_task(self._renew(job["id"]))
+        try:
+            await asyncio.wait((work, heartbeat), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            heartbeat.cancel()
+            lease_failed = not work.done()
+            work.cancel()
+
+        if lease_failed:
+            # The heartbeat finished first: renewal raised or the lease was lost.
+            await asyncio.gather(work, return_exceptions=True)
+            failure = heartbeat.exception()
+            error = f"Lease renewal failed: {type(failure).__name__}: {failure}" if failure else "Lease lost"
+            log_event("jobs.heartbeat_failed", sample_rate=1.0, job_id=job["id"], error=error)
+        elif work.exception() is not None:
+            error = f"{type(work.exception()).__name__}: {work.exception()}"
+        else:
+            result = work.result()
+            error = result.get("error")
+
+        if error is None:
+            await Job.complete(job["id"], self.owner, result)
+        elif job["attempts"] < self.max_attempts:
+            delay = random.uniform(0, JOB_RETRY_BASE_SECONDS * 2 ** (job["attempts"] - 1))
+            await Job.fail(job["id"], self.owner, error, retry_at=time.time() + delay)
+        else:
+            await Job.fail(job["id"], self.owner, error)
+        _notify_waiters(job["id"])
+
+    async def _renew(self, job_id: str) -> None:
+        """Extend the lease until cancelled; returns if the lease was lost."""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not await Job.renew(job_id, self.owner, self.lease_seconds):
+                return
+
+
+_pool: Optional[JobWorkerPool] = None
+_waiters: Dict[str, asyncio.Event] = {}
+
+
+def start_job_workers(concurrency: int = JOB_WORKERS) -> None:
+    """Start the job workers (called from the app lifespan; no-op when 0)."""
+    global _pool
+    if _pool is None and concurrency > 0:
+        _pool = JobWorkerPool(concurrency)
+        _pool.start()
+
+
+async def stop_job_workers() -> None:
+    global _pool
+    if _pool is not None:
+        pool, _pool = _pool, None
+        await pool.stop()
+
+
+async def enqueue(text: str, backend: Optional[str] = None) -> dict:
+    """Queue `text` for analysis and return {"job_id", "status"} immediately."""
+    try:
+        backend_service.select_backend(text, backend)
+    except ValueError as e:
+        return {"error": str(e)}
+    job_id = uuid.uuid4().hex
+    await Job.create(job_id, text, backend)
+    if _pool is not None:
+        _pool.notify()
+    return {"job_id": job_id, "status": "queued"}
+
+
+def _notify_waiters(job_id: str) -> None:
+    event = _waiters.pop(job_id, None)
+    if event is not None:
+        event.set()
+
+
+async def watch(job_id: str, poll_seconds: float = JOB_POLL_SECONDS) -> AsyncIterator[dict]:
+    """Yield the job each time its status changes, ending at a final state.
+
+    Jobs finished by this process wake the watcher at once; jobs run by
+    another process are seen on the next poll.
+    """
+    last_status = None
+    try:
+        while True:
+            event = _waiters.setdefault(job_id, asyncio.Event())
+            job = await Job.get(job_id)
+            if job is None:
+                yield {"error": "Job not found"}
+                return
+            if job["status"] != last_status:
+                last_status = job["status"]
+                yield job
+            if job["status"] in Job.TERMINAL:
+                return
+            try:
+                await asyncio.wait_for(event.wait(), timeout=poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        # Other watchers of the same job fall back to polling.
+        _waiters.pop(job_id, None)
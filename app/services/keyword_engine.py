@@ -0,0 +1,136 @@
+import os
+from collections import Counter
+from itertools import islice
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from nltk.tag.perceptron import PerceptronTagger
+
+NLP_TOP_K = int(os.getenv("NLP_TOP_K", "3"))
+NLP_LEMMATIZE = os.getenv("NLP_LEMMATIZE", "0") == "1"
+NLP_STOPWORDS = os.getenv("NLP_STOPWORDS", "0") == "1"
+# Tag decisions remembered per (word, neighbours, previous tags) context.
+NLP_TAG_MEMO_SIZE = int(os.getenv("NLP_TAG_MEMO_SIZE", "100000"))
+
+
+class KeywordEngine:
+    """Most common nouns per text, with NLTK models loaded once.
+
+    Tokenization and tagging match nltk.word_tokenize + nltk.pos_tag exactly;
+    the perceptron is evaluated by a specialised loop instead of the
+    generic feature dict, and its decisions are memoized by context since
+    the same (word, neighbours, previous tags) always gets the same tag.
+    Nouns are streamed into the counter rather than collected first.
+    """
+
+    def __init__(self, top_k: int = NLP_TOP_K, lemmatize: bool = NLP_LEMMATIZE,
+                 stopwords: bool = NLP_STOPWORDS, tagger: Optional["PerceptronTagger"] = None,
+                 memo_size: int = NLP_TAG_MEMO_SIZE):
+        # NLTK is imported here rather than at module level: it is slow to
+        # import and only needed once an engine is built.
+        from nltk.tag.perceptron import PerceptronTagger
+        from nltk.tokenize.destructive import NLTKWordTokenizer
+
+        self.top_k = top_k
+        self.memo_size = memo_size
+        self.tagger = tagger or PerceptronTagger()
+        self._weights = self.tagger.model.weights
+        self._classes = sorted(self.tagger.model.classes)
+        self._memo = {}
+        self._sentences = None
+        self._words = NLTKWordTokenizer().tokenize
+        self._lemmatize = None
+        if lemmatize:
+            from nltk.stem import WordNetLemmatizer
+            self._lemmatize = WordNetLemmatizer().lemmatize
+        self._stopwords = frozenset()
+        if stopwords:
+            from nltk.corpus import stopwords as corpus
+            self._stopwords = frozenset(corpus.words("english"))
+
+    @property
+    def tagdict(self) -> dict:
+        return self.tagger.tagdict
+
+    def tokenize(self, text: str) -> List[str]:
+        """Same tokens as nltk.word_tokenize(text.lower())."""
+        if self._sentences is None:
+            from nltk.tokenize import PunktTokenizer
+            self._sentences = PunktTokenizer("english").tokenize
+        return [token for sentence in self._sentences(text.lower()) for token in self._words(sentence)]
+
+    def tag(self, tokens: List[str]) -> Iterator[Tuple[str, str]]:
+        """Yield (word, tag) pairs identical to PerceptronTagger.tag(tokens)."""
+        tagdict = self.tagger.tagdict
+        normalize = self.tagger.normalize
+        start, end = self.tagger.START, self.tagger.END
+        context = start + [normalize(word) for word in tokens] + end
+        prev, prev2 = start
+        for i, word in enumerate(tokens, start=len(start)):
+            tag = tagdict.get(word)
+            if not tag:
+                tag = self._predict(word, context, i, prev, prev2)
+            yield word, tag
+            prev2, prev = prev, tag
+
+    def _predict(self, word, context, i, prev, prev2) -> str:
+        key = (word, prev, prev2, context[i - 2], context[i - 1], context[i + 1], context[i + 2])
+        tag = self._memo.get(key)
+        if tag is not None:
+            return tag
+
+        # The feature strings of PerceptronTagger._get_features, in its order,
+        # so scores are summed in the same order and ties break the same way.
+        current, before = context[i], context[i - 1]
+        features = (
+            "bias",
+            "i suffix " + word[-3:],
+            "i pref1 " + (word[0] if word else ""),
+            "i-1 tag " + prev,
+            "i-2 tag " + prev2,
+            "i tag+i-2 tag " + prev + " " + prev2,
+            "i word " + current,
+            "i-1 tag+i word " + prev + " " + current,
+            "i-1 word " + before,
+            "i-1 suffix " + before[-3:],
+            "i-2 word " + context[i - 2],
+            "i+1 word " + context[i + 1],
+            "i+1 suffix " + context[i + 1][-3:],
+            "i+2 word " + context[i + 2],
+        )
+        scores = dict.fromkeys(self._classes, 0.0)
+        weights = self._weights
+        for feature in features:
+            feature_weights = weights.get(feature)
+            if feature_weights:
+                for label, weight in feature_weights.items():
+                    scores[label] += weight
+        tag = max(self._classes, key=lambda label: (scores[label], label))
+
+        if len(self._memo) >= self.memo_size:
+            self._memo.clear()
+        self._memo[key] = tag
+        return tag
+
+    def nouns(self, tagged: Iterable[Tuple[str, str]]) -> Iterator[str]:
+        """Noun tokens from tagged pairs, lemmatized and filtered as configured."""
+        stopwords, lemmatize = self._stopwords, self._lemmatize
+        for word, tag in tagged:
+            if tag[:2] != "NN":
+                continue
+            if lemmatize is not None:
+                word = lemmatize(word, pos="n")
+            if word not in stopwords:
+                yield word
+
+    def count_nouns(self, tokens: List[str], start: int = 0, end: Optional[int] = None) -> Counter:
+        """Noun counts among tokens[start:end], tagged with the full list as context."""
+        return Counter(self.nouns(islice(self.tag(tokens), start, end)))
+
+    def extract(self, text: str) -> List[str]:
+        """The top_k most common nouns of `text`."""
+        return [word for word, _ in self.count_nouns(self.tokenize(text)).most_common(self.top_k)]
+
+    def extract_many(self, texts: Iterable[str]) -> List[List[str]]:
+        """extract() for many texts, sharing the tag memo across them."""
+        return [self.extract(text) for text in texts]
@@ -0,0 +1,103 @@
+import math
+import re
+from collections import Counter
+from typing import List, Optional
+
+from app.services.long_text_service import split_sentences
+
+# Bump whenever the output of analyze_local changes so cached results are not reused.
+LOCAL_VERSION = "1"
+SUMMARY_SENTENCES = 2
+TOPIC_COUNT = 3
+# Longest sentence considered for the summary (estimated tokens).
+MAX_SENTENCE_TOKENS = 120
+# NLTK data needed by the local backend: download name -> data path.
+NLTK_RESOURCES = {
+    "stopwords": "corpora/stopwords",
+    "vader_lexicon": "sentiment/vader_lexicon.zip",
+}
+
+_WORD = re.compile(r"[a-z][a-z'-]*[a-z]")
+
+_stopwords = None
+_sentiment_analyzer = None
+
+
+def _get_stopwords() -> frozenset:
+    global _stopwords
+    if _stopwords is None:
+        from nltk.corpus import stopwords
+        _stopwords = frozenset(stopwords.words("english"))
+    return _stopwords
+
+
+def _get_sentiment_analyzer():
+    global _sentiment_analyzer
+    if _sentiment_analyzer is None:
+        from nltk.sentiment.vader import SentimentIntensityAnalyzer
+        _sentiment_analyzer = SentimentIntensityAnalyzer()
+    return _sentiment_analyzer
+
+
+def _terms(sentence: str, stopwords: frozenset) -> List[str]:
+    return [word for word in _WORD.findall(sentence.lower()) if word not in stopwords]
+
+
+def _title(text: str) -> Optional[str]:
+    """A short first line without sentence punctuation reads as a title."""
+    first, _, rest = text.strip().partition("\n")
+    first = first.strip()
+    if rest.strip() and first and len(first) <= 80 and first[-1] not in ".!?:;,":
+        return first
+    return None
+
+
+def sentiment_label(text: str) -> str:
+    """positive/neutral/negative from the VADER compound score."""
+    compound = _get_sentiment_analyzer().polarity_scores(text)["compound"]
+    if compound >= 0.05:
+        return "positive"
+    if compound <= -0.05:
+        return "negative"
+    return "neutral"
+
+
+def analyze_local(text: str) -> dict:
+    """Analyze `text` on the CPU, in the same shape as the LLM analysis.
+
+    Sentences are the documents for TF-IDF: topics are the highest-weighted
+    terms, and the summary is the best-scoring sentences in text order.
+    """
+    stopwords = _get_stopwords()
+    title = _title(text)
+    body = text.strip()[len(title):] if title else text
+    sentences = split_sentences(body, MAX_SENTENCE_TOKENS)
+    terms = [_terms(sentence, stopwords) for sentence in sentences]
+
+    frequency = Counter()
+    document_frequency = Counter()
+    for sentence_terms in terms:
+        frequency.update(sentence_terms)
+        document_frequency.update(set(sentence_terms))
+    count = len(sentences)
+    weights = {
+        term: tf * (math.log((1 + count) / (1 + document_frequency[term])) + 1)
+        for term, tf in frequency.items()
+    }
+
+    topics = [term for term, _ in sorted(weights.items(), key=lambda item: -item[1])[:TOPIC_COUNT]]
+
+    # Length-normalized so long sentences do not win on term count alone.
+    scores = [
+        sum(weights[term] for term in sentence_terms) / math.sqrt(len(sentence_terms)) if sentence_terms else 0.0
+        for sentence_terms in terms
+    ]
+    best = sorted(range(count), key=lambda i: -scores[i])[:SUMMARY_SENTENCES]
+    summary = " ".join(sentences[i] for i in sorted(best))
+
+    return {
+        "summary": summary,
+        "title": title,
+        "key_topics": topics,
+        "sentiment": sentiment_label(text),
+    }
@@ -0,0 +1,142 @@
+import asyncio
+import json
+import os
+import re
+import zlib
+from typing import List, Optional
+
+from app.services import openai_service
+from app.services.cache_service import AnalysisCache, make_cache_key
+from app.services.openai_service import estimate_tokens
+
+# Chunks are cut at content-defined sentence boundaries between
+# CHUNK_MAX_TOKENS / 2 and CHUNK_MAX_TOKENS (estimated) tokens.
+CHUNK_MAX_TOKENS = int(os.getenv("OPENAI_CHUNK_MAX_TOKENS", "2000"))
+# On average every CHUNK_BOUNDARY_EVERY-th sentence is a boundary candidate.
+CHUNK_BOUNDARY_EVERY = 4
+# Partial analyses merged per reduce call.
+REDUCE_FANIN = int(os.getenv("OPENAI_REDUCE_FANIN", "20"))
+
+CHUNK_PROMPT_VERSION = f"{openai_service.PROMPT_VERSION}-chunk"
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+
+# Per-chunk results, so re-analyzing an edited document only sends the
+# chunks whose text changed.
+chunk_cache = AnalysisCache()
+
+
+def split_sentences(text: str, max_tokens: int) -> List[str]:
+    """Sentence-ish pieces of `text`; pieces over max_tokens are cut on words."""
+    pieces = []
+    for sentence in _SENTENCE_END.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if estimate_tokens(sentence) <= max_tokens:
+            pieces.append(sentence)
+            continue
+        current, length = [], 0
+        for word in sentence.split():
+            # Same estimate as estimate_tokens, kept incremental.
+            if current and (length + 1 + len(word)) // 4 + 1 > max_tokens:
+                pieces.append(" ".join(current))
+                current, length = [], 0
+            length += len(word) + (1 if current else 0)
+            current.append(word)
+        if current:
+            pieces.append(" ".join(current))
+    return pieces
+
+
+def split_into_chunks(text: str, max_tokens: Optional[int] = None) -> List[str]:
+    """Split `text` into chunks of whole sentences.
+
+    Boundaries depend on sentence content (a stable hash), not on position,
+    so an edit in one place only changes the chunks around it; the chunking
+    falls back into step at the next boundary sentence after the edit.
+    """
+    max_tokens = max_tokens or CHUNK_MAX_TOKENS
+    min_tokens = max_tokens // 2
+    chunks, current, current_tokens = [], [], 0
+    for sentence in split_sentences(text, max_tokens):
+        tokens = estimate_tokens(sentence)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(sentence)
+        current_tokens += tokens
+        if current_tokens >= min_tokens and zlib.crc32(sentence.encode("utf-8")) % CHUNK_BOUNDARY_EVERY == 0:
+            chunks.append(" ".join(current))
+            current, current_tokens = [], 0
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+async def analyze_chunks(chunks: List[str]) -> List[dict]:
+    """Map step: analyze every chunk concurrently, reusing cached chunk results."""
+    keys = [make_cache_key(chunk, prompt_version=CHUNK_PROMPT_VERSION) for chunk in chunks]
+    cached = await chunk_cache.get_many(keys)
+
+    missing = [i for i, key in enumerate(keys) if key not in cached]
+    fresh = await asyncio.gather(*(openai_service.analyze_single(chunks[i]) for i in missing))
+    results = {keys[i]: result for i, result in zip(missing, fresh)}
+    await chunk_cache.set_many([(key, result) for key, result in results.items() if "error" not in result])
+
+    return [cached.get(key) or results[key] for key in keys]
+
+
+async def reduce_partials(partials: List[dict]) -> dict:
+    """Reduce step: merge partial analyses (in document order) into one.
+
+    Large documents are merged REDUCE_FANIN partials at a time, recursively.
+    """
+    if len(partials) == 1:
+        return partials[0]
+    if len(partials) > REDUCE_FANIN:
+        groups = [partials[i:i + REDUCE_FANIN] for i in range(0, len(partials), REDUCE_FANIN)]
+        merged = await asyncio.gather(*(reduce_partials(group) for group in groups))
+        failed = [m for m in merged if "error" in m]
+        return failed[0] if failed else await reduce_partials(list(merged))
+
+    parts = "\n".join(
+        json.dumps({
+            "part": i + 1,
+            "summary": p.get("summary", ""),
+            "title": p.get("title"),
+            "key_topics": p.get("key_topics", []),
+            "sentiment": p.get("sentiment", ""),
+        })
+        for i, p in enumerate(partials)
+    )
+    prompt = f"""
+    The following are analyses of consecutive parts of one document, in order.
+    Combine them into a single analysis of the whole document and return a JSON response with exactly this format:
+    {{
+      "summary": "1-2 sentence summary here",
+      "title": "title if available, or null",
+      "key_topics": ["topic1", "topic2", "topic3"],
+      "sentiment": "positive/neutral/negative"
+    }}
+
+    Parts:
+    {parts}
+    """
+    return await openai_service.complete_json(prompt)
+
+
+async def analyze_long_text(text: str) -> dict:
+    """Map-reduce analysis for texts too long for one prompt.
+
+    Returns the same shape as analyze_text. If any chunk fails the whole
+    analysis fails, but the chunks that succeeded stay cached for the retry.
+    """
+    chunks = split_into_chunks(text)
+    partials = await analyze_chunks(chunks)
+
+    failed = [p for p in partials if "error" in p]
+    if failed:
+        return {"error": f"Failed to analyze {len(failed)} of {len(chunks)} chunks: {failed[0]['error']}"}
+
+    return await reduce_partials(partials)
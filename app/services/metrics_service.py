@@ -0,0 +1,238 @@
+import asyncio
+import contextlib
+import contextvars
+import hashlib
+import json
+import os
+import random
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Fraction of requests whose structured log line is written (0 = none).
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.01"))
+# How often the event-loop lag probe wakes up.
+LOOP_LAG_INTERVAL_SECONDS = float(os.getenv("LOOP_LAG_INTERVAL_SECONDS", "0.5"))
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_metrics: List["_Metric"] = []
+_collectors: List[Callable[[], Iterator[str]]] = []
+# perf_counter() at which the current HTTP request arrived (set by the middleware).
+request_started: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("request_started", default=None)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        _metrics.append(self)
+
+    def _key(self, labels: dict) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self) -> Iterator[str]:
+        yield from super().render()
+        for key, value in self.values.items():
+            yield f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        self.values[self._key(labels)] = value
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    @contextlib.contextmanager
+    def track(self, **labels):
+        """Count the block as in flight while it runs."""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # label values -> [per-bucket counts (not cumulative), sum, count]
+        self.values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        entry = self.values.get(key)
+        if entry is None:
+            entry = self.values[key] = [[0] * len(self.buckets), 0.0, 0]
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    @contextlib.contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> Iterator[str]:
+        yield from super().render()
+        for key, (counts, total, count) in self.values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = 'le="' + _number(bound) + '"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.labelnames, key)} {count}"
+
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ("method", "route", "status"))
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being served.")
+STAGE_SECONDS = Histogram(
+    "stage_duration_seconds", "Time spent in each stage of request handling.", ("stage",))
+LLM_IN_FLIGHT = Gauge("llm_requests_in_flight", "Upstream LLM calls awaiting a response.")
+LLM_TOKENS = Counter("llm_tokens_total", "Tokens reported by the LLM API.", ("kind",))
+LOOP_LAG_SECONDS = Histogram(
+    "event_loop_lag_seconds", "How late the event loop ran a timer that was due.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0))
+
+
+def stage(name: str):
+    """Context manager timing one stage into stage_duration_seconds."""
+    return STAGE_SECONDS.time(stage=name)
+
+
+def mark_parsed() -> None:
+    """Record the time from request arrival to the handler (body read and validation)."""
+    started = request_started.get()
+    if started is not None:
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage="parse")
+
+
+def record_usage(usage) -> None:
+    """Count prompt/completion tokens from an OpenAI response `usage` object."""
+    for kind in ("prompt", "completion"):
+        try:
+            LLM_TOKENS.inc(int(getattr(usage, f"{kind}_tokens")), kind=kind)
+        except (AttributeError, TypeError, ValueError):
+            pass
+
+
+def register_collector(collector: Callable[[], Iterator[str]]) -> None:
+    """Add a callable yielding exposition lines computed at scrape time."""
+    _collectors.append(collector)
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    for collector in _collectors:
+        lines.extend(collector())
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing each HTTP request by route template and status."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        request_started.set(start)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=status,
+            )
+
+
+async def monitor_loop_lag(interval: float = LOOP_LAG_INTERVAL_SECONDS) -> None:
+    """Sleep `interval` repeatedly and record how late each wakeup was."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        LOOP_LAG_SECONDS.observe(max(loop.time() - start - interval, 0.0))
+
+
+def log_event(event: str, sample_rate: Optional[float] = None, **fields) -> None:
+    """Write one JSON log line for a sampled fraction of calls.
+
+    Pass sizes and digests rather than payloads; `text_digest` helps with that.
+    """
+    rate = LOG_SAMPLE_RATE if sample_rate is None else sample_rate
+    if rate <= 0 or (rate < 1 and random.random() >= rate):
+        return
+    print(json.dumps({"ts": round(time.time(), 3), "event": event, **fields}), flush=True)
+
+
+def text_digest(text: str) -> str:
+    """Short stable fingerprint for correlating log lines about the same text."""
+    return hashlib.sha256(text.encode()).hexdigest()[:12]
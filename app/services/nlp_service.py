@@ -1,20 +1,186 @@
-import nltk
+import asyncio
+import multiprocessing
+import os
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from app.services.keyword_engine import NLP_LEMMATIZE, NLP_STOPWORDS, NLP_TOP_K, KeywordEngine
+from app.services.metrics_service import stage
 
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt_tab')
-except LookupError:
-    nltk.download('punkt_tab')
+# NLTK data needed by keyword extraction: download name -> data path.
+NLTK_RESOURCES = {
+    "punkt_tab": "tokenizers/punkt_tab",
+    "averaged_perceptron_tagger_eng": "taggers/averaged_perceptron_tagger_eng",
+}
+if NLP_STOPWORDS:
+    NLTK_RESOURCES["stopwords"] = "corpora/stopwords"
+if NLP_LEMMATIZE:
+    NLTK_RESOURCES["wordnet"] = "corpora/wordnet"
+# Missing data fails startup unless NLTK_DOWNLOAD=1 allows fetching it.
+NLTK_DOWNLOAD = os.getenv("NLTK_DOWNLOAD", "0") == "1"
 
-try:
-    nltk.data.find('taggers/averaged_perceptron_tagger_eng')
-except LookupError:
-    nltk.download('averaged_perceptron_tagger_eng')
+# Size of the process pool for keyword extraction; 0 keeps it off the pool.
+NLP_WORKERS = int(os.getenv("NLP_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Texts longer than this are split and tagged in parallel.
+NLP_CHUNK_CHARS = int(os.getenv("NLP_CHUNK_CHARS", "20000"))
+NLP_CHUNK_TOKENS = int(os.getenv("NLP_CHUNK_TOKENS", "2000"))
+
+_executor = None
+_workers = 0
+_engine = None
 
 def extract_three_most_common_nouns(text):
-    words = nltk.word_tokenize(text.lower())
-    tagged = nltk.pos_tag(words)
-    nouns = [word for word, pos in tagged if pos.startswith("NN")]
-    freq = Counter(nouns)
-    return [word for word, _ in freq.most_common(3)]
+    return get_engine().extract(text)
+
+def extract_keywords_batch(texts):
+    """Three most common nouns for each text, using one engine for the batch."""
+    return get_engine().extract_many(texts)
+
+async def extract_keywords(text):
+    """Async extract_three_most_common_nouns that keeps NLTK off the event loop.
+
+    With the process pool running, long texts are cut into chunks that are
+    tagged in parallel and merged; the result is identical to tagging the
+    whole text at once (see _chunk_bounds).
+    """
+    with stage("keywords"):
+        return await _extract_keywords(text)
+
+async def _extract_keywords(text):
+    if _executor is None:
+        return await asyncio.to_thread(extract_three_most_common_nouns, text)
+
+    loop = asyncio.get_running_loop()
+    if len(text) <= NLP_CHUNK_CHARS:
+        return await loop.run_in_executor(_executor, extract_three_most_common_nouns, text)
+
+    windows = await loop.run_in_executor(_executor, _split_for_tagging, text, NLP_CHUNK_TOKENS)
+    counts = await asyncio.gather(*(
+        loop.run_in_executor(_executor, _count_nouns, *window) for window in windows
+    ))
+    # Merging in chunk order keeps first-occurrence order, so most_common
+    # breaks ties exactly as a single Counter over the whole text would.
+    freq = Counter()
+    for count in counts:
+        freq.update(count)
+    return [word for word, _ in freq.most_common(NLP_TOP_K)]
+
+async def extract_keywords_many(texts):
+    """Async extract_keywords_batch, spread across the process pool."""
+    with stage("keywords_batch"):
+        return await _extract_keywords_many(texts)
+
+async def _extract_keywords_many(texts):
+    if _executor is None:
+        return await asyncio.to_thread(extract_keywords_batch, texts)
+
+    loop = asyncio.get_running_loop()
+    size = max(1, -(-len(texts) // _workers))
+    batches = [texts[i:i + size] for i in range(0, len(texts), size)]
+    results = await asyncio.gather(*(
+        loop.run_in_executor(_executor, extract_keywords_batch, batch) for batch in batches
+    ))
+    return [keywords for batch in results for keywords in batch]
+
+def _chunk_bounds(tokens, tagdict, chunk_tokens):
+    """Split points for tagging `tokens` in independent pieces.
+
+    The perceptron tagger only carries state through the previous two tags
+    and the two preceding words. Words found in its tag dictionary are
+    tagged without looking at that state, so after two consecutive tagdict
+    words the tagger is back in a known state. Cutting only at such points
+    (and handing each piece those two words as left context and two words
+    of lookahead) reproduces the whole-text tagging exactly.
+    """
+    chunk_tokens = max(chunk_tokens, 2)
+    bounds = [0]
+    position = chunk_tokens
+    while position < len(tokens):
+        if tokens[position - 2] in tagdict and tokens[position - 1] in tagdict:
+            bounds.append(position)
+            position += chunk_tokens
+        else:
+            position += 1
+    bounds.append(len(tokens))
+    return list(zip(bounds, bounds[1:]))
+
+def _split_for_tagging(text, chunk_tokens):
+    """Tokenize `text` and return (window, start, end) triples for _count_nouns."""
+    engine = get_engine()
+    tokens = engine.tokenize(text)
+    windows = []
+    for start, end in _chunk_bounds(tokens, engine.tagdict, chunk_tokens):
+        left = max(start - 2, 0)
+        windows.append((tokens[left:end + 2], start - left, end - left))
+    return windows
+
+def _count_nouns(window, start, end):
+    """Count nouns among window[start:end], tagging the full window for context."""
+    return get_engine().count_nouns(window, start, end)
+
+def missing_nltk_data(resources=None):
+    """Names of NLTK resources that are not installed locally."""
+    import nltk
+
+    missing = []
+    for name, path in (resources or NLTK_RESOURCES).items():
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            missing.append(name)
+    return missing
+
+def ensure_nltk_data(resources=None, download=None):
+    """Check NLTK data at startup instead of on the first request.
+
+    Raises RuntimeError naming what is missing; the data is only downloaded
+    when `download` (default NLTK_DOWNLOAD) is set.
+    """
+    resources = resources or NLTK_RESOURCES
+    missing = missing_nltk_data(resources)
+    if missing and (NLTK_DOWNLOAD if download is None else download):
+        import nltk
+        for name in missing:
+            nltk.download(name, quiet=True)
+        missing = missing_nltk_data(resources)
+    if missing:
+        raise RuntimeError(
+            f"Missing NLTK data: {', '.join(missing)}. "
+            f"Install it with `python -m nltk.downloader {' '.join(missing)}` or set NLTK_DOWNLOAD=1."
+        )
+
+def get_engine():
+    """The process-wide KeywordEngine, loading the NLTK models on first use."""
+    global _engine
+    if _engine is None:
+        _engine = KeywordEngine()
+    return _engine
+
+def warm_up():
+    """Load the NLTK models before the first request needs them.
+
+    Pool workers load their own copy in _init_worker; this covers the
+    in-process fallback used when the pool is off.
+    """
+    if _executor is None:
+        extract_three_most_common_nouns("warm up the tagger.")
+
+def _init_worker():
+    """Load the tagger and tokenizer models once per worker process."""
+    extract_three_most_common_nouns("warm up the tagger.")
+
+def start_nlp_pool(workers=NLP_WORKERS):
+    """Start the keyword-extraction process pool (no-op when workers is 0)."""
+    global _executor, _workers
+    if _executor is None and workers > 0:
+        _workers = workers
+        _executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+
+def shutdown_nlp_pool():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
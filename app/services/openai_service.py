@@ -1,14 +1,97 @@
-from openai import OpenAI
+import asyncio
+import contextlib
 import os
 from dotenv import load_dotenv
 import json
+from typing import TYPE_CHECKING, AsyncIterator, List, Tuple, Union
+
+from app.services.metrics_service import LLM_IN_FLIGHT, log_event, record_usage, stage
+from app.services.resilience import CircuitBreaker, TokenBucket, backoff_delay, retry_after_seconds
+
+if TYPE_CHECKING:
+  from openai.types.chat import ChatCompletion
 
 load_dotenv()
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+MODEL = "gpt-4o-mini"
+# Bump whenever the prompt below changes so cached results are not reused.
+PROMPT_VERSION = "1"
+EMBEDDING_MODEL = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
+MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "16"))
+TIMEOUT_SECONDS = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "30"))
+# Batch packing: texts up to PACK_MAX_ITEM_TOKENS are grouped into one prompt
+# of at most PACK_TOKEN_BUDGET input tokens and PACK_MAX_ITEMS texts.
+PACK_TOKEN_BUDGET = int(os.getenv("OPENAI_PACK_TOKEN_BUDGET", "3000"))
+PACK_MAX_ITEM_TOKENS = int(os.getenv("OPENAI_PACK_MAX_ITEM_TOKENS", "500"))
+PACK_MAX_ITEMS = int(os.getenv("OPENAI_PACK_MAX_ITEMS", "20"))
+# Texts estimated above LONG_TEXT_TOKENS are analyzed chunk by chunk and the
+# partial results merged (see long_text_service).
+LONG_TEXT_TOKENS = int(os.getenv("OPENAI_LONG_TEXT_TOKENS", "6000"))
+# Transient upstream failures (timeouts, connection errors, 408/409/429/5xx)
+# are retried with jittered exponential backoff, honoring Retry-After.
+MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "3"))
+RETRY_BASE_SECONDS = float(os.getenv("OPENAI_RETRY_BASE_SECONDS", "0.5"))
+RETRY_MAX_SECONDS = float(os.getenv("OPENAI_RETRY_MAX_SECONDS", "8"))
+# A malformed JSON reply is re-asked immediately this many times.
+PARSE_RETRIES = int(os.getenv("OPENAI_PARSE_RETRIES", "1"))
+# Client-side limits per worker; 0 disables them.
+REQUESTS_PER_MINUTE = float(os.getenv("OPENAI_REQUESTS_PER_MINUTE", "0"))
+TOKENS_PER_MINUTE = float(os.getenv("OPENAI_TOKENS_PER_MINUTE", "0"))
+BREAKER_FAILURES = int(os.getenv("OPENAI_BREAKER_FAILURES", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("OPENAI_BREAKER_RESET_SECONDS", "30"))
 
-def analyze_text(text: str):
-  prompt = f"""
+# The openai SDK is slow to import, so the client is built on first use
+# (or by the app lifespan) rather than at import time.
+http_client = None
+client = None
+
+def get_client():
+  """The shared AsyncOpenAI client, created on first call.
+
+  One pooled HTTP client serves every request; keep-alive connections are
+  reused instead of paying a TLS handshake per completion. Retries are
+  handled in _create_completion, so the SDK's own are disabled.
+  """
+  global client, http_client
+  if client is None:
+    import httpx
+    from openai import AsyncOpenAI
+
+    http_client = httpx.AsyncClient(
+      limits=httpx.Limits(
+        max_connections=MAX_CONCURRENCY,
+        max_keepalive_connections=MAX_CONCURRENCY,
+      ),
+      timeout=TIMEOUT_SECONDS,
+    )
+    client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=http_client, max_retries=0)
+  return client
+
+# Caps the number of completions in flight from this worker.
+_semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+request_bucket = TokenBucket(REQUESTS_PER_MINUTE)
+token_bucket = TokenBucket(TOKENS_PER_MINUTE)
+breaker = CircuitBreaker(BREAKER_FAILURES, BREAKER_RESET_SECONDS)
+
+TIMEOUT_ERROR = "LLM request timed out"
+RATE_LIMIT_ERROR = "LLM rate limit exceeded"
+UNAVAILABLE_ERROR = "LLM upstream unavailable"
+CIRCUIT_OPEN_ERROR = "LLM upstream unavailable (circuit open)"
+UPSTREAM_ERRORS = (TIMEOUT_ERROR, RATE_LIMIT_ERROR, UNAVAILABLE_ERROR, CIRCUIT_OPEN_ERROR)
+
+async def analyze_text(text: str):
+  if estimate_tokens(text) > LONG_TEXT_TOKENS:
+    # Imported here: long_text_service builds on this module.
+    from app.services.long_text_service import analyze_long_text
+    return await analyze_long_text(text)
+  return await analyze_single(text)
+
+async def analyze_single(text: str):
+  """Analyze `text` with exactly one completion, whatever its length."""
+  return await complete_json(analysis_prompt(text))
+
+def analysis_prompt(text: str) -> str:
+  return f"""
     Analyze the following text and return a JSON response with exactly this format:
     {{
       "summary": "1-2 sentence summary here",
@@ -21,17 +104,252 @@ def analyze_text(text: str):
     \"\"\"{text}\"\"\"
     """
 
-  response = client.chat.completions.create(
-    model="gpt-4o-mini",
-    messages=[{"role": "user", "content": prompt}],
-    response_format={"type": "json_object"}
-  )
+async def complete_json(prompt: str) -> dict:
+  """Run one JSON-mode completion; failures come back as {"error": ...}."""
+  with stage("llm"):
+    return await _complete_json(prompt)
+
+async def _complete_json(prompt: str) -> dict:
+  for _ in range(PARSE_RETRIES + 1):
+    response = await _create_completion(prompt)
+    if isinstance(response, dict):
+      return response
+
+    content = response.choices[0].message.content
+
+    json_str = content.strip()
+
+    try:
+      return json.loads(json_str)
+    except json.JSONDecodeError:
+      pass
+  return {"error": "Failed to parse JSON response", "raw_response": content}
+
+async def stream_completion(prompt: str) -> AsyncIterator[Union[str, dict]]:
+  """Yield the content of a streamed JSON-mode completion as it arrives.
+
+  Rate limits, retries and the circuit breaker apply until the stream
+  starts. Failures are yielded as a final {"error": ...} dict.
+  """
+  import httpx
+  from openai import APIError
+
+  async with _semaphore:
+    response = await _create_completion(prompt, stream=True)
+    if isinstance(response, dict):
+      yield response
+      return
+    try:
+      async for chunk in response:
+        if chunk.choices and chunk.choices[0].delta.content:
+          yield chunk.choices[0].delta.content
+    except (APIError, httpx.HTTPError) as e:
+      breaker.record_failure()
+      yield {"error": TIMEOUT_ERROR if isinstance(e, httpx.TimeoutException) else UNAVAILABLE_ERROR}
+    finally:
+      await response.close()
+
+async def _create_completion(prompt: str, stream: bool = False) -> Union[dict, "ChatCompletion"]:
+  """One completion with rate limiting, retries and the circuit breaker.
+
+  Returns the SDK response, or an {"error": ...} dict once retries are
+  exhausted or while the circuit is open. Non-transient API errors (bad
+  request, auth) are raised as before. With stream=True the caller holds
+  _semaphore for as long as it reads the stream.
+  """
+  from openai import APIConnectionError, APIStatusError, RateLimitError
+
+  tokens = estimate_tokens(prompt)
+  attempt = 0
+  while True:
+    # A call let through while half-open is the probe; it is handed back
+    # however the attempt ends, so the breaker cannot stay half-open.
+    probe = breaker.state == "half_open"
+    if not breaker.allow():
+      return {"error": CIRCUIT_OPEN_ERROR}
+    try:
+      await request_bucket.acquire()
+      await token_bucket.acquire(tokens)
+      async with (contextlib.nullcontext() if stream else _semaphore):
+        with LLM_IN_FLIGHT.track():
+          response = await get_client().chat.completions.create(
+            model=MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            response_format={"type": "json_object"},
+            timeout=TIMEOUT_SECONDS,
+            **({"stream": True} if stream else {}),
+          )
+    except (APIConnectionError, APIStatusError) as exc:
+      error = _transient_error(exc)
+      if error is None:
+        raise
+      # 429s mean "slow down", not "unhealthy": they back off without
+      # counting towards opening the circuit.
+      if not isinstance(exc, RateLimitError):
+        breaker.record_failure()
+      if attempt >= MAX_RETRIES:
+        return {"error": error}
+      retry_after = retry_after_seconds(getattr(exc, "response", None))
+      delay = backoff_delay(attempt, RETRY_BASE_SECONDS, RETRY_MAX_SECONDS, retry_after)
+    else:
+      breaker.record_success()
+      if not stream:
+        record_usage(response.usage)
+      return response
+    finally:
+      if probe:
+        breaker.release_probe()
+    log_event("llm.retry", sample_rate=1.0, error=error, attempt=attempt + 1,
+              max_retries=MAX_RETRIES, delay=round(delay, 3))
+    await asyncio.sleep(delay)
+    attempt += 1
+
+async def create_embeddings(texts: List[str]) -> Union[List[List[float]], dict]:
+  """Embedding vectors for `texts`, or an {"error": ...} dict on upstream failure.
+
+  Shares the rate limits and circuit breaker with completions but does not
+  retry; callers that persist embeddings can backfill the misses later.
+  """
+  from openai import APIConnectionError, APIStatusError, RateLimitError
 
-  content = response.choices[0].message.content
-    
-  json_str = content.strip()
-    
+  probe = breaker.state == "half_open"
+  if not breaker.allow():
+    return {"error": CIRCUIT_OPEN_ERROR}
   try:
-    return json.loads(json_str)
-  except json.JSONDecodeError:
-    return {"error": "Failed to parse JSON response", "raw_response": content}
\ No newline at end of file
+    await request_bucket.acquire()
+    await token_bucket.acquire(sum(estimate_tokens(text) for text in texts))
+    async with _semaphore:
+      with LLM_IN_FLIGHT.track():
+        response = await get_client().embeddings.create(
+          model=EMBEDDING_MODEL, input=texts, timeout=TIMEOUT_SECONDS
+        )
+  except (APIConnectionError, APIStatusError) as exc:
+    error = _transient_error(exc)
+    if error is None:
+      raise
+    if not isinstance(exc, RateLimitError):
+      breaker.record_failure()
+    return {"error": error}
+  finally:
+    if probe:
+      breaker.release_probe()
+  breaker.record_success()
+  return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+def _transient_error(exc: Exception):
+  """Error message for a retryable upstream failure, or None if not retryable."""
+  from openai import APIConnectionError, APITimeoutError, RateLimitError
+
+  if isinstance(exc, APITimeoutError):
+    return TIMEOUT_ERROR
+  if isinstance(exc, APIConnectionError):
+    return UNAVAILABLE_ERROR
+  if isinstance(exc, RateLimitError):
+    return RATE_LIMIT_ERROR
+  if exc.status_code in (408, 409) or exc.status_code >= 500:
+    return UNAVAILABLE_ERROR
+  return None
+
+def estimate_tokens(text: str) -> int:
+  """Cheap local token estimate (~4 characters per token for English)."""
+  return len(text) // 4 + 1
+
+def pack_texts(texts: List[str]) -> Tuple[List[List[int]], List[int]]:
+  """Split texts into prompt packs and texts that must be analyzed alone.
+
+  Returns (packs, singles) where packs is a list of index lists and singles
+  is a list of indexes into `texts`.
+  """
+  packs, singles = [], []
+  current, current_tokens = [], 0
+  for i, text in enumerate(texts):
+    tokens = estimate_tokens(text)
+    if tokens > PACK_MAX_ITEM_TOKENS:
+      singles.append(i)
+      continue
+    if current and (current_tokens + tokens > PACK_TOKEN_BUDGET or len(current) >= PACK_MAX_ITEMS):
+      packs.append(current)
+      current, current_tokens = [], 0
+    current.append(i)
+    current_tokens += tokens
+  if current:
+    packs.append(current)
+  # A pack of one is just a single call with a bigger prompt.
+  singles.extend(pack[0] for pack in packs if len(pack) == 1)
+  return [pack for pack in packs if len(pack) > 1], singles
+
+async def _analyze_pack(texts: List[str]) -> List[dict]:
+  """Analyze several short texts with one structured-JSON completion."""
+  sections = "\n\n".join(
+    f"Text {i}:\n\"\"\"{text}\"\"\"" for i, text in enumerate(texts)
+  )
+  prompt = f"""
+    Analyze each of the following texts independently and return a JSON response with exactly this format:
+    {{
+      "results": [
+        {{
+          "id": 0,
+          "summary": "1-2 sentence summary here",
+          "title": "title if available, or null",
+          "key_topics": ["topic1", "topic2", "topic3"],
+          "sentiment": "positive/neutral/negative"
+        }}
+      ]
+    }}
+    Return one entry per text, using the number from its "Text N:" header as the id.
+
+    {sections}
+    """
+
+  parsed = await complete_json(prompt)
+  if not isinstance(parsed, dict):
+    parsed = {}
+  if parsed.get("error") in UPSTREAM_ERRORS:
+    # Retrying each text alone would only hit the same failing upstream.
+    return [{"error": parsed["error"]} for _ in texts]
+
+  entries = parsed.get("results", [])
+  if not isinstance(entries, list):
+    entries = []
+
+  by_id = {}
+  for entry in entries:
+    if isinstance(entry, dict) and isinstance(entry.get("id"), int):
+      by_id[entry.pop("id")] = entry
+
+  # Anything the model dropped or mangled is retried on its own.
+  results = [by_id.get(i) for i in range(len(texts))]
+  missing = [i for i, result in enumerate(results) if result is None]
+  retried = await asyncio.gather(*(analyze_text(texts[i]) for i in missing))
+  for i, result in zip(missing, retried):
+    results[i] = result
+  return results
+
+async def analyze_texts(texts: List[str]) -> List[dict]:
+  """Analyze many texts, packing short ones into shared prompts.
+
+  Results are returned in input order; failures are reported per item as
+  {"error": ...} in the same way as analyze_text.
+  """
+  packs, singles = pack_texts(texts)
+  results = [None] * len(texts)
+
+  async def run_pack(indexes):
+    for i, result in zip(indexes, await _analyze_pack([texts[i] for i in indexes])):
+      results[i] = result
+
+  async def run_single(i):
+    results[i] = await analyze_text(texts[i])
+
+  await asyncio.gather(
+    *(run_pack(pack) for pack in packs),
+    *(run_single(i) for i in singles),
+  )
+  return results
+
+async def close_client():
+  """Release pooled upstream connections."""
+  global client, http_client
+  if client is not None:
+    await client.close()
+    client = http_client = None
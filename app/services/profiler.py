@@ -0,0 +1,78 @@
+import os
+import sys
+import threading
+from collections import Counter
+from typing import Optional
+
+# Opt-in: PROFILE_SAMPLER=1 samples the event-loop thread's stack in the background.
+PROFILE_SAMPLER = os.getenv("PROFILE_SAMPLER", "0") == "1"
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "10"))
+# Deepest stack recorded per sample (innermost frames are kept).
+PROFILE_MAX_DEPTH = 64
+
+
+class StackSampler:
+    """Wall-clock sampling profiler for one thread.
+
+    A daemon thread reads the target thread's current frame every
+    `interval` seconds and counts the stacks it sees. The cost is one stack
+    walk per sample, so it can stay on in production at ~10ms intervals.
+    Output is in the folded format read by flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, thread_id: int, interval: float = PROFILE_INTERVAL_MS / 1000):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None and len(stack) < PROFILE_MAX_DEPTH:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def folded(self, reset: bool = False) -> str:
+        """Sampled stacks as `frame;frame;... count` lines, most frequent first."""
+        samples = self.samples
+        if reset:
+            self.samples = Counter()
+        return "".join(f"{stack} {count}\n" for stack, count in samples.most_common())
+
+
+_sampler: Optional[StackSampler] = None
+
+
+def start_profiler() -> None:
+    """Start sampling the calling thread (the event loop) if PROFILE_SAMPLER=1."""
+    global _sampler
+    if PROFILE_SAMPLER and _sampler is None:
+        _sampler = StackSampler(threading.get_ident())
+        _sampler.start()
+
+
+def stop_profiler() -> None:
+    global _sampler
+    if _sampler is not None:
+        sampler, _sampler = _sampler, None
+        sampler.stop()
+
+
+def get_profiler() -> Optional[StackSampler]:
+    return _sampler
@@ -0,0 +1,120 @@
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import httpx
+
+
+class TokenBucket:
+    """Async token bucket refilled continuously at `per_minute` tokens/minute.
+
+    The bucket holds at most one minute's worth of tokens, matching how
+    upstream per-minute limits allow bursts. A limit of 0 disables it.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        if not self.rate:
+            return
+        amount = min(amount, self.capacity)
+        # Waiters queue on the lock, so tokens are handed out in FIFO order.
+        async with self._lock:
+            self._refill()
+            if self._tokens < amount:
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= amount
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class CircuitBreaker:
+    """Fails fast after `failure_threshold` consecutive upstream failures.
+
+    Once open, calls are refused for `reset_seconds`; after that a single
+    probe call is let through and its outcome closes or re-opens the circuit.
+    A probe that ends without either outcome (429, non-transient error,
+    cancellation) must be handed back with `release_probe()`.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._probing or time.monotonic() - self._opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def release_probe(self) -> None:
+        """Let another call probe; no-op once the probe recorded an outcome."""
+        self._probing = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            self._probing = False
+
+
+def backoff_delay(attempt: int, base: float, cap: float,
+                  retry_after: Optional[float] = None) -> float:
+    """Seconds to wait before retry number `attempt` (0-based).
+
+    Uses full jitter (uniform in [0, min(cap, base * 2**attempt)]) so retrying
+    clients spread out; a server-supplied Retry-After takes precedence.
+    """
+    if retry_after is not None:
+        return retry_after + random.uniform(0, base)
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def retry_after_seconds(response: Optional["httpx.Response"]) -> Optional[float]:
+    """Parse `retry-after-ms` / `retry-after` (seconds or HTTP date) headers."""
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if "retry-after-ms" in headers:
+            return max(float(headers["retry-after-ms"]) / 1000, 0.0)
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,145 @@
+import asyncio
+import json
+from typing import AsyncIterator, Iterator, Optional, Tuple
+
+from app.services import backend_service, nlp_service, openai_service
+from app.services.analysis_service import build_analysis
+from app.services.cache_service import analysis_cache, make_cache_key
+
+ANALYSIS_FIELDS = ("summary", "title", "key_topics", "sentiment")
+
+_decoder = json.JSONDecoder()
+_DONE = object()
+
+
+class JSONFieldStream:
+    """Incrementally parses a streamed JSON object into its top-level fields.
+
+    Feed it text as it arrives; each call returns the (key, value) pairs
+    whose values became complete, so they can be sent before the object is.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self._pos = 0
+        self._started = False
+
+    def feed(self, text: str) -> Iterator[Tuple[str, object]]:
+        self.buffer += text
+        buffer = self.buffer
+        while True:
+            pos = self._skip(buffer, self._pos, " \t\r\n,")
+            if not self._started:
+                if pos >= len(buffer):
+                    return
+                if buffer[pos] != "{":
+                    return
+                self._started = True
+                pos = self._skip(buffer, pos + 1, " \t\r\n")
+                self._pos = pos
+                continue
+            try:
+                key, pos = _decoder.raw_decode(buffer, pos)
+                pos = self._skip(buffer, pos, " \t\r\n")
+                if pos >= len(buffer) or buffer[pos] != ":":
+                    return
+                pos = self._skip(buffer, pos + 1, " \t\r\n")
+                value, end = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                return
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and (
+                end >= len(buffer) or buffer[end] not in " \t\r\n,}"
+            ):
+                # More digits (or a fraction/exponent) may still be on the way.
+                return
+            self._pos = end
+            yield key, value
+
+    @staticmethod
+    def _skip(buffer: str, pos: int, chars: str) -> int:
+        while pos < len(buffer) and buffer[pos] in chars:
+            pos += 1
+        return pos
+
+
+async def analyze_stream(text: str, backend: Optional[str] = None) -> AsyncIterator[Tuple[str, dict]]:
+    """Analyze `text` as a series of (event, data) pairs for server-sent events.
+
+    `keywords` comes first: NLTK runs locally while the LLM is still
+    thinking. Each LLM field is sent as a `field` event as soon as its JSON
+    value is complete, and `complete` carries the same response as /analyze
+    once the row has been saved. Failures end the stream with `error`.
+    """
+    try:
+        selected = backend_service.select_backend(text, backend)
+    except ValueError as e:
+        yield "error", {"error": str(e)}
+        return
+
+    cache_key = make_cache_key(text, selected.model, selected.prompt_version)
+    cached = await analysis_cache.get(cache_key)
+    if cached is not None:
+        yield "keywords", {"keywords": cached.get("keywords", [])}
+        for field in ANALYSIS_FIELDS:
+            yield "field", {"field": field, "value": cached.get(field)}
+        yield "complete", cached
+        return
+
+    keywords_task = asyncio.create_task(nlp_service.extract_keywords(text))
+    streamable = (
+        selected.name == "openai"
+        and openai_service.estimate_tokens(text) <= openai_service.LONG_TEXT_TOKENS
+    )
+    chunks: asyncio.Queue = asyncio.Queue()
+
+    async def produce():
+        try:
+            if streamable:
+                async for chunk in openai_service.stream_completion(openai_service.analysis_prompt(text)):
+                    await chunks.put(chunk)
+            else:
+                # Local and map-reduce analyses have no partial output to stream.
+                await chunks.put(await backend_service.analyze(selected, text))
+        except Exception as e:
+            await chunks.put({"error": f"{type(e).__name__}: {e}"})
+        finally:
+            await chunks.put(_DONE)
+
+    producer = asyncio.create_task(produce())
+    try:
+        keywords = await keywords_task
+        yield "keywords", {"keywords": keywords}
+
+        parser = JSONFieldStream()
+        result = None
+        while True:
+            chunk = await chunks.get()
+            if chunk is _DONE:
+                break
+            if isinstance(chunk, dict):
+                result = chunk
+                if "error" not in result:
+                    for field in ANALYSIS_FIELDS:
+                        yield "field", {"field": field, "value": result.get(field)}
+                continue
+            for field, value in parser.feed(chunk):
+                yield "field", {"field": field, "value": value}
+
+        if result is None:
+            try:
+                result = json.loads(parser.buffer)
+            except json.JSONDecodeError:
+                result = {"error": "Failed to parse JSON response", "raw_response": parser.buffer}
+        if not isinstance(result, dict):
+            result = {"error": "Failed to parse JSON response", "raw_response": parser.buffer}
+        if "error" in result:
+            yield "error", {"error": result["error"]}
+            return
+
+        await build_analysis(text, result, keywords).save()
+        response = {**result, "keywords": keywords}
+        await analysis_cache.set(cache_key, response)
+        yield "complete", response
+    finally:
+        producer.cancel()
+        keywords_task.cancel()
@@ -0,0 +1,178 @@
+"""Local stand-in for the OpenAI chat completions API.
+
+Answers /v1/chat/completions with canned analyses in the shapes the app's
+prompts ask for, and can inject latency, rate limits, server errors and
+malformed JSON so retry and tail-latency behavior can be tested offline.
+
+Run it and point the app at it:
+
+    python -m app.tests.fake_openai_server --port 8001 --latency 0.2 --error-rate 0.05
+    OPENAI_BASE_URL=http://127.0.0.1:8001/v1 OPENAI_API_KEY=fake uvicorn main:app
+
+Tests can mount the app in-process with httpx.ASGITransport instead.
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+@dataclass
+class FakeServerConfig:
+    latency: float = 0.0            # base seconds per completion
+    jitter: float = 0.0             # extra uniform [0, jitter] seconds
+    slow_rate: float = 0.0          # fraction of calls that take slow_seconds
+    slow_seconds: float = 5.0
+    error_rate: float = 0.0         # fraction answered with a 500
+    rate_limit_rate: float = 0.0    # fraction answered with a 429
+    retry_after: Optional[float] = 1.0
+    invalid_json_rate: float = 0.0  # fraction answered with unparseable content
+    fail_first: int = 0             # the first N calls fail with fail_status
+    fail_status: int = 500
+    stream_chunk_chars: int = 8     # content characters per streamed chunk
+    stream_delay: float = 0.0       # seconds between streamed chunks
+    seed: Optional[int] = None
+
+
+def _analysis(text: str) -> dict:
+    words = re.findall(r"[a-z]+", text.lower())
+    return {
+        "summary": f"A text of {len(words)} words.",
+        "title": None,
+        "key_topics": sorted(set(w for w in words if len(w) > 6))[:3],
+        "sentiment": "neutral",
+    }
+
+
+def _content_for(prompt: str) -> str:
+    sections = re.findall(r'Text (\d+):\n"""(.*?)"""', prompt, re.S)
+    if '"results"' in prompt and sections:
+        return json.dumps({"results": [{"id": int(i), **_analysis(t)} for i, t in sections]})
+    match = re.search(r'"""(.*?)"""', prompt, re.S)
+    return json.dumps(_analysis(match.group(1) if match else prompt))
+
+
+def create_app(config: Optional[FakeServerConfig] = None) -> FastAPI:
+    config = config or FakeServerConfig()
+    rng = random.Random(config.seed)
+    app = FastAPI()
+    app.state.config = config
+    app.state.calls = 0
+
+    def error(status: int, message: str) -> JSONResponse:
+        headers = {}
+        if status == 429 and config.retry_after is not None:
+            headers["retry-after"] = str(config.retry_after)
+        return JSONResponse(
+            {"error": {"message": message, "type": "fake_error", "code": None}},
+            status_code=status,
+            headers=headers,
+        )
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        app.state.calls += 1
+        body = await request.json()
+
+        delay = config.latency + rng.uniform(0, config.jitter)
+        if rng.random() < config.slow_rate:
+            delay = config.slow_seconds
+        if delay:
+            await asyncio.sleep(delay)
+
+        if app.state.calls <= config.fail_first:
+            return error(config.fail_status, "Injected failure")
+        roll = rng.random()
+        if roll < config.rate_limit_rate:
+            return error(429, "Rate limit reached")
+        if roll < config.rate_limit_rate + config.error_rate:
+            return error(500, "Internal server error")
+
+        prompt = body["messages"][-1]["content"]
+        content = _content_for(prompt)
+        if rng.random() < config.invalid_json_rate:
+            content = content[: len(content) // 2]
+        if body.get("stream"):
+            return StreamingResponse(stream(body, content), media_type="text/event-stream")
+        return {
+            "id": f"chatcmpl-fake-{app.state.calls}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": len(prompt) // 4 + 1,
+                "completion_tokens": len(content) // 4 + 1,
+                "total_tokens": (len(prompt) + len(content)) // 4 + 2,
+            },
+        }
+
+    async def stream(body, content):
+        chunk_id = f"chatcmpl-fake-{app.state.calls}"
+        pieces = [content[i:i + config.stream_chunk_chars]
+                  for i in range(0, len(content), config.stream_chunk_chars)]
+        for piece in pieces + [None]:
+            delta = {"content": piece} if piece is not None else {}
+            chunk = {
+                "id": chunk_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "fake"),
+                "choices": [{
+                    "index": 0,
+                    "delta": delta,
+                    "finish_reason": None if piece is not None else "stop",
+                }],
+            }
+            yield f"data: {json.dumps(chunk)}\n\n"
+            if config.stream_delay:
+                await asyncio.sleep(config.stream_delay)
+        yield "data: [DONE]\n\n"
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible server for offline load tests.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--slow-seconds", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--invalid-json-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = FakeServerConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        slow_rate=args.slow_rate,
+        slow_seconds=args.slow_seconds,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        invalid_json_rate=args.invalid_json_rate,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
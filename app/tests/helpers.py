@@ -0,0 +1,15 @@
+"""Shared helpers for unit and integration tests."""
+
+import json
+from unittest.mock import Mock
+
+
+def make_completion(payload):
+    """Mock chat completion whose message content is `payload` (JSON-encoded unless already a string)."""
+    mock_completion = Mock()
+    mock_choice = Mock()
+    mock_message = Mock()
+    mock_message.content = payload if isinstance(payload, str) else json.dumps(payload)
+    mock_choice.message = mock_message
+    mock_completion.choices = [mock_choice]
+    return mock_completion
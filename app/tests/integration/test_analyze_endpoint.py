@@ -1,6 +1,6 @@
 import json
-from unittest.mock import patch, Mock
-from .fixtures import client
+from unittest.mock import patch, Mock, AsyncMock
+from .fixtures import client, test_db
 
 
 class TestAnalyzeEndpoint:
@@ -22,7 +22,7 @@ class TestAnalyzeEndpoint:
             mock_message.content = json.dumps(mock_openai_response)
             mock_choice.message = mock_message
             mock_completion.choices = [mock_choice]
-            mock_client.chat.completions.create.return_value = mock_completion
+            mock_client.chat.completions.create = AsyncMock(return_value=mock_completion)
             
             response = client.post("/analyze", json={"text": "Technology is advancing rapidly."})
             
@@ -52,7 +52,7 @@ class TestAnalyzeEndpoint:
             mock_message.content = json.dumps(mock_openai_response)
             mock_choice.message = mock_message
             mock_completion.choices = [mock_choice]
-            mock_client.chat.completions.create.return_value = mock_completion
+            mock_client.chat.completions.create = AsyncMock(return_value=mock_completion)
             
             response = client.post("/analyze", json={"text": "Test text."})
             
@@ -74,10 +74,67 @@ class TestAnalyzeEndpoint:
             mock_message.content = "Invalid JSON response"
             mock_choice.message = mock_message
             mock_completion.choices = [mock_choice]
-            mock_client.chat.completions.create.return_value = mock_completion
+            mock_client.chat.completions.create = AsyncMock(return_value=mock_completion)
             
             response = client.post("/analyze", json={"text": "Test text"})
             
             assert response.status_code == 200
             data = response.json()
-            assert "error" in data
\ No newline at end of file
+            assert "error" in data
+
+    def test_analyze_endpoint_repeat_is_served_from_cache(self, client, test_db):
+        """Test that resubmitting identical text skips the LLM and NLTK."""
+        mock_openai_response = {
+            "summary": "Cached summary",
+            "title": "Cached",
+            "key_topics": ["cache"],
+            "sentiment": "neutral"
+        }
+
+        with patch('app.services.openai_service.client') as mock_client, \
+             patch('app.services.nlp_service.extract_three_most_common_nouns', return_value=["cache"]) as mock_nlp:
+            mock_completion = Mock()
+            mock_choice = Mock()
+            mock_message = Mock()
+            mock_message.content = json.dumps(mock_openai_response)
+            mock_choice.message = mock_message
+            mock_completion.choices = [mock_choice]
+            mock_client.chat.completions.create = AsyncMock(return_value=mock_completion)
+
+            first = client.post("/analyze", json={"text": "Caching   makes repeats cheap."})
+            second = client.post("/analyze", json={"text": "Caching makes repeats cheap."})
+
+            assert first.json() == second.json()
+            assert mock_client.chat.completions.create.await_count == 1
+            assert mock_nlp.call_count == 1
+
+        stats = client.get("/cache/stats").json()
+        assert stats["hits"] >= 1
+
+    def test_analyze_endpoint_local_backend(self, client, test_db):
+        """Test that backend=local answers without calling the LLM."""
+        from app.services import local_analysis_service
+
+        analyzer = Mock()
+        analyzer.polarity_scores = Mock(return_value={"compound": -0.6})
+        with patch('app.services.openai_service.client') as mock_client, \
+             patch.object(local_analysis_service, "_stopwords", frozenset({"the", "is"})), \
+             patch.object(local_analysis_service, "_sentiment_analyzer", analyzer), \
+             patch('app.services.nlp_service.extract_three_most_common_nouns', return_value=["service"]):
+            mock_client.chat.completions.create = AsyncMock()
+
+            response = client.post("/analyze", json={"text": "The service is slow. The service is down.", "backend": "local"})
+
+            data = response.json()
+            assert data["sentiment"] == "negative"
+            assert "service" in data["key_topics"]
+            mock_client.chat.completions.create.assert_not_called()
+
+            stats = client.get("/backends/stats").json()
+            assert stats["local"]["texts"] >= 1
+
+    def test_analyze_endpoint_unknown_backend(self, client):
+        """Test that an unknown backend is reported as an error."""
+        response = client.post("/analyze", json={"text": "Some text", "backend": "nope"})
+
+        assert response.json() == {"error": "Unknown backend: nope"}
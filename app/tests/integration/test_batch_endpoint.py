@@ -0,0 +1,56 @@
+from unittest.mock import patch, Mock, AsyncMock
+from app.tests.helpers import make_completion
+from .fixtures import client, test_db
+
+
+class TestBatchEndpoint:
+    """Integration tests for POST /analyze/batch endpoint."""
+
+    def test_batch_returns_results_in_input_order(self, client, test_db):
+        """Test that a batch is analyzed with one completion and saved."""
+        packed = {"results": [
+            {"id": 0, "summary": "About cats", "title": None, "key_topics": ["cats"], "sentiment": "positive"},
+            {"id": 1, "summary": "About dogs", "title": None, "key_topics": ["dogs"], "sentiment": "negative"},
+        ]}
+
+        with patch('app.services.openai_service.client') as mock_client, \
+             patch('app.services.nlp_service.extract_keywords_batch', return_value=[["cat"], ["dog"]]) as mock_nlp, \
+             patch('app.db.models.Analysis.save_many', new_callable=AsyncMock) as mock_save_many:
+            mock_client.chat.completions.create = AsyncMock(return_value=make_completion(packed))
+
+            response = client.post("/analyze/batch", json={"texts": ["Batch cats text.", "Batch dogs text."]})
+
+            assert response.status_code == 200
+            data = response.json()["data"]
+            assert [item["summary"] for item in data] == ["About cats", "About dogs"]
+            assert [item["keywords"] for item in data] == [["cat"], ["dog"]]
+            assert mock_client.chat.completions.create.await_count == 1
+            assert mock_nlp.call_count == 1
+            assert mock_save_many.await_count == 1
+            assert len(mock_save_many.await_args.args[0]) == 2
+
+    def test_batch_reports_errors_per_item(self, client, test_db):
+        """Test that one failed item does not fail the others."""
+        packed = {"results": [
+            {"id": 0, "summary": "Fine", "title": None, "key_topics": [], "sentiment": "neutral"},
+        ]}
+
+        with patch('app.services.openai_service.client') as mock_client, \
+             patch('app.services.nlp_service.extract_keywords_batch', return_value=[["fine"]]):
+            broken = Mock()
+            broken.choices = [Mock(message=Mock(content="not json"))]
+            # The malformed reply is asked once more before being reported.
+            mock_client.chat.completions.create = AsyncMock(
+                side_effect=[make_completion(packed), broken, broken]
+            )
+
+            response = client.post("/analyze/batch", json={"texts": ["Batch fine text.", "Batch broken text."]})
+
+            data = response.json()["data"]
+            assert data[0]["summary"] == "Fine"
+            assert data[1] == {"error": "Failed to parse JSON response"}
+
+    def test_batch_rejects_empty_list(self, client):
+        """Test that an empty batch is a validation error."""
+        response = client.post("/analyze/batch", json={"texts": []})
+        assert response.status_code == 422
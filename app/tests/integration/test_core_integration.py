@@ -1,5 +1,5 @@
 import json
-from unittest.mock import patch, Mock
+from unittest.mock import patch, Mock, AsyncMock
 from .fixtures import client
 
 
@@ -28,7 +28,7 @@ class TestCoreIntegration:
             mock_message.content = json.dumps(mock_openai_response)
             mock_choice.message = mock_message
             mock_completion.choices = [mock_choice]
-            mock_client.chat.completions.create.return_value = mock_completion
+            mock_client.chat.completions.create = AsyncMock(return_value=mock_completion)
             
             response = client.post("/analyze", json={"text": "Test text for analysis"})
             
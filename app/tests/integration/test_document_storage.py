@@ -0,0 +1,157 @@
+import os
+import sqlite3
+import tempfile
+from unittest.mock import patch
+
+from app.db import connection
+from app.db.compression import compress_text, content_hash, decompress_text
+from app.db.connection import get_db_connection
+from app.db.migrator import run_migrations
+from app.db.models import Analysis
+from app.db.storage import compact, storage_stats
+from .fixtures import test_db
+
+
+class TestDocumentStorage:
+    """Integration tests for deduplicated, compressed input texts."""
+
+    async def test_identical_texts_share_one_document(self, test_db):
+        """Test that the same text saved twice is stored once, compressed."""
+        text = "Deduplicated storage keeps one copy of repeated texts. " * 20
+        first = await Analysis(input_text=text, summary="one").save()
+        await Analysis.save_many([
+            Analysis(input_text=text, summary="two"),
+            Analysis(input_text="something else", summary="three"),
+        ])
+
+        async with get_db_connection() as conn:
+            cursor = await conn.execute("SELECT content_hash, body, size FROM documents ORDER BY id")
+            documents = await cursor.fetchall()
+            cursor = await conn.execute("SELECT input_text FROM analyses WHERE id = ?", (first,))
+            inline = (await cursor.fetchone())[0]
+
+        assert len(documents) == 2
+        assert documents[0]['content_hash'] == content_hash(text)
+        assert decompress_text(documents[0]['body']) == text
+        assert len(documents[0]['body']) < documents[0]['size'] == len(text)
+        assert inline == ""
+
+        results = await Analysis.get_many([first])
+        assert results[0].input_text == text
+
+    async def test_search_and_export_return_text(self, test_db):
+        """Test that reads decompress the stored document."""
+        await Analysis(input_text="Compressed bodies remain searchable by their words.",
+                       summary="storage", keywords=["storage"]).save()
+
+        [by_keyword] = await Analysis.search_by_keyword("storage")
+        [by_text] = await Analysis.search_text("searchable")
+        rows = [row async for row in Analysis.iter_rows()]
+
+        assert by_keyword.input_text == "Compressed bodies remain searchable by their words."
+        assert by_text.input_text == by_keyword.input_text
+        assert "<mark>searchable</mark>" in by_text.snippet
+        assert rows[0]["input_text"] == by_keyword.input_text
+
+    async def test_compact_moves_legacy_rows(self, test_db):
+        """Test that inline texts from before documents existed are moved and stay searchable."""
+        async with get_db_connection() as conn:
+            await conn.executemany("INSERT INTO analyses (input_text) VALUES (?)",
+                                   [("legacy inline text",), ("legacy inline text",)])
+        assert [a.input_text for a in await Analysis.search_text("inline")] == ["legacy inline text"] * 2
+
+        stats = await storage_stats()
+        assert stats["legacy_rows"] == 2
+        assert stats["documents"] == 0
+
+        assert await compact(batch_size=1) == 2
+        assert await compact() == 0
+
+        stats = await storage_stats()
+        assert stats["legacy_rows"] == 0
+        assert stats["legacy_inline_bytes"] == 0
+        assert stats["documents"] == 1
+        assert stats["dedup_ratio"] == 2.0
+        assert [a.input_text for a in await Analysis.search_text("inline")] == ["legacy inline text"] * 2
+
+    async def test_delete_removes_from_full_text_index(self, test_db):
+        """Test that the FTS delete trigger finds the document text."""
+        analysis_id = await Analysis(input_text="ephemeral words", summary="").save()
+        async with get_db_connection() as conn:
+            await conn.execute("DELETE FROM analyses WHERE id = ?", (analysis_id,))
+
+        assert await Analysis.search_text("ephemeral") == []
+
+    async def test_full_text_index_keeps_no_text_copy(self, test_db):
+        """Test that the FTS index is contentless and counted in the storage stats."""
+        await Analysis(input_text="indexed but not copied " * 50, summary="").save()
+        async with get_db_connection() as conn:
+            await conn.execute("INSERT INTO analyses (input_text) VALUES ('inline legacy words')")
+            cursor = await conn.execute("SELECT name FROM sqlite_master WHERE name = 'analyses_fts_content'")
+            assert await cursor.fetchone() is None
+            await conn.execute("DELETE FROM analyses WHERE document_id IS NULL")
+
+        assert await Analysis.search_text("legacy") == []
+        [result] = await Analysis.search_text("copied")
+        assert result.snippet.startswith("indexed but not <mark>copied</mark>")
+        assert (await storage_stats())["fts_index_bytes"] > 0
+
+    def test_compression_round_trip(self):
+        """Test compress/decompress of non-ASCII text."""
+        text = "Zürich — naïve café ✓"
+        assert decompress_text(compress_text(text)) == text
+        assert decompress_text(None) is None
+
+    async def test_upgrades_database_with_pre_documents_schema(self):
+        """Test that a database created before documents existed migrates and accepts saves."""
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.db') as tmp_file:
+            path = tmp_file.name
+        conn = sqlite3.connect(path)
+        conn.executescript("""
+            CREATE TABLE analyses (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                input_text TEXT NOT NULL,
+                summary TEXT,
+                title TEXT,
+                topics TEXT,
+                sentiment TEXT,
+                keywords TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+            CREATE VIRTUAL TABLE analyses_fts USING fts5(
+                input_text, summary, content='analyses', content_rowid='id', tokenize='porter unicode61'
+            );
+            CREATE TRIGGER analyses_fts_insert AFTER INSERT ON analyses BEGIN
+                INSERT INTO analyses_fts (rowid, input_text, summary) VALUES (new.id, new.input_text, new.summary);
+            END;
+            INSERT INTO analyses (input_text, summary) VALUES ('an upgraded legacy row', 'old');
+        """)
+        conn.close()
+        try:
+            with patch('app.db.connection.DB_PATH', path):
+                await run_migrations()
+                await Analysis(input_text="a new upgraded row", summary="new").save()
+                await Analysis.save_many([Analysis(input_text="another upgraded row")])
+
+                results = await Analysis.search_text("upgraded")
+                assert sorted(a.input_text for a in results) == [
+                    "a new upgraded row", "an upgraded legacy row", "another upgraded row",
+                ]
+        finally:
+            os.unlink(path)
+
+    async def test_schema_needs_no_app_functions(self, test_db):
+        """Test that plain sqlite3 connections can write, and a rebuilt index covers documents."""
+        keep = await Analysis(input_text="kept portable text", summary="").save()
+        gone = await Analysis(input_text="removed portable text", summary="").save()
+
+        conn = sqlite3.connect(connection.DB_PATH)
+        with conn:
+            conn.execute("DELETE FROM analyses WHERE id = ?", (gone,))
+            conn.execute("UPDATE analyses SET summary = 'edited summary' WHERE id = ?", (keep,))
+            conn.execute("DROP TABLE analyses_fts")
+        conn.close()
+        await run_migrations()
+
+        assert [a.id for a in await Analysis.search_text("portable")] == [keep]
+        assert [a.id for a in await Analysis.search_text("edited")] == [keep]
@@ -0,0 +1,48 @@
+import gzip
+import io
+import json
+from app.db.export import export_analyses
+from .fixtures import client, test_db, sample_data
+
+
+class TestExportEndpoint:
+    """Integration tests for GET /export endpoint."""
+
+    def test_export_streams_ndjson(self, client, sample_data):
+        """Test that every analysis is exported as one JSON line."""
+        response = client.get("/export")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["title"] for row in rows] == [a.title for a in sample_data]
+        assert rows[0]["keywords"] == ["python", "programming", "language"]
+
+    def test_export_since_id_is_incremental(self, client, sample_data):
+        """Test since=<id> only returns newer rows."""
+        rows = [json.loads(line) for line in client.get("/export").text.splitlines()]
+        since = rows[2]["id"]
+
+        newer = [json.loads(line) for line in client.get(f"/export?since={since}").text.splitlines()]
+        assert [row["id"] for row in newer] == [row["id"] for row in rows[3:]]
+
+    def test_export_since_timestamp(self, client, sample_data):
+        """Test since=<created_at> filters by creation time."""
+        assert client.get("/export?since=2999-01-01 00:00:00").text == ""
+        assert len(client.get("/export?since=2000-01-01 00:00:00").text.splitlines()) == 5
+
+    def test_export_gzip(self, client, sample_data):
+        """Test gzip=true returns a gzip-compressed NDJSON file."""
+        response = client.get("/export?gzip=true")
+
+        assert response.headers["content-type"] == "application/gzip"
+        lines = gzip.decompress(response.content).decode().splitlines()
+        assert len(lines) == 5
+
+    async def test_export_cli_writes_gzip_ndjson(self, sample_data):
+        """Test the CLI export helper writes compressed NDJSON."""
+        output = io.BytesIO()
+        await export_analyses(output, gzip=True)
+
+        lines = gzip.decompress(output.getvalue()).decode().splitlines()
+        assert [json.loads(line)["title"] for line in lines] == [a.title for a in sample_data]
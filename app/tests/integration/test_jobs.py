@@ -0,0 +1,180 @@
+import asyncio
+import json
+from unittest.mock import patch, AsyncMock
+
+from app.db.models import Job
+from app.services import job_service
+from app.services.job_service import JobWorkerPool, enqueue, watch
+from app.tests.helpers import make_completion
+from .fixtures import client, test_db
+
+
+ANALYSIS = {"summary": "Queued summary", "title": None, "key_topics": ["queues"], "sentiment": "neutral"}
+
+
+class TestJobQueue:
+    """Integration tests for asynchronous analysis jobs."""
+
+    async def test_job_runs_to_success(self, test_db):
+        """Test that a claimed job stores its analysis result."""
+        queued = await enqueue("Jobs decouple ingress from LLM latency.")
+        pool = JobWorkerPool(concurrency=1)
+
+        with patch('app.services.openai_service.client') as mock_client, \
+             patch('app.services.nlp_service.extract_three_most_common_nouns', return_value=["jobs"]):
+            mock_client.chat.completions.create = AsyncMock(return_value=make_completion(ANALYSIS))
+            [claimed] = await Job.claim(pool.owner, lease_seconds=30)
+            await pool.run(claimed)
+
+        job = await Job.get(queued["job_id"])
+        assert job["status"] == "succeeded"
+        assert job["attempts"] == 1
+        assert job["result"]["summary"] == "Queued summary"
+        assert job["result"]["keywords"] == ["jobs"]
+
+    async def test_failed_attempts_are_retried_then_failed(self, test_db):
+        """Test that errors requeue the job until attempts run out."""
+        queued = await enqueue("This one keeps failing.")
+        pool = JobWorkerPool(concurrency=1, max_attempts=2)
+
+        with patch('app.services.analysis_service.analyze_and_store', new=AsyncMock(return_value={"error": "boom"})), \
+             patch.object(job_service, "JOB_RETRY_BASE_SECONDS", 0):
+            [claimed] = await Job.claim(pool.owner, lease_seconds=30)
+            await pool.run(claimed)
+            assert (await Job.get(queued["job_id"]))["status"] == "queued"
+
+            [claimed] = await Job.claim(pool.owner, lease_seconds=30)
+            await pool.run(claimed)
+
+        job = await Job.get(queued["job_id"])
+        assert job["status"] == "failed"
+        assert job["attempts"] == 2
+        assert job["error"] == "boom"
+
+    async def test_expired_lease_is_reclaimed(self, test_db):
+        """Test that a job whose worker stopped renewing goes to another worker."""
+        queued = await enqueue("A worker dies holding this job.")
+
+        [first] = await Job.claim("dead-worker", lease_seconds=-1)
+        [second] = await Job.claim("live-worker", lease_seconds=30)
+
+        assert first["id"] == second["id"] == queued["job_id"]
+        assert second["attempts"] == 2
+        assert await Job.complete(queued["job_id"], "dead-worker", {}) is False
+        assert await Job.complete(queued["job_id"], "live-worker", ANALYSIS) is True
+
+    async def test_expired_lease_on_last_attempt_is_failed(self, test_db):
+        """Test that a job whose lease expired on its last attempt is not run again."""
+        queued = await enqueue("Crashes every worker that runs it.")
+
+        await Job.claim("dead-worker", lease_seconds=-1, max_attempts=1)
+        assert await Job.claim("live-worker", lease_seconds=30, max_attempts=1) == []
+
+        job = await Job.get(queued["job_id"])
+        assert job["status"] == "failed"
+        assert job["error"] == "Lease expired after 1 attempts"
+
+    async def test_heartbeat_failure_fails_the_attempt(self, test_db):
+        """Test that a job whose lease cannot be renewed is stopped and requeued."""
+        queued = await enqueue("The database goes away mid-job.")
+        pool = JobWorkerPool(concurrency=1, lease_seconds=0.03)
+
+        async def slow_analysis(text, backend):
+            await asyncio.sleep(10)
+
+        with patch('app.services.analysis_service.analyze_and_store', new=slow_analysis), \
+             patch.object(Job, "renew", new=AsyncMock(side_effect=RuntimeError("disk I/O error"))), \
+             patch.object(job_service, "log_event") as log_event:
+            [claimed] = await Job.claim(pool.owner, lease_seconds=30)
+            await asyncio.wait_for(pool.run(claimed), timeout=2)
+
+        job = await Job.get(queued["job_id"])
+        assert job["status"] == "queued"
+        assert job["error"] == "Lease renewal failed: RuntimeError: disk I/O error"
+        assert log_event.call_args.args == ("jobs.heartbeat_failed",)
+
+    async def test_worker_survives_errors_outside_the_analysis(self, test_db):
+        """Test that an exception from Job.complete is logged and the worker keeps running."""
+        with patch('app.services.analysis_service.analyze_and_store', new=AsyncMock(return_value=ANALYSIS)), \
+             patch.object(Job, "complete", new=AsyncMock(side_effect=RuntimeError("database is locked"))), \
+             patch.object(job_service, "log_event") as log_event:
+            pool = JobWorkerPool(concurrency=1, poll_seconds=0.05)
+            pool.start()
+            try:
+                await enqueue("Completed into a locked database.")
+                pool.notify()
+                for _ in range(100):
+                    if log_event.called:
+                        break
+                    await asyncio.sleep(0.01)
+                assert not pool._tasks[0].done()
+            finally:
+                await pool.stop()
+
+        assert log_event.call_args_list[0].args == ("jobs.run_failed",)
+        assert log_event.call_args_list[0].kwargs["error"] == "RuntimeError: database is locked"
+
+    async def test_worker_pool_processes_queue(self, test_db):
+        """Test that started workers pick up jobs and watchers see them finish."""
+        with patch('app.services.analysis_service.analyze_and_store', new=AsyncMock(return_value=ANALYSIS)):
+            pool = JobWorkerPool(concurrency=2, poll_seconds=0.05)
+            pool.start()
+            try:
+                queued = await enqueue("Processed in the background.")
+                pool.notify()
+                statuses = [job["status"] async for job in watch(queued["job_id"], poll_seconds=0.05)]
+            finally:
+                await pool.stop()
+
+        assert statuses[-1] == "succeeded"
+
+    async def test_stop_returns_unfinished_jobs(self, test_db):
+        """Test that shutdown puts in-flight jobs back in the queue."""
+        queued = await enqueue("Interrupted by shutdown.")
+        pool = JobWorkerPool(concurrency=1)
+        await Job.claim(pool.owner, lease_seconds=30)
+
+        await pool.stop()
+
+        job = await Job.get(queued["job_id"])
+        assert job["status"] == "queued"
+        assert job["attempts"] == 0
+
+
+class TestJobEndpoints:
+    """Integration tests for POST /analyze?async=true and /jobs."""
+
+    def test_async_analyze_returns_job_id(self, client, test_db):
+        """Test that async mode answers with a job id before analysis runs."""
+        with patch('app.services.openai_service.client') as mock_client:
+            mock_client.chat.completions.create = AsyncMock()
+
+            response = client.post("/analyze?async=true", json={"text": "Analyze me later."})
+
+            assert response.status_code == 202
+            job_id = response.json()["job_id"]
+            mock_client.chat.completions.create.assert_not_called()
+
+        job = client.get(f"/jobs/{job_id}").json()
+        assert job["status"] == "queued"
+
+    def test_unknown_job(self, client, test_db):
+        """Test that a missing job id is reported as an error."""
+        assert client.get("/jobs/does-not-exist").json() == {"error": "Job not found"}
+
+    def test_job_events_stream_final_status(self, client, test_db):
+        """Test that the event stream ends with the job's final state."""
+        job_id = client.post("/analyze?async=true", json={"text": "Streamed job."}).json()["job_id"]
+        asyncio.run(_finish(job_id))
+
+        response = client.get(f"/jobs/{job_id}/events")
+
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [line for line in response.text.splitlines() if line.startswith("data: ")]
+        assert json.loads(events[-1][len("data: "):])["status"] == "succeeded"
+
+
+async def _finish(job_id):
+    [claimed] = await Job.claim("test-worker", lease_seconds=30)
+    assert claimed["id"] == job_id
+    await Job.complete(job_id, "test-worker", ANALYSIS)
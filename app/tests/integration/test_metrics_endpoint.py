@@ -0,0 +1,29 @@
+from .fixtures import client, test_db, sample_data
+
+
+class TestMetricsEndpoint:
+    """Integration tests for GET /metrics"""
+
+    def test_exposes_request_and_stage_metrics(self, client, sample_data):
+        """Test that served requests and search stages appear in the exposition"""
+        client.get("/search?keyword=python")
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        body = response.text
+        assert 'http_request_duration_seconds_count{method="GET",route="/search",status="200"}' in body
+        assert 'stage_duration_seconds_count{stage="search_keyword"}' in body
+        assert 'stage_duration_seconds_count{stage="save"}' in body
+        assert "analysis_cache_requests_total" in body
+
+    def test_unmatched_routes_share_one_label(self, client):
+        """Test that unknown paths do not create a label per path"""
+        client.get("/no/such/path")
+
+        assert 'route="unmatched",status="404"' in client.get("/metrics").text
+
+    def test_profile_requires_opt_in(self, client):
+        """Test the profiler endpoint reports that sampling is off by default"""
+        assert "error" in client.get("/debug/profile").json()
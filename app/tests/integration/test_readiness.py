@@ -0,0 +1,60 @@
+from unittest.mock import patch
+
+import pytest
+
+from fastapi.testclient import TestClient
+
+from main import app
+from .fixtures import client, test_db
+
+
+class TestReadiness:
+    """Integration tests for GET /ready."""
+
+    def test_not_ready_before_startup(self, client):
+        """Test that the probe fails while the lifespan has not run."""
+        response = client.get("/ready")
+
+        assert response.status_code == 503
+        assert response.json()["ready"] is False
+
+    def test_ready_after_startup(self, test_db):
+        """Test that the probe passes once startup has finished."""
+        with patch('main.ensure_nltk_data'), \
+             patch('main.start_nlp_pool'), \
+             patch('main.warm_up'):
+            with TestClient(app) as started:
+                response = started.get("/ready")
+
+                assert response.status_code == 200
+                assert response.json()["checks"]["database"] is True
+
+    def test_failed_startup_releases_what_it_started(self, test_db):
+        """Test that a startup error closes the pool and stops the write batcher."""
+        from app.db import models
+        from app.db.connection import pool_is_open
+        with patch('main.ensure_nltk_data'), \
+             patch('main.start_nlp_pool'), \
+             patch('main.shutdown_nlp_pool') as shutdown_nlp_pool, \
+             patch('main.warm_up', side_effect=RuntimeError("warm-up failed")), \
+             patch('main.start_job_workers') as start_job_workers:
+            with pytest.raises(RuntimeError):
+                with TestClient(app):
+                    pass
+
+        assert not pool_is_open()
+        assert models._write_batcher is None
+        assert shutdown_nlp_pool.called
+        assert not start_job_workers.called
+
+    def test_local_backend_starts_without_openai_client(self, test_db):
+        """Test that ANALYSIS_BACKEND=local does not require OPENAI_API_KEY."""
+        with patch('main.ensure_nltk_data'), \
+             patch('main.start_nlp_pool'), \
+             patch('main.warm_up'), \
+             patch('main.ANALYSIS_BACKEND', "local"), \
+             patch('main.get_client') as get_client:
+            with TestClient(app) as started:
+                assert started.get("/ready").status_code == 200
+
+        assert not get_client.called
@@ -1,4 +1,4 @@
-from .fixtures import client
+from .fixtures import client, test_db, sample_data
 
 
 class TestSearchEndpoints:
@@ -39,4 +39,97 @@ class TestSearchEndpoints:
             result = data["data"][0]
             expected_fields = {"id", "input_text", "summary", "title", "topics", 
                              "sentiment", "keywords", "created_at"}
-            assert all(field in result for field in expected_fields)
\ No newline at end of file
+            assert all(field in result for field in expected_fields)
+    
+    def test_search_by_keyword_is_case_insensitive(self, client, sample_data):
+        """Test keyword search uses the normalized keyword index."""
+        response = client.get("/search?keyword=PYTHON")
+        data = response.json()["data"]
+        assert [item["title"] for item in data] == ["Python Programming Guide"]
+    
+    def test_search_by_topic(self, client, sample_data):
+        """Test topic search returns every analysis tagged with the topic."""
+        response = client.get("/search?topic=web development")
+        titles = {item["title"] for item in response.json()["data"]}
+        assert titles == {"Python Programming Guide", "JavaScript Complexity Issues"}
+    
+    def test_full_text_search_ranks_and_highlights(self, client, sample_data):
+        """Test q= searches input text and summary with bm25 ranking and snippets."""
+        response = client.get("/search?q=computing")
+        data = response.json()["data"]
+
+        titles = [item["title"] for item in data]
+        assert set(titles) == {"Cloud Computing Revolution", "ML Resource Requirements"}
+        # Cloud computing mentions the term in both the text and the summary.
+        assert titles[0] == "Cloud Computing Revolution"
+        assert data[0]["rank"] <= data[1]["rank"]
+        assert "<mark>" in data[0]["snippet"]
+    
+    def test_full_text_search_matches_word_variants(self, client, sample_data):
+        """Test that stemming matches other forms of a word."""
+        response = client.get("/search?q=frameworks")
+        titles = [item["title"] for item in response.json()["data"]]
+        assert titles == ["JavaScript Complexity Issues"]
+    
+    def test_full_text_search_ignores_query_syntax(self, client, sample_data):
+        """Test that FTS operators in user input do not cause errors."""
+        response = client.get('/search?q="python AND (')
+        assert response.status_code == 200
+        assert [item["title"] for item in response.json()["data"]] == ["Python Programming Guide"]
+    
+    def test_search_paginates_with_cursor(self, client, sample_data):
+        """Test keyset pagination walks every row exactly once."""
+        first = client.get("/search?sentiment=positive&limit=2").json()
+        assert len(first["data"]) == 2
+        assert first["next_cursor"]
+
+        second = client.get(f"/search?sentiment=positive&limit=2&cursor={first['next_cursor']}").json()
+        assert len(second["data"]) == 1
+        assert second["next_cursor"] is None
+
+        ids = [item["id"] for item in first["data"] + second["data"]]
+        assert len(set(ids)) == 3
+        assert ids == sorted(ids, reverse=True)
+    
+    def test_full_text_search_paginates(self, client, sample_data):
+        """Test that ranked full-text results can be paged through."""
+        first = client.get("/search?q=computing&limit=1").json()
+        second = client.get(f"/search?q=computing&limit=1&cursor={first['next_cursor']}").json()
+
+        assert first["data"][0]["title"] == "Cloud Computing Revolution"
+        assert second["data"][0]["title"] == "ML Resource Requirements"
+        assert second["next_cursor"] is None
+    
+    def test_search_projects_requested_fields(self, client, sample_data):
+        """Test fields= returns only the requested columns."""
+        response = client.get("/search?keyword=python&fields=title,sentiment")
+        assert response.json()["data"] == [{"title": "Python Programming Guide", "sentiment": "positive"}]
+    
+    def test_search_rejects_unknown_fields_and_bad_cursors(self, client):
+        """Test invalid projection and cursor parameters are reported."""
+        assert client.get("/search?keyword=python&fields=title,password").json() == {"error": "Unknown fields: password"}
+        assert client.get("/search?keyword=python&cursor=not-a-cursor").json() == {"error": "Invalid cursor"}
+    
+    def test_search_splices_stored_json_arrays(self, client, sample_data):
+        """Test topics/keywords passed through from storage match the saved lists."""
+        data = client.get("/search?keyword=python&fields=topics,keywords").json()["data"]
+        assert data == [{
+            "topics": ["python", "programming", "data science", "web development"],
+            "keywords": ["python", "programming", "language"],
+        }]
+
+    async def test_search_passthrough_handles_empty_lists(self, client, test_db):
+        """Test rows saved without topics return [] rather than invalid JSON."""
+        from app.db.models import Analysis
+        await Analysis(input_text="bare", sentiment="neutral").save()
+        data = client.get("/search?sentiment=neutral").json()["data"]
+        assert data[0]["topics"] == [] and data[0]["keywords"] == []
+
+    def test_search_responses_match_documented_models(self, client, sample_data):
+        """Test that responses validate against the models published in OpenAPI."""
+        from main import SearchResponse
+        for query in ("keyword=python", "q=computing", "sentiment=positive&fields=title"):
+            SearchResponse.model_validate(client.get(f"/search?{query}").json())
+
+        schema = client.get("/openapi.json").json()["components"]["schemas"]
+        assert {"SearchResponse", "TextSearchResult", "AnalysisResponse", "ErrorResponse"} <= set(schema)
@@ -0,0 +1,61 @@
+import pytest
+
+from app.db.backfill import backfill_embeddings
+from app.db.connection import get_db_connection
+from app.services import embedding_service
+from .fixtures import client, test_db, sample_data
+
+
+@pytest.fixture(autouse=True)
+def fresh_index():
+    """Each test loads the vector index from its own database."""
+    embedding_service.reset_index()
+    yield
+    embedding_service.reset_index()
+
+
+class TestSimilarEndpoint:
+    """Integration tests for GET /search/similar"""
+
+    def test_requires_text_or_id(self, client):
+        """Test that a query without text or id is an error"""
+        assert client.get("/search/similar").json() == {"error": "No text or id provided"}
+
+    def test_similar_to_text(self, client, sample_data):
+        """Test that the closest stored analysis comes first with a score"""
+        response = client.get("/search/similar?text=python programming language&limit=2")
+
+        data = response.json()["data"]
+        assert len(data) == 2
+        assert data[0]["title"] == "Python Programming Guide"
+        assert data[0]["score"] >= data[1]["score"]
+
+    def test_similar_to_id_excludes_itself(self, client, sample_data):
+        """Test searching by a stored analysis, with field projection"""
+        response = client.get("/search/similar?id=5&fields=id,title")
+
+        data = response.json()["data"]
+        assert len(data) == 4
+        assert all(set(row) == {"id", "title", "score"} for row in data)
+        assert 5 not in [row["id"] for row in data]
+
+    def test_unknown_id(self, client, sample_data):
+        """Test that an id without an embedding is an error"""
+        assert "error" in client.get("/search/similar?id=999").json()
+
+    async def test_saves_update_a_loaded_index(self, sample_data):
+        """Test that Analysis.save() appends to the index incrementally"""
+        index = await embedding_service.get_index()
+        assert len(index) == 5
+
+        await sample_data[0].save()
+
+        assert len(index) == 6
+
+    async def test_backfill_embeds_missing_rows(self, sample_data):
+        """Test that the backfill embeds rows saved without a vector"""
+        async with get_db_connection() as conn:
+            await conn.execute("DELETE FROM analysis_embeddings WHERE analysis_id IN (1, 2)")
+
+        assert await backfill_embeddings() == 2
+        assert len(await embedding_service.get_index()) == 5
@@ -0,0 +1,69 @@
+from app.db.connection import get_db_connection
+from app.db.migrator import run_migrations
+from app.db.models import Analysis, AnalysisStats
+from .fixtures import client, test_db, sample_data
+
+
+class TestStatsEndpoint:
+    """Integration tests for GET /stats and its summary tables"""
+
+    def test_summary_from_sample_data(self, client, sample_data):
+        """Test sentiment distribution, top terms and the daily series"""
+        data = client.get("/stats?days=7&top=2").json()
+
+        assert data["total"] == 5
+        assert data["sentiment"] == {"positive": 3, "negative": 1, "neutral": 1}
+        assert data["top_topics"] == [
+            {"term": "web development", "count": 2},
+            {"term": "algorithms", "count": 1},
+        ]
+        assert len(data["top_keywords"]) == 2
+        assert len(data["counts"]) == 7
+        assert sum(point["count"] for point in data["counts"]) == 5
+        assert data["counts"][-1]["bucket"] == data["window"]["end"]
+
+    def test_hourly_series(self, client, sample_data):
+        """Test hourly buckets cover the window"""
+        data = client.get("/stats?days=2&interval=hour").json()
+
+        assert data["counts"][0]["bucket"].endswith(" 00:00:00")
+        assert sum(point["count"] for point in data["counts"]) == 5
+
+    def test_invalid_parameters(self, client):
+        """Test unknown intervals and oversized hourly windows are errors"""
+        assert "error" in client.get("/stats?interval=week").json()
+        assert "error" in client.get("/stats?days=60&interval=hour").json()
+
+    async def test_counters_follow_inserts_and_deletes(self, test_db):
+        """Test that the triggers keep counts in step with the analyses table"""
+        await Analysis(input_text="a", sentiment="positive", keywords=["Cat", "cat"], topics=["pets"]).save()
+        await Analysis.save_many([
+            Analysis(input_text="b", sentiment="positive", keywords=["cat"]),
+            Analysis(input_text="c", sentiment="negative", keywords=["dog"]),
+        ])
+
+        summary = await AnalysisStats.summary(days=2)
+        assert summary["sentiment"] == {"positive": 2, "negative": 1}
+        assert summary["top_keywords"][0] == {"term": "cat", "count": 2}
+
+        async with get_db_connection() as conn:
+            await conn.execute("DELETE FROM analysis_keywords WHERE analysis_id = 1")
+            await conn.execute("DELETE FROM analysis_topics WHERE analysis_id = 1")
+            await conn.execute("DELETE FROM analyses WHERE id = 1")
+
+        summary = await AnalysisStats.summary(days=2)
+        assert summary["sentiment"] == {"positive": 1, "negative": 1}
+        assert summary["top_topics"] == []
+
+    async def test_migration_counts_existing_rows(self, test_db):
+        """Test that creating the summary tables backfills them"""
+        await Analysis(input_text="a", sentiment="neutral", keywords=["tea"]).save()
+        async with get_db_connection() as conn:
+            await conn.execute("DROP TABLE stats_hourly")
+            await conn.execute("DROP TABLE stats_terms_daily")
+
+        await run_migrations()
+
+        summary = await AnalysisStats.summary(days=2)
+        assert summary["sentiment"] == {"neutral": 1}
+        assert summary["top_keywords"] == [{"term": "tea", "count": 1}]
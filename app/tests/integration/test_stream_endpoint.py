@@ -0,0 +1,79 @@
+import json
+from unittest.mock import patch
+
+import httpx
+from openai import AsyncOpenAI
+
+from app.services import openai_service
+from app.services.cache_service import analysis_cache
+from app.services.resilience import CircuitBreaker
+from app.tests.fake_openai_server import FakeServerConfig, create_app
+from .fixtures import client, test_db
+
+
+def parse_events(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def fake_client(config=None):
+    transport = httpx.ASGITransport(app=create_app(config or FakeServerConfig(stream_chunk_chars=5)))
+    return AsyncOpenAI(api_key="fake", base_url="http://fake/v1",
+                       http_client=httpx.AsyncClient(transport=transport), max_retries=0)
+
+
+class TestStreamEndpoint:
+    """Integration tests for POST /analyze/stream."""
+
+    def test_keywords_then_fields_then_complete(self, client, test_db):
+        """Test the event order and that the final result is saved."""
+        analysis_cache.clear()
+        with patch.object(openai_service, "client", fake_client()), \
+             patch.object(openai_service, "breaker", CircuitBreaker()), \
+             patch('app.services.nlp_service.extract_three_most_common_nouns', return_value=["stream"]):
+            response = client.post("/analyze/stream", json={"text": "Streaming responses improve perceived latency."})
+
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = parse_events(response.text)
+        names = [name for name, _ in events]
+
+        assert names[0] == "keywords"
+        assert events[0][1] == {"keywords": ["stream"]}
+        assert names[-1] == "complete"
+        fields = [data["field"] for name, data in events if name == "field"]
+        assert fields == ["summary", "title", "key_topics", "sentiment"]
+
+        complete = events[-1][1]
+        assert complete["keywords"] == ["stream"]
+        assert complete["sentiment"] == "neutral"
+
+        search = client.get("/search?q=perceived").json()
+        assert len(search["data"]) == 1
+
+    def test_upstream_failure_ends_with_error(self, client, test_db):
+        """Test that a failed completion is reported as an error event."""
+        analysis_cache.clear()
+        with patch.object(openai_service, "client", fake_client(FakeServerConfig(error_rate=1.0))), \
+             patch.object(openai_service, "breaker", CircuitBreaker()), \
+             patch.object(openai_service, "MAX_RETRIES", 0), \
+             patch('app.services.nlp_service.extract_three_most_common_nouns', return_value=["x"]):
+            response = client.post("/analyze/stream", json={"text": "This upstream is down."})
+
+        events = parse_events(response.text)
+        assert events[0][0] == "keywords"
+        assert events[-1] == ("error", {"error": openai_service.UNAVAILABLE_ERROR})
+
+    def test_local_backend_streams_whole_fields(self, client, test_db):
+        """Test that non-streaming backends still produce the same events."""
+        analysis_cache.clear()
+        local = {"summary": "Local.", "title": None, "key_topics": ["local"], "sentiment": "neutral"}
+        with patch('app.services.local_analysis_service.analyze_local', return_value=local), \
+             patch('app.services.nlp_service.extract_three_most_common_nouns', return_value=["local"]):
+            response = client.post("/analyze/stream", json={"text": "Run it locally.", "backend": "local"})
+
+        events = parse_events(response.text)
+        assert [name for name, _ in events] == ["keywords", "field", "field", "field", "field", "complete"]
+        assert events[-1][1]["summary"] == "Local."
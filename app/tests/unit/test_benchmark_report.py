@@ -0,0 +1,36 @@
+from benchmarks.report import build_report, compare, percentile, summarize
+
+
+class TestBenchmarkReport:
+    """Test cases for the benchmark result format and baseline comparison"""
+
+    def test_nearest_rank_percentiles(self):
+        """Test percentiles pick observed values"""
+        values = [i / 1000 for i in range(1, 101)]
+        summary = summarize(values, elapsed=2.0)
+
+        assert percentile(values, 50) == 0.05
+        assert summary["p95_ms"] == 95.0
+        assert summary["p99_ms"] == 99.0
+        assert summary["throughput_per_s"] == 50.0
+
+    def test_empty_latencies(self):
+        """Test that a run with no samples still summarizes"""
+        assert summarize([], elapsed=1.0)["p50_ms"] == 0.0
+
+    def test_compare_flags_regressions_beyond_tolerance(self):
+        """Test slower p95 or lower throughput beyond the tolerance is reported"""
+        baseline = build_report({
+            "search": {"p95_ms": 10.0, "throughput_per_s": 100.0},
+            "analyze": {"p95_ms": 10.0, "throughput_per_s": 100.0},
+        })
+        current = build_report({
+            "search": {"p95_ms": 11.0, "throughput_per_s": 95.0},
+            "analyze": {"p95_ms": 15.0, "throughput_per_s": 70.0},
+            "new": {"p95_ms": 1.0, "throughput_per_s": 1.0},
+        })
+
+        regressions = compare(current, baseline, tolerance=0.2)
+
+        assert len(regressions) == 2
+        assert all(line.startswith("analyze:") for line in regressions)
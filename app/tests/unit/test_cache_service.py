@@ -0,0 +1,166 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock, patch
+
+from app.db.models import Analysis
+from app.services import analysis_service
+from app.services.cache_service import AnalysisCache, SingleFlight, make_cache_key
+from app.tests.integration.fixtures import test_db
+
+
+RESULT = {
+    "summary": "A summary",
+    "title": "A title",
+    "key_topics": ["topic"],
+    "sentiment": "neutral",
+    "keywords": ["word"]
+}
+
+
+class TestCacheKey:
+    """Test cases for content-addressed cache keys"""
+
+    def test_whitespace_is_normalized(self):
+        """Test that whitespace differences map to the same key"""
+        assert make_cache_key("Hello   world\n") == make_cache_key(" Hello world")
+
+    def test_model_and_prompt_version_are_part_of_key(self):
+        """Test that changing the model or prompt version changes the key"""
+        base = make_cache_key("text", model="m1", prompt_version="1")
+        assert base != make_cache_key("text", model="m2", prompt_version="1")
+        assert base != make_cache_key("text", model="m1", prompt_version="2")
+
+
+class TestAnalysisCache:
+    """Test cases for the two-tier analysis cache"""
+
+    async def test_memory_hit_skips_persisted_tier(self, test_db):
+        """Test that a second lookup is served from memory"""
+        cache = AnalysisCache()
+        await cache.set("k", RESULT)
+
+        assert await cache.get("k") == RESULT
+        assert cache.stats()["memory_hits"] == 1
+        assert cache.stats()["misses"] == 0
+
+    async def test_persisted_tier_survives_memory_clear(self, test_db):
+        """Test that results are recovered from SQLite after the LRU is cleared"""
+        cache = AnalysisCache()
+        await cache.set("k", RESULT)
+        cache.clear()
+
+        assert await cache.get("k") == RESULT
+        assert cache.stats()["db_hits"] == 1
+
+    async def test_miss_is_counted(self, test_db):
+        """Test that unknown keys count as misses"""
+        cache = AnalysisCache()
+
+        assert await cache.get("missing") is None
+        assert cache.stats()["misses"] == 1
+
+    def test_lru_evicts_least_recently_used(self):
+        """Test entry-count eviction keeps the most recently used keys"""
+        cache = AnalysisCache(max_entries=2)
+        cache._set_memory("a", RESULT)
+        cache._set_memory("b", RESULT)
+        cache._get_memory("a")
+        cache._set_memory("c", RESULT)
+
+        assert cache._get_memory("a") is not None
+        assert cache._get_memory("b") is None
+        assert cache.stats()["evictions"] == 1
+
+    def test_size_based_eviction(self):
+        """Test that the byte budget bounds the in-memory tier"""
+        cache = AnalysisCache(max_bytes=300)
+        for key in "abcde":
+            cache._set_memory(key, RESULT)
+
+        assert cache.stats()["bytes"] <= 300
+        assert cache.stats()["evictions"] > 0
+
+    def test_expired_entries_are_dropped(self):
+        """Test that in-memory entries expire after the TTL"""
+        cache = AnalysisCache(ttl_seconds=10)
+        cache._set_memory("k", RESULT)
+
+        with patch("app.services.cache_service.time.monotonic", return_value=time.monotonic() + 11):
+            assert cache._get_memory("k") is None
+
+
+class TestSingleFlight:
+    """Test cases for in-flight request coalescing"""
+
+    async def test_concurrent_calls_share_one_computation(self):
+        """Test that callers of the same key get one result from one call"""
+        flight = SingleFlight()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return RESULT
+
+        results = await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+
+        assert calls == 1
+        assert all(result is RESULT for result in results)
+        assert flight.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 4, "coalesced_ratio": 0.8}
+
+    async def test_key_is_released_after_completion(self):
+        """Test that a later call with the same key starts new work"""
+        flight = SingleFlight()
+        work = AsyncMock(side_effect=[1, 2])
+
+        assert await flight.do("k", work) == 1
+        assert await flight.do("k", work) == 2
+
+    async def test_errors_reach_every_caller(self):
+        """Test that a failure is raised in the leader and the followers"""
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(flight.do("k", work), flight.do("k", work), return_exceptions=True)
+
+        assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+        assert flight.stats()["in_flight"] == 0
+
+    async def test_cancelled_caller_does_not_cancel_followers(self):
+        """Test that the shared work keeps running when its first caller goes away"""
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.02)
+            return RESULT
+
+        leader = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await follower == RESULT
+
+    async def test_identical_analyses_make_one_upstream_call_and_row(self, test_db):
+        """Test that concurrent analyze_and_store calls for one text persist one row"""
+        analysis_service.analysis_cache.clear()
+
+        async def analyze(backend, text):
+            await asyncio.sleep(0.01)
+            return {k: v for k, v in RESULT.items() if k != "keywords"}
+
+        with patch("app.services.backend_service.analyze", side_effect=analyze) as upstream, \
+                patch("app.services.nlp_service.extract_keywords", AsyncMock(return_value=["word"])):
+            results = await asyncio.gather(*(
+                analysis_service.analyze_and_store("Coalesce   me please.") for _ in range(4)
+            ))
+
+        assert upstream.call_count == 1
+        assert all(result == RESULT for result in results)
+        assert len(await Analysis.search_by_sentiment("neutral")) == 1
+        analysis_service.analysis_cache.clear()
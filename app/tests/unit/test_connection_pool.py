@@ -0,0 +1,76 @@
+import asyncio
+import os
+import tempfile
+from unittest.mock import patch
+
+import pytest
+
+from app.db import connection
+from app.db.connection import close_pool, get_db_connection, open_pool
+from app.db.migrator import run_migrations
+from app.db.models import Analysis
+
+
+@pytest.fixture
+async def pooled_db():
+    """Open the connection pool on an isolated database file."""
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.db') as tmp_file:
+        test_db_path = tmp_file.name
+
+    with patch('app.db.connection.DB_PATH', test_db_path):
+        pool = await open_pool(readers=2)
+        await run_migrations()
+        yield pool
+        await close_pool()
+
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(test_db_path + suffix):
+            os.unlink(test_db_path + suffix)
+
+
+class TestConnectionPool:
+    """Test cases for the pooled SQLite connections"""
+
+    async def test_pragmas_are_applied(self, pooled_db):
+        """Test that WAL and the tuned pragmas are enabled"""
+        async with get_db_connection(readonly=True) as conn:
+            journal_mode = await (await conn.execute("PRAGMA journal_mode")).fetchone()
+            synchronous = await (await conn.execute("PRAGMA synchronous")).fetchone()
+
+        assert journal_mode[0] == "wal"
+        assert synchronous[0] == 1  # NORMAL
+
+    async def test_connections_are_reused(self, pooled_db):
+        """Test that the pool hands out the same connections every time"""
+        async with get_db_connection() as first:
+            pass
+        async with get_db_connection() as second:
+            pass
+
+        assert first is second
+
+    async def test_readers_are_read_only(self, pooled_db):
+        """Test that reader connections refuse writes"""
+        with pytest.raises(Exception):
+            async with get_db_connection(readonly=True) as conn:
+                await conn.execute("INSERT INTO analyses (input_text) VALUES ('x')")
+
+    async def test_reads_do_not_wait_for_open_write(self, pooled_db):
+        """Test that a reader sees committed rows while a write is in progress"""
+        await Analysis(input_text="committed", sentiment="positive").save()
+
+        async with get_db_connection() as writer:
+            await writer.execute("INSERT INTO analyses (input_text, sentiment) VALUES ('pending', 'positive')")
+            results = await asyncio.wait_for(Analysis.search_by_sentiment("positive"), timeout=2)
+
+        assert [a.input_text for a in results] == ["committed"]
+
+    async def test_fallback_without_pool(self, pooled_db):
+        """Test that connections still work when no pool is open"""
+        await close_pool()
+        assert connection._pool is None
+
+        async with get_db_connection() as conn:
+            row = await (await conn.execute("SELECT 1")).fetchone()
+
+        assert row[0] == 1
@@ -0,0 +1,159 @@
+import json
+import os
+import tempfile
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.db.models import Analysis
+from app.services.cache_service import analysis_cache
+from app.services.ingest_service import Checkpoint, ingest
+from app.tests.integration.fixtures import test_db
+
+
+LLM_RESULT = {"summary": "s", "title": None, "key_topics": ["t"], "sentiment": "neutral"}
+
+
+@pytest.fixture
+def corpus():
+    """A small JSONL corpus with a duplicate and an unusable line."""
+    lines = [
+        {"text": "Ingest the first document."},
+        {"text": "Ingest the second document."},
+        {"text": "Ingest   the first document."},
+        {"body": "no text field"},
+        {"text": "Ingest the third document."},
+    ]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "corpus.jsonl")
+        with open(path, "w") as f:
+            f.write("\n".join(json.dumps(line) for line in lines) + "\n")
+        yield path, os.path.join(tmp_dir, "corpus.checkpoint")
+
+
+class TestCheckpoint:
+    """Test cases for the ingest checkpoint watermark"""
+
+    def test_watermark_only_advances_over_contiguous_lines(self):
+        """Test that out-of-order completions do not skip unfinished lines"""
+        checkpoint = Checkpoint(None, "corpus")
+        checkpoint.mark_done(2)
+        checkpoint.mark_done(3)
+        assert checkpoint.line == 0
+
+        checkpoint.mark_done(1)
+        assert checkpoint.line == 3
+
+
+class TestIngest:
+    """Test cases for the bulk ingest pipeline"""
+
+    async def test_ingest_dedupes_writes_and_checkpoints(self, test_db, corpus):
+        """Test a full run analyzes unique texts once and records progress"""
+        path, checkpoint_path = corpus
+        analysis_cache.clear()
+
+        with patch('app.services.openai_service.analyze_text', new=AsyncMock(return_value=LLM_RESULT)) as mock_llm, \
+             patch('app.services.nlp_service.extract_keywords_batch', side_effect=lambda texts: [["document"]] * len(texts)):
+            stats = await ingest(path, concurrency=2, rate=0, batch_size=2,
+                                 checkpoint_path=checkpoint_path, report_seconds=60)
+
+        assert (stats.read, stats.duplicates, stats.invalid, stats.written) == (5, 1, 1, 3)
+        assert mock_llm.await_count == 3
+        assert len(await Analysis.search_by_keyword("document")) == 3
+        with open(checkpoint_path) as f:
+            assert json.load(f)["line"] == 5
+
+    async def test_ingest_resumes_from_checkpoint(self, test_db, corpus):
+        """Test a second run skips lines that were already finished"""
+        path, checkpoint_path = corpus
+        analysis_cache.clear()
+
+        with patch('app.services.openai_service.analyze_text', new=AsyncMock(return_value=LLM_RESULT)) as mock_llm, \
+             patch('app.services.nlp_service.extract_keywords_batch', side_effect=lambda texts: [["document"]] * len(texts)):
+            await ingest(path, rate=0, checkpoint_path=checkpoint_path, report_seconds=60)
+            stats = await ingest(path, rate=0, checkpoint_path=checkpoint_path, report_seconds=60)
+
+        assert stats.read == 0
+        assert mock_llm.await_count == 3
+
+    async def test_failed_analyses_are_not_written(self, test_db, corpus):
+        """Test that LLM failures are counted, skipped and left unfinished"""
+        path, checkpoint_path = corpus
+        analysis_cache.clear()
+
+        with patch('app.services.openai_service.analyze_text', new=AsyncMock(return_value={"error": "boom"})):
+            stats = await ingest(path, rate=0, checkpoint_path=checkpoint_path, report_seconds=60)
+
+        # Three unique texts, plus the duplicate retried after its leader failed.
+        assert stats.failed == 4
+        assert stats.written == 0
+        with open(checkpoint_path) as f:
+            assert json.load(f)["line"] == 0
+
+    async def test_raised_errors_fail_only_their_document(self, test_db, corpus):
+        """Test that an exception from the LLM call is counted like an error result"""
+        path, checkpoint_path = corpus
+        analysis_cache.clear()
+
+        def reject_second(text):
+            if "second" in text:
+                raise ValueError("Error code: 400 - invalid request")
+            return LLM_RESULT
+
+        with patch('app.services.openai_service.analyze_text', new=AsyncMock(side_effect=reject_second)), \
+             patch('app.services.nlp_service.extract_keywords_batch', side_effect=lambda texts: [["document"]] * len(texts)):
+            stats = await ingest(path, rate=0, checkpoint_path=checkpoint_path, report_seconds=60)
+
+        assert (stats.failed, stats.written) == (1, 2)
+        with open(checkpoint_path) as f:
+            assert json.load(f)["line"] == 1
+
+    async def test_resume_retries_failed_lines(self, test_db, corpus):
+        """Test that a resumed run analyzes lines that failed before"""
+        path, checkpoint_path = corpus
+        analysis_cache.clear()
+        failing_once = AsyncMock(side_effect=lambda text: {"error": "boom"} if "second" in text else LLM_RESULT)
+
+        with patch('app.services.openai_service.analyze_text', new=failing_once), \
+             patch('app.services.nlp_service.extract_keywords_batch', side_effect=lambda texts: [["document"]] * len(texts)):
+            first = await ingest(path, rate=0, checkpoint_path=checkpoint_path, report_seconds=60)
+            with open(checkpoint_path) as f:
+                assert json.load(f)["line"] == 1
+            failing_once.side_effect = None
+            failing_once.return_value = LLM_RESULT
+            second = await ingest(path, rate=0, checkpoint_path=checkpoint_path, report_seconds=60)
+
+        assert (first.failed, first.written) == (1, 2)
+        assert (second.written, second.duplicates) == (1, 2)
+        assert len(await Analysis.search_by_keyword("document")) == 3
+
+    async def test_duplicate_takes_over_from_failed_leader(self, test_db, corpus):
+        """Test that a duplicate waiting on a failed analysis is analyzed itself"""
+        path, _ = corpus
+        analysis_cache.clear()
+        calls = []
+
+        async def fail_first_call(text):
+            calls.append(text)
+            return {"error": "boom"} if len(calls) == 1 else LLM_RESULT
+
+        with patch('app.services.openai_service.analyze_text', new=fail_first_call), \
+             patch('app.services.nlp_service.extract_keywords_batch', side_effect=lambda texts: [["document"]] * len(texts)):
+            stats = await ingest(path, concurrency=1, rate=0, report_seconds=60)
+
+        assert calls[:2] == ["Ingest the first document.", "Ingest   the first document."]
+        assert (stats.failed, stats.written) == (1, 3)
+
+    async def test_skips_texts_already_stored(self, test_db, corpus):
+        """Test that dedupe checks stored documents, not only the TTL-bound cache"""
+        path, _ = corpus
+        await Analysis(input_text="Ingest the second document.").save()
+        analysis_cache.clear()
+
+        with patch('app.services.openai_service.analyze_text', new=AsyncMock(return_value=LLM_RESULT)) as mock_llm, \
+             patch('app.services.nlp_service.extract_keywords_batch', side_effect=lambda texts: [["document"]] * len(texts)):
+            stats = await ingest(path, rate=0, report_seconds=60)
+
+        assert mock_llm.await_count == 2
+        assert (stats.written, stats.duplicates) == (2, 2)
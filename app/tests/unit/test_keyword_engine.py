@@ -0,0 +1,65 @@
+import random
+
+import pytest
+from nltk.tag.perceptron import PerceptronTagger
+
+from app.services.keyword_engine import KeywordEngine
+
+VOCAB = [
+    ("the", "DT"), ("cat", "NN"), ("dogs", "NNS"), ("sat", "VBD"), ("on", "IN"),
+    ("mat", "NN"), ("python", "NNP"), ("is", "VBZ"), ("quick", "JJ"), ("runs", "VBZ"),
+    ("2024", "CD"), ("x-ray", "NN"), ("data", "NNS"), ("park", "NN"), ("ran", "VBD"),
+]
+
+
+@pytest.fixture(scope="module")
+def toy_tagger():
+    """A small perceptron tagger trained in-process (no NLTK data needed)."""
+    rng = random.Random(7)
+    sentences = [[rng.choice(VOCAB) for _ in range(10)] for _ in range(200)]
+    tagger = PerceptronTagger(load=False)
+    tagger.train(sentences, nr_iter=3)
+    return tagger
+
+
+class TestKeywordEngine:
+    """Test cases for the reusable keyword engine"""
+
+    def test_tags_match_perceptron_tagger(self, toy_tagger):
+        """Test that the specialised tag loop reproduces PerceptronTagger.tag"""
+        engine = KeywordEngine(tagger=toy_tagger)
+        rng = random.Random(11)
+        words = [word for word, _ in VOCAB] + ["unseen", "zebra", "1999", "", "Mat"]
+
+        for _ in range(200):
+            tokens = [rng.choice(words) for _ in range(rng.randrange(30))]
+            assert list(engine.tag(tokens)) == toy_tagger.tag(tokens)
+
+    def test_memo_is_bounded(self, toy_tagger):
+        """Test that the tag memo never grows past memo_size"""
+        engine = KeywordEngine(tagger=toy_tagger, memo_size=5)
+        list(engine.tag(["unseen%d" % i for i in range(50)]))
+
+        assert len(engine._memo) <= 5
+
+    def test_count_nouns_in_window(self, toy_tagger):
+        """Test that only tokens inside [start, end) are counted"""
+        engine = KeywordEngine(tagger=toy_tagger)
+        tokens = ["the", "cat", "sat", "on", "the", "mat", "the", "cat"]
+        tags = dict(toy_tagger.tag(tokens))
+
+        counts = engine.count_nouns(tokens, 2, 6)
+
+        expected = {w for w in tokens[2:6] if tags[w].startswith("NN")}
+        assert set(counts) == expected
+
+    def test_stopwords_and_top_k(self, toy_tagger):
+        """Test that stopword filtering and top_k shape the result"""
+        engine = KeywordEngine(tagger=toy_tagger, top_k=1)
+        engine._stopwords = frozenset({"cat"})
+        tokens = ["the", "cat", "sat", "on", "the", "mat", "the", "cat", "on", "the", "mat"]
+
+        counts = engine.count_nouns(tokens)
+
+        assert "cat" not in counts
+        assert len(counts.most_common(engine.top_k)) <= 1
@@ -0,0 +1,186 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from unittest.mock import patch
+
+import httpx
+import pytest
+from openai import AsyncOpenAI
+
+from app.services import openai_service
+from app.services.openai_service import analyze_text, analyze_texts
+from app.services.resilience import CircuitBreaker, TokenBucket, backoff_delay, retry_after_seconds
+from app.tests.fake_openai_server import FakeServerConfig, create_app
+
+
+@asynccontextmanager
+async def fake_upstream(config: FakeServerConfig, breaker: CircuitBreaker = None):
+    """Point openai_service at an in-process fake server."""
+    app = create_app(config)
+    http_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app))
+    fake_client = AsyncOpenAI(api_key="fake", base_url="http://fake/v1",
+                              http_client=http_client, max_retries=0)
+    with patch.object(openai_service, "client", fake_client), \
+         patch.object(openai_service, "breaker", breaker or CircuitBreaker()), \
+         patch.object(openai_service, "RETRY_BASE_SECONDS", 0.01):
+        yield app
+    await http_client.aclose()
+
+
+class TestBackoff:
+    """Test cases for retry delays"""
+
+    def test_delay_is_bounded_by_cap(self):
+        """Test that jittered delays never exceed the cap"""
+        delays = [backoff_delay(10, base=0.5, cap=2.0) for _ in range(100)]
+
+        assert all(0 <= d <= 2.0 for d in delays)
+
+    def test_retry_after_takes_precedence(self):
+        """Test that a server-supplied delay is honored"""
+        assert backoff_delay(0, base=0.1, cap=1.0, retry_after=3.0) >= 3.0
+
+    def test_retry_after_header_parsing(self):
+        """Test seconds, milliseconds and missing Retry-After headers"""
+        assert retry_after_seconds(httpx.Response(429, headers={"retry-after": "2"})) == 2.0
+        assert retry_after_seconds(httpx.Response(429, headers={"retry-after-ms": "250"})) == 0.25
+        assert retry_after_seconds(httpx.Response(429)) is None
+        assert retry_after_seconds(httpx.Response(429, headers={"retry-after": "soon"})) is None
+
+
+class TestTokenBucket:
+    """Test cases for the per-minute limiter"""
+
+    async def test_burst_within_capacity_does_not_wait(self):
+        """Test that a full bucket serves a burst immediately"""
+        bucket = TokenBucket(per_minute=600)
+        start = time.monotonic()
+        for _ in range(10):
+            await bucket.acquire()
+
+        assert time.monotonic() - start < 0.05
+
+    async def test_empty_bucket_waits_for_refill(self):
+        """Test that acquiring past capacity waits for the refill rate"""
+        bucket = TokenBucket(per_minute=600)  # 10 tokens/second
+        await bucket.acquire(600)
+        start = time.monotonic()
+        await bucket.acquire(2)
+
+        assert time.monotonic() - start >= 0.15
+
+
+class TestCircuitBreaker:
+    """Test cases for the circuit breaker states"""
+
+    def test_opens_after_threshold_and_probes_after_reset(self):
+        """Test closed -> open -> half-open -> closed transitions"""
+        breaker = CircuitBreaker(failure_threshold=2, reset_seconds=0.05)
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+
+        assert breaker.state == "open"
+        assert not breaker.allow()
+
+        time.sleep(0.06)
+        assert breaker.allow()
+        assert not breaker.allow()  # only one probe at a time
+        breaker.record_success()
+        assert breaker.state == "closed"
+
+    def test_failed_probe_reopens(self):
+        """Test that a failing probe re-opens the circuit"""
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+        assert breaker.allow()
+        breaker.record_failure()
+
+        assert breaker.state == "open"
+
+
+class TestResilientCompletions:
+    """Test cases for openai_service against the fake upstream"""
+
+    async def test_transient_errors_are_retried(self):
+        """Test that 500s are retried until the upstream recovers"""
+        async with fake_upstream(FakeServerConfig(fail_first=2)) as app:
+            result = await analyze_text("The quarterly earnings exceeded expectations.")
+
+        assert "error" not in result
+        assert app.state.calls == 3
+
+    async def test_rate_limit_respects_retry_after(self):
+        """Test that a 429 waits for the Retry-After delay"""
+        config = FakeServerConfig(fail_first=1, fail_status=429, retry_after=0.2)
+        async with fake_upstream(config) as app:
+            start = time.monotonic()
+            result = await analyze_text("Some text")
+
+        assert "error" not in result
+        assert app.state.calls == 2
+        assert time.monotonic() - start >= 0.2
+
+    async def test_exhausted_retries_return_error(self):
+        """Test that a persistently failing upstream is reported, not raised"""
+        async with fake_upstream(FakeServerConfig(error_rate=1.0)) as app:
+            result = await analyze_text("Some text")
+
+        assert result == {"error": openai_service.UNAVAILABLE_ERROR}
+        assert app.state.calls == openai_service.MAX_RETRIES + 1
+
+    async def test_open_circuit_fails_fast(self):
+        """Test that calls are refused without reaching the upstream"""
+        breaker = CircuitBreaker(failure_threshold=2, reset_seconds=60)
+        async with fake_upstream(FakeServerConfig(error_rate=1.0), breaker) as app:
+            first = await analyze_text("Some text")
+            second = await analyze_text("Some other text")
+
+        assert first == {"error": openai_service.CIRCUIT_OPEN_ERROR}
+        assert second == {"error": openai_service.CIRCUIT_OPEN_ERROR}
+        assert app.state.calls == 2
+
+    async def test_rate_limited_probe_is_released(self):
+        """Test that a 429 on the half-open probe lets the retry probe again"""
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+        config = FakeServerConfig(fail_first=1, fail_status=429, retry_after=0.01)
+        async with fake_upstream(config, breaker) as app:
+            result = await analyze_text("Some text")
+
+        assert "error" not in result
+        assert app.state.calls == 2
+        assert breaker.state == "closed"
+
+    async def test_cancelled_probe_is_released(self):
+        """Test that cancelling the half-open probe does not wedge the breaker"""
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+        async with fake_upstream(FakeServerConfig(latency=5.0), breaker):
+            task = asyncio.create_task(analyze_text("Some text"))
+            await asyncio.sleep(0.05)
+            assert breaker.state == "half_open" and not breaker.allow()
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        assert breaker.allow()
+
+    async def test_invalid_json_is_asked_again(self):
+        """Test that a malformed reply is retried before being reported"""
+        async with fake_upstream(FakeServerConfig(invalid_json_rate=1.0)) as app:
+            result = await analyze_text("Some text")
+
+        assert result["error"] == "Failed to parse JSON response"
+        assert app.state.calls == openai_service.PARSE_RETRIES + 1
+
+    async def test_packed_batch_through_fake_server(self):
+        """Test that packed prompts are answered per text"""
+        async with fake_upstream(FakeServerConfig()) as app:
+            results = await analyze_texts(["first text here", "second longer sentence", "third"])
+
+        assert all("error" not in r for r in results)
+        assert app.state.calls == 1
@@ -0,0 +1,117 @@
+from unittest.mock import Mock, AsyncMock, patch
+
+import pytest
+
+from app.services import backend_service, local_analysis_service
+from app.services.local_analysis_service import analyze_local
+
+STOPWORDS = frozenset({"the", "a", "is", "and", "of", "to", "in", "it", "was", "for", "on", "with"})
+
+ARTICLE = (
+    "Solar Power Outlook\n"
+    "Solar panels are getting cheaper every year. "
+    "Installers report record demand for solar panels in cities. "
+    "The weather was mild on Tuesday. "
+    "Analysts expect solar capacity to double as panels keep falling in price."
+)
+
+
+@pytest.fixture(autouse=True)
+def offline_nltk_data():
+    """Stand-ins for the stopwords corpus and VADER lexicon."""
+    analyzer = Mock()
+    analyzer.polarity_scores = Mock(return_value={"compound": 0.4})
+    with patch.object(local_analysis_service, "_stopwords", STOPWORDS), \
+         patch.object(local_analysis_service, "_sentiment_analyzer", analyzer):
+        yield analyzer
+
+
+class TestAnalyzeLocal:
+    """Test cases for the CPU-only analysis backend"""
+
+    def test_returns_llm_response_shape(self):
+        """Test that the local analysis has the same keys as the LLM one"""
+        result = analyze_local(ARTICLE)
+
+        assert set(result) == {"summary", "title", "key_topics", "sentiment"}
+        assert isinstance(result["key_topics"], list)
+
+    def test_topics_and_summary_follow_term_weights(self):
+        """Test that recurring terms become topics and off-topic sentences are left out"""
+        result = analyze_local(ARTICLE)
+
+        assert "solar" in result["key_topics"]
+        assert "panels" in result["key_topics"]
+        assert "weather" not in result["summary"]
+
+    def test_short_first_line_is_the_title(self):
+        """Test that a heading line is reported as the title"""
+        assert analyze_local(ARTICLE)["title"] == "Solar Power Outlook"
+        assert analyze_local("Just one sentence here.")["title"] is None
+
+    def test_sentiment_thresholds(self, offline_nltk_data):
+        """Test that the VADER compound score maps to the three labels"""
+        for compound, label in ((0.5, "positive"), (0.0, "neutral"), (-0.5, "negative")):
+            offline_nltk_data.polarity_scores.return_value = {"compound": compound}
+            assert analyze_local("Some text.")["sentiment"] == label
+
+    def test_empty_text(self):
+        """Test that empty text produces empty fields instead of failing"""
+        result = analyze_local("")
+
+        assert result["summary"] == ""
+        assert result["key_topics"] == []
+
+
+class TestBackendRouting:
+    """Test cases for backend selection and accounting"""
+
+    def test_auto_routes_short_texts_locally(self):
+        """Test the length-based routing policy"""
+        with patch.object(backend_service, "ANALYSIS_BACKEND", "auto"), \
+             patch.object(backend_service, "LOCAL_MAX_CHARS", 20):
+            assert backend_service.select_backend("short text").name == "local"
+            assert backend_service.select_backend("a much longer text than twenty chars").name == "openai"
+
+    def test_request_overrides_policy(self):
+        """Test that a per-request backend wins over the policy"""
+        with patch.object(backend_service, "ANALYSIS_BACKEND", "openai"):
+            assert backend_service.select_backend("text", "local").name == "local"
+
+    def test_unknown_backend_is_rejected(self):
+        """Test that an unknown name raises ValueError"""
+        with pytest.raises(ValueError, match="Unknown backend"):
+            backend_service.select_backend("text", "nope")
+
+    async def test_backends_must_implement_analyze_many(self):
+        """Test that the base class is abstract and analyze() defaults to a batch of one"""
+        with pytest.raises(TypeError):
+            backend_service.AnalysisBackend()
+
+        class EchoBackend(backend_service.AnalysisBackend):
+            async def analyze_many(self, texts):
+                return [{"summary": text} for text in texts]
+
+        assert await EchoBackend().analyze("hi") == {"summary": "hi"}
+
+    async def test_stats_track_calls_errors_and_cost(self):
+        """Test that latency, errors and estimated cost are recorded per backend"""
+        backend = backend_service.OpenAIBackend()
+        with patch('app.services.openai_service.analyze_text', new=AsyncMock(return_value={"error": "boom"})):
+            await backend_service.analyze(backend, "some text")
+
+        stats = backend.stats.as_dict()
+        assert stats["calls"] == 1
+        assert stats["errors"] == 1
+        assert stats["estimated_tokens"] > 0
+        assert stats["estimated_cost_usd"] > 0
+
+    async def test_missing_nltk_data_is_an_error_payload(self):
+        """Test that requesting local without its NLTK data returns errors instead of raising"""
+        backend = backend_service.LocalBackend()
+        with patch.object(local_analysis_service, "analyze_local",
+                          side_effect=LookupError("Resource stopwords not found.")):
+            results = await backend_service.analyze_many(backend, ["one text", "another text"])
+
+        assert results == [{"error": "Local backend unavailable: missing NLTK data (stopwords, vader_lexicon)"}] * 2
+        assert backend.stats.errors == 2
@@ -0,0 +1,81 @@
+from unittest.mock import AsyncMock, patch
+
+from app.services import long_text_service
+from app.services.long_text_service import analyze_long_text, split_into_chunks
+from app.services.openai_service import analyze_text, estimate_tokens
+from app.tests.integration.fixtures import test_db
+
+
+SENTENCES = [f"Sentence number {i} talks about topic {i % 7} in some detail." for i in range(400)]
+DOCUMENT = " ".join(SENTENCES)
+
+PARTIAL = {"summary": "part", "title": None, "key_topics": ["topic"], "sentiment": "neutral"}
+MERGED = {"summary": "whole", "title": "Doc", "key_topics": ["topic"], "sentiment": "neutral"}
+
+
+class TestSplitIntoChunks:
+    """Test cases for sentence-boundary chunking"""
+
+    def test_chunks_respect_token_budget_and_keep_all_text(self):
+        """Test that chunks stay under the budget and lose no sentences"""
+        chunks = split_into_chunks(DOCUMENT, max_tokens=300)
+
+        assert len(chunks) > 1
+        assert all(estimate_tokens(chunk) <= 300 + 1 for chunk in chunks)
+        assert " ".join(chunks) == DOCUMENT
+
+    def test_edit_only_changes_nearby_chunks(self):
+        """Test that content-defined boundaries resynchronize after an edit"""
+        edited = list(SENTENCES)
+        edited[200] = "This sentence was rewritten by an editor and is much longer than before it was."
+        before = split_into_chunks(DOCUMENT, max_tokens=300)
+        after = split_into_chunks(" ".join(edited), max_tokens=300)
+
+        changed = set(after) - set(before)
+        assert 1 <= len(changed) <= 2
+
+    def test_overlong_sentence_is_split_on_words(self):
+        """Test that a single huge sentence is still bounded"""
+        chunks = split_into_chunks("word " * 5000, max_tokens=300)
+        assert all(estimate_tokens(chunk) <= 301 for chunk in chunks)
+
+
+class TestAnalyzeLongText:
+    """Test cases for map-reduce analysis of long documents"""
+
+    async def test_long_text_is_routed_to_map_reduce(self):
+        """Test that analyze_text chunks texts over the long-text threshold"""
+        with patch('app.services.openai_service.LONG_TEXT_TOKENS', 100), \
+             patch('app.services.long_text_service.analyze_long_text', new=AsyncMock(return_value=MERGED)) as mock_long:
+            assert await analyze_text(DOCUMENT) == MERGED
+            mock_long.assert_awaited_once_with(DOCUMENT)
+
+    async def test_only_changed_chunks_are_reanalyzed(self, test_db):
+        """Test that chunk results are cached between analyses of an edited document"""
+        long_text_service.chunk_cache.clear()
+        edited = list(SENTENCES)
+        edited[200] = "This sentence was rewritten by an editor and is much longer than before it was."
+
+        with patch.object(long_text_service, "CHUNK_MAX_TOKENS", 300), \
+             patch('app.services.openai_service.analyze_single', new=AsyncMock(return_value=PARTIAL)) as mock_map, \
+             patch('app.services.openai_service.complete_json', new=AsyncMock(return_value=MERGED)) as mock_reduce:
+            assert await analyze_long_text(DOCUMENT) == MERGED
+            first_calls = mock_map.await_count
+
+            assert await analyze_long_text(" ".join(edited)) == MERGED
+            second_calls = mock_map.await_count - first_calls
+
+        assert first_calls == len(split_into_chunks(DOCUMENT, max_tokens=300))
+        assert 1 <= second_calls <= 2
+        assert mock_reduce.await_count >= 2
+
+    async def test_failed_chunk_fails_the_analysis(self, test_db):
+        """Test that a chunk error is reported instead of a partial result"""
+        long_text_service.chunk_cache.clear()
+
+        with patch.object(long_text_service, "CHUNK_MAX_TOKENS", 300), \
+             patch('app.services.openai_service.analyze_single', new=AsyncMock(return_value={"error": "LLM request timed out"})):
+            result = await analyze_long_text(DOCUMENT + " unique")
+
+        assert "error" in result
+        assert "LLM request timed out" in result["error"]
@@ -0,0 +1,97 @@
+import threading
+import time
+from unittest.mock import Mock, patch
+
+from app.services.metrics_service import Counter, Gauge, Histogram, _metrics, log_event, record_usage, LLM_TOKENS
+from app.services.profiler import StackSampler
+
+
+def _unregistered(metric):
+    _metrics.remove(metric)
+    return metric
+
+
+class TestMetrics:
+    """Test cases for the Prometheus-style metric types"""
+
+    def test_histogram_renders_cumulative_buckets(self):
+        """Test bucket counts are cumulative and end with +Inf, sum and count"""
+        histogram = _unregistered(Histogram("t_seconds", "Test.", ("stage",), buckets=(0.1, 1.0)))
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value, stage="llm")
+
+        assert list(histogram.render()) == [
+            "# HELP t_seconds Test.",
+            "# TYPE t_seconds histogram",
+            't_seconds_bucket{stage="llm",le="0.1"} 1',
+            't_seconds_bucket{stage="llm",le="1.0"} 2',
+            't_seconds_bucket{stage="llm",le="+Inf"} 3',
+            't_seconds_sum{stage="llm"} 5.55',
+            't_seconds_count{stage="llm"} 3',
+        ]
+
+    def test_counter_and_gauge(self):
+        """Test counters accumulate per label set and gauges track blocks in flight"""
+        counter = _unregistered(Counter("t_total", "Test.", ("kind",)))
+        counter.inc(2, kind='a"b')
+        gauge = _unregistered(Gauge("t_in_flight", "Test."))
+        with gauge.track():
+            assert gauge.values[()] == 1
+
+        assert 't_total{kind="a\\"b"} 2' in list(counter.render())
+        assert gauge.values[()] == 0
+
+    def test_record_usage_ignores_missing_counts(self):
+        """Test token usage is counted only when the response reports integers"""
+        before = LLM_TOKENS.values.get(("prompt",), 0)
+        record_usage(Mock(prompt_tokens=7, completion_tokens=3))
+        record_usage(Mock())
+        record_usage(None)
+
+        assert LLM_TOKENS.values[("prompt",)] == before + 7
+
+
+class TestSampledLogs:
+    """Test cases for structured, sampled logging"""
+
+    def test_sampling(self, capsys):
+        """Test that a zero rate logs nothing and a full rate logs JSON lines"""
+        log_event("test.event", sample_rate=0, chars=3)
+        log_event("test.event", sample_rate=1, chars=3)
+
+        lines = capsys.readouterr().out.splitlines()
+        assert len(lines) == 1
+        assert '"event": "test.event"' in lines[0]
+        assert '"chars": 3' in lines[0]
+
+    def test_partial_rate_uses_random_draw(self, capsys):
+        """Test that draws above the rate are dropped"""
+        with patch("app.services.metrics_service.random.random", return_value=0.9):
+            log_event("test.event", sample_rate=0.5)
+
+        assert capsys.readouterr().out == ""
+
+
+class TestStackSampler:
+    """Test cases for the sampling profiler"""
+
+    def test_samples_a_busy_thread(self):
+        """Test that a thread spinning in a function shows up in folded stacks"""
+        stop = threading.Event()
+
+        def spin_for_profiler():
+            while not stop.is_set():
+                pass
+
+        thread = threading.Thread(target=spin_for_profiler)
+        thread.start()
+        sampler = StackSampler(thread.ident, interval=0.001)
+        sampler.start()
+        time.sleep(0.1)
+        sampler.stop()
+        stop.set()
+        thread.join()
+
+        folded = sampler.folded(reset=True)
+        assert "spin_for_profiler" in folded
+        assert sampler.folded() == ""
@@ -0,0 +1,80 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from app.services import nlp_service
+from app.services.nlp_service import (
+    _chunk_bounds,
+    extract_keywords,
+    extract_three_most_common_nouns,
+    shutdown_nlp_pool,
+    start_nlp_pool,
+)
+
+
+LONG_TEXT = " ".join([
+    "The cat sat on the mat. The dog ran to the park. The cat played with the ball.",
+    "Python is a programming language. Python developers use Python for data science.",
+    "The system uses advanced neural networks and deep learning techniques.",
+] * 40)
+
+
+class TestChunkBounds:
+    """Test cases for choosing safe split points for parallel tagging"""
+
+    def test_splits_only_after_two_tagdict_words(self):
+        """Test that every cut follows two words with a fixed tag"""
+        tokens = ["cat", "the", ".", "dog", "runs", "the", "of", "park", "x", "y"]
+        tagdict = {"the": "DT", ".": ".", "of": "IN"}
+
+        bounds = _chunk_bounds(tokens, tagdict, 2)
+
+        assert bounds[0][0] == 0 and bounds[-1][1] == len(tokens)
+        for start, _ in bounds[1:]:
+            assert tokens[start - 2] in tagdict and tokens[start - 1] in tagdict
+
+    def test_chunks_cover_every_token_once(self):
+        """Test that chunks are contiguous and non-overlapping"""
+        tokens = ["the", "."] * 50
+        bounds = _chunk_bounds(tokens, {"the": "DT", ".": "."}, 7)
+
+        assert [start for start, _ in bounds[1:]] == [end for _, end in bounds[:-1]]
+        assert sum(end - start for start, end in bounds) == len(tokens)
+
+    def test_no_safe_split_point_keeps_one_chunk(self):
+        """Test that text without tagdict pairs is tagged whole"""
+        tokens = ["cat", "dog"] * 20
+        assert _chunk_bounds(tokens, {}, 5) == [(0, len(tokens))]
+
+
+class TestExtractKeywordsPool:
+    """Test cases for keyword extraction on the process pool"""
+
+    async def test_inline_fallback_without_pool(self):
+        """Test that extraction works when the pool is not running"""
+        with patch('app.services.nlp_service.extract_three_most_common_nouns', return_value=["cat"]):
+            assert await extract_keywords("The cat.") == ["cat"]
+
+    async def test_chunked_pool_results_match_single_pass(self):
+        """Test that parallel chunked tagging returns identical keywords"""
+        start_nlp_pool(workers=2)
+        try:
+            with patch.object(nlp_service, "NLP_CHUNK_CHARS", 100), \
+                 patch.object(nlp_service, "NLP_CHUNK_TOKENS", 50):
+                result = await extract_keywords(LONG_TEXT)
+        finally:
+            shutdown_nlp_pool()
+
+        assert result == extract_three_most_common_nouns(LONG_TEXT)
+
+    async def test_chunk_merge_does_not_build_an_engine_in_the_parent(self):
+        """Test that merging chunk counts uses NLP_TOP_K instead of loading a tagger on the event loop"""
+        windows = [("first",), ("second",)]
+        counts = {"first": Counter(cat=2, dog=1), "second": Counter(dog=2, park=1, ball=1)}
+        with ThreadPoolExecutor(2) as executor, \
+             patch.object(nlp_service, "_executor", executor), \
+             patch.object(nlp_service, "NLP_CHUNK_CHARS", 1), \
+             patch.object(nlp_service, "_split_for_tagging", return_value=windows), \
+             patch.object(nlp_service, "_count_nouns", side_effect=counts.get), \
+             patch.object(nlp_service, "get_engine", side_effect=AssertionError("engine built")):
+            assert await extract_keywords("long text") == ["dog", "cat", "park"]
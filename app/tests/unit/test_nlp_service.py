@@ -1,5 +1,5 @@
 import pytest
-from app.services.nlp_service import extract_three_most_common_nouns
+from app.services.nlp_service import extract_three_most_common_nouns, extract_keywords_batch
 
 
 class TestKeywordExtraction:
@@ -59,4 +59,16 @@ class TestKeywordExtraction:
         text = ""
         result = extract_three_most_common_nouns(text)
         
-        assert len(result) == 0
\ No newline at end of file
+        assert len(result) == 0
+
+    def test_extract_keywords_batch_matches_single_extraction(self):
+        """Test that batch extraction returns the same nouns as one-by-one extraction"""
+        texts = [
+            "The cat sat on the mat. The dog ran to the park. The cat played with the ball.",
+            "Python is a programming language. Python developers use Python for data science.",
+            "",
+            "Run fast!"
+        ]
+        result = extract_keywords_batch(texts)
+
+        assert result == [extract_three_most_common_nouns(text) for text in texts]
@@ -0,0 +1,76 @@
+from unittest.mock import AsyncMock, patch
+
+from app.services import openai_service
+from app.services.openai_service import analyze_texts, pack_texts
+from app.tests.helpers import make_completion
+
+
+class TestPackTexts:
+    """Test cases for grouping texts into shared prompts"""
+
+    def test_short_texts_are_packed_together(self):
+        """Test that short texts share a pack"""
+        packs, singles = pack_texts(["short one", "short two", "short three"])
+
+        assert packs == [[0, 1, 2]]
+        assert singles == []
+
+    def test_long_texts_are_analyzed_alone(self):
+        """Test that texts above the per-item limit are not packed"""
+        long_text = "word " * (openai_service.PACK_MAX_ITEM_TOKENS * 4)
+        packs, singles = pack_texts(["short", long_text, "also short"])
+
+        assert packs == [[0, 2]]
+        assert singles == [1]
+
+    def test_packs_respect_item_limit(self):
+        """Test that no pack exceeds the maximum number of texts"""
+        with patch.object(openai_service, "PACK_MAX_ITEMS", 2):
+            packs, singles = pack_texts(["a", "b", "c", "d", "e"])
+
+        assert packs == [[0, 1], [2, 3]]
+        assert singles == [4]
+
+
+class TestAnalyzeTexts:
+    """Test cases for batched LLM analysis"""
+
+    async def test_packed_results_are_returned_in_input_order(self):
+        """Test that one completion answers a whole pack in order"""
+        packed = {"results": [
+            {"id": 1, "summary": "second", "title": None, "key_topics": [], "sentiment": "neutral"},
+            {"id": 0, "summary": "first", "title": None, "key_topics": [], "sentiment": "positive"},
+        ]}
+        with patch('app.services.openai_service.client') as mock_client:
+            mock_client.chat.completions.create = AsyncMock(return_value=make_completion(packed))
+
+            results = await analyze_texts(["first text", "second text"])
+
+            assert mock_client.chat.completions.create.await_count == 1
+            assert [r["summary"] for r in results] == ["first", "second"]
+            assert all("id" not in r for r in results)
+
+    async def test_items_missing_from_pack_are_retried_alone(self):
+        """Test that dropped pack entries fall back to a single analysis"""
+        packed = {"results": [
+            {"id": 0, "summary": "first", "title": None, "key_topics": [], "sentiment": "positive"},
+        ]}
+        single = {"summary": "retried", "title": None, "key_topics": [], "sentiment": "neutral"}
+        with patch('app.services.openai_service.client') as mock_client:
+            mock_client.chat.completions.create = AsyncMock(
+                side_effect=[make_completion(packed), make_completion(single)]
+            )
+
+            results = await analyze_texts(["first text", "second text"])
+
+            assert [r["summary"] for r in results] == ["first", "retried"]
+
+    async def test_errors_are_reported_per_item(self):
+        """Test that a failed single analysis does not fail the batch"""
+        long_text = "word " * (openai_service.PACK_MAX_ITEM_TOKENS * 4)
+        with patch('app.services.openai_service.client') as mock_client:
+            mock_client.chat.completions.create = AsyncMock(return_value=make_completion("not json"))
+
+            results = await analyze_texts([long_text])
+
+            assert results[0]["error"] == "Failed to parse JSON response"
@@ -1,6 +1,6 @@
 import pytest
 import json
-from unittest.mock import Mock, patch
+from unittest.mock import Mock, AsyncMock, patch
 from app.services.openai_service import analyze_text
 from app.db.models import Analysis
 
@@ -8,7 +8,7 @@ from app.db.models import Analysis
 class TestJSONSchemaValidation:
     """Test cases for JSON schema validation"""
 
-    def test_openai_response_schema_valid(self):
+    async def test_openai_response_schema_valid(self):
         """Test that OpenAI service returns expected schema format"""
         expected_keys = {"summary", "title", "key_topics", "sentiment"}
         
@@ -26,9 +26,9 @@ class TestJSONSchemaValidation:
             mock_message.content = json.dumps(mock_response)
             mock_choice.message = mock_message
             mock_completion.choices = [mock_choice]
-            mock_client.chat.completions.create.return_value = mock_completion
+            mock_client.chat.completions.create = AsyncMock(return_value=mock_completion)
             
-            result = analyze_text("test text")
+            result = await analyze_text("test text")
             
             assert all(key in result for key in expected_keys)
             assert isinstance(result["summary"], str)
@@ -36,7 +36,7 @@ class TestJSONSchemaValidation:
             assert isinstance(result["key_topics"], list)
             assert result["sentiment"] in ["positive", "negative", "neutral"]
 
-    def test_openai_response_schema_with_null_title(self):
+    async def test_openai_response_schema_with_null_title(self):
         """Test schema validation when title is null"""
         mock_response = {
             "summary": "This is a test summary",
@@ -52,16 +52,16 @@ class TestJSONSchemaValidation:
             mock_message.content = json.dumps(mock_response)
             mock_choice.message = mock_message
             mock_completion.choices = [mock_choice]
-            mock_client.chat.completions.create.return_value = mock_completion
+            mock_client.chat.completions.create = AsyncMock(return_value=mock_completion)
             
-            result = analyze_text("test text")
+            result = await analyze_text("test text")
             
             assert result["title"] is None
             assert isinstance(result["summary"], str)
             assert isinstance(result["key_topics"], list)
             assert result["sentiment"] in ["positive", "negative", "neutral"]
 
-    def test_openai_response_schema_invalid_json(self):
+    async def test_openai_response_schema_invalid_json(self):
         """Test error handling for invalid JSON response"""
         with patch('app.services.openai_service.client') as mock_client:
             mock_completion = Mock()
@@ -70,9 +70,9 @@ class TestJSONSchemaValidation:
             mock_message.content = "Invalid JSON response"
             mock_choice.message = mock_message
             mock_completion.choices = [mock_choice]
-            mock_client.chat.completions.create.return_value = mock_completion
+            mock_client.chat.completions.create = AsyncMock(return_value=mock_completion)
             
-            result = analyze_text("test text")
+            result = await analyze_text("test text")
             
             assert "error" in result
             assert result["error"] == "Failed to parse JSON response"
@@ -111,7 +111,7 @@ class TestJSONSchemaValidation:
         assert analysis.sentiment == ""
         assert analysis.keywords == []
 
-    def test_complete_response_schema(self):
+    async def test_complete_response_schema(self):
         """Test the complete response schema from the /analyze endpoint"""
         # Mock both services
         openai_response = {
@@ -130,13 +130,13 @@ class TestJSONSchemaValidation:
             mock_message.content = json.dumps(openai_response)
             mock_choice.message = mock_message
             mock_completion.choices = [mock_choice]
-            mock_client.chat.completions.create.return_value = mock_completion
+            mock_client.chat.completions.create = AsyncMock(return_value=mock_completion)
             
             with patch('app.services.nlp_service.extract_three_most_common_nouns') as mock_nlp:
                 mock_nlp.return_value = nlp_response
                 
                 # Simulate the endpoint logic
-                openai_result = analyze_text("test text")
+                openai_result = await analyze_text("test text")
                 nlp_result = nlp_response
                 
                 complete_response = {
@@ -154,4 +154,17 @@ class TestJSONSchemaValidation:
                 assert isinstance(complete_response["key_topics"], list)
                 assert complete_response["sentiment"] in ["positive", "negative", "neutral"]
                 assert isinstance(complete_response["keywords"], list)
-                assert len(complete_response["keywords"]) <= 3
\ No newline at end of file
+                assert len(complete_response["keywords"]) <= 3
+
+    async def test_openai_timeout_returns_error(self):
+        """Test that an upstream timeout is reported instead of raised"""
+        import httpx
+        from openai import APITimeoutError
+
+        with patch('app.services.openai_service.client') as mock_client:
+            request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+            mock_client.chat.completions.create = AsyncMock(side_effect=APITimeoutError(request=request))
+
+            result = await analyze_text("test text")
+
+            assert result == {"error": "LLM request timed out"}
@@ -0,0 +1,36 @@
+from app.db.models import SNIPPET_TOKENS, build_snippet, to_fts_query
+
+
+class TestFullTextQuery:
+    """Test cases for building FTS5 queries from user input"""
+
+    def test_words_are_quoted(self):
+        """Test that each word becomes a quoted term"""
+        assert to_fts_query('cloud AND "scale') == '"cloud" "AND" """scale"'
+
+    def test_prefix_match_is_kept(self):
+        """Test that a trailing star stays a prefix query"""
+        assert to_fts_query("comput*") == '"comput"*'
+        assert to_fts_query("  *  ") == ""
+
+
+class TestSnippet:
+    """Test cases for search snippets built from the stored text"""
+
+    def test_matches_are_marked_by_stem(self):
+        """Test that words matching a query term's stem are highlighted"""
+        snippet = build_snippet(["Clouds scale; the cloud scaled."], "cloud scaling")
+        assert snippet == "<mark>Clouds</mark> <mark>scale</mark>; the <mark>cloud</mark> <mark>scaled</mark>"
+
+    def test_long_text_is_trimmed_around_the_match(self):
+        """Test that the excerpt is a window around the match with ellipses"""
+        text = " ".join(f"w{i}" for i in range(40)) + " target " + " ".join(f"x{i}" for i in range(40))
+        snippet = build_snippet([text], "target")
+        assert snippet.startswith("…w37 w38 w39 <mark>target</mark> x0")
+        assert snippet.endswith("…")
+        assert len(snippet.replace("<mark>", "").replace("</mark>", "").strip("…").split()) == SNIPPET_TOKENS
+
+    def test_falls_back_to_summary_and_prefix(self):
+        """Test that the summary is used when the text has no match, and `*` matches prefixes"""
+        assert build_snippet(["unrelated text", "about computing"], "comput*") == "about <mark>computing</mark>"
+        assert build_snippet([None, ""], "anything") == ""
@@ -0,0 +1,48 @@
+import os
+import subprocess
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from app.services import nlp_service
+
+REPO_ROOT = os.path.join(os.path.dirname(__file__), "..", "..", "..")
+
+# Modules that must not be imported just by importing the app: they are slow
+# to load and are pulled in lazily by the code that needs them.
+DEFERRED_MODULES = ("nltk", "openai", "httpx")
+
+
+class TestStartup:
+    """Test cases for lazy imports and startup resource checks"""
+
+    def test_importing_app_defers_heavy_modules(self):
+        """Test that `import main` does not load NLTK or the OpenAI SDK"""
+        code = (
+            "import sys, main; "
+            f"print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True,
+            cwd=REPO_ROOT, env={**os.environ, "OPENAI_API_KEY": "x"},
+        )
+
+        assert result.stdout.strip() == ""
+
+    def test_missing_nltk_data_fails_fast(self):
+        """Test that strict mode raises instead of downloading"""
+        with patch.object(nlp_service, "missing_nltk_data", return_value=["punkt_tab"]), \
+             patch("nltk.download") as download:
+            with pytest.raises(RuntimeError, match="punkt_tab"):
+                nlp_service.ensure_nltk_data(download=False)
+
+            download.assert_not_called()
+
+    def test_download_mode_fetches_missing_data(self):
+        """Test that NLTK_DOWNLOAD-style mode downloads and re-checks"""
+        with patch.object(nlp_service, "missing_nltk_data", side_effect=[["punkt_tab"], []]), \
+             patch("nltk.download") as download:
+            nlp_service.ensure_nltk_data(download=True)
+
+            download.assert_called_once_with("punkt_tab", quiet=True)
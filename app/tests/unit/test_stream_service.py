@@ -0,0 +1,51 @@
+import json
+
+from app.services.stream_service import JSONFieldStream
+
+
+def feed_all(parser, text, step):
+    fields = []
+    for i in range(0, len(text), step):
+        fields.extend(parser.feed(text[i:i + step]))
+    return fields
+
+
+class TestJSONFieldStream:
+    """Test cases for parsing streamed JSON into fields"""
+
+    def test_fields_are_emitted_as_they_complete(self):
+        """Test that each field is returned once its value is complete"""
+        parser = JSONFieldStream()
+
+        assert list(parser.feed('{"summary": "Half a sen')) == []
+        assert list(parser.feed('tence.", "title": nu')) == [("summary", "Half a sentence.")]
+        assert list(parser.feed('ll, "key_topics": ["a", "b"')) == [("title", None)]
+        assert list(parser.feed(']}')) == [("key_topics", ["a", "b"])]
+
+    def test_any_chunking_gives_the_same_fields(self):
+        """Test that chunk boundaries do not change the parsed fields"""
+        payload = {
+            "summary": "Commas, \"quotes\" and {braces} inside strings.",
+            "title": None,
+            "key_topics": ["x", "y, z"],
+            "sentiment": "neutral",
+            "score": 12.5,
+        }
+        text = json.dumps(payload, indent=2)
+
+        for step in (1, 2, 3, 7, 50, len(text)):
+            assert dict(feed_all(JSONFieldStream(), text, step)) == payload
+
+    def test_numbers_wait_for_a_delimiter(self):
+        """Test that a number at the end of the buffer is not emitted early"""
+        parser = JSONFieldStream()
+
+        assert list(parser.feed('{"count": 12')) == []
+        assert list(parser.feed('3}')) == [("count", 123)]
+
+    def test_buffer_keeps_the_raw_text(self):
+        """Test that the complete text is available for the final parse"""
+        parser = JSONFieldStream()
+        feed_all(parser, '{"a": 1}', 3)
+
+        assert json.loads(parser.buffer) == {"a": 1}
@@ -0,0 +1,138 @@
+import numpy as np
+import pytest
+
+from app.services.embedding_service import VectorIndex, embed_local
+
+
+def _random_unit(rows, dim, seed=0):
+    vectors = np.random.default_rng(seed).normal(size=(rows, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+class TestLocalEmbedding:
+    """Test cases for the offline hashed embedding"""
+
+    def test_vectors_are_unit_float32(self):
+        """Test that embeddings are normalized float32 rows of the requested width"""
+        vectors = embed_local(["Cloud computing at scale", ""], dim=64)
+
+        assert vectors.shape == (2, 64)
+        assert vectors.dtype == np.float32
+        assert np.isclose(np.linalg.norm(vectors[0]), 1.0)
+        assert not vectors[1].any()
+
+    def test_shared_vocabulary_scores_higher(self):
+        """Test that texts sharing words are closer than unrelated texts"""
+        query, near, far = embed_local([
+            "python programming for data science",
+            "data science projects written in python",
+            "the weather turned cold and rainy",
+        ])
+
+        assert query @ near > query @ far
+
+    def test_embedding_is_deterministic(self):
+        """Test that the hashing does not depend on the process (no salted hash())"""
+        assert np.array_equal(embed_local(["same text"]), embed_local(["same text"]))
+
+
+class TestVectorIndex:
+    """Test cases for the in-memory vector index"""
+
+    def test_search_matches_brute_force(self):
+        """Test that exact search returns the top-k by dot product, best first"""
+        vectors = _random_unit(500, 32)
+        index = VectorIndex(32, lists=0)
+        index.add(list(range(1, 501)), vectors)
+
+        results = index.search(vectors[7], k=5)
+        expected = np.argsort(-(vectors @ vectors[7]))[:5] + 1
+
+        assert [analysis_id for analysis_id, _ in results] == expected.tolist()
+        assert results[0] == (8, pytest.approx(1.0, abs=1e-5))
+
+    def test_add_grows_and_skips_known_ids(self):
+        """Test incremental appends past the initial capacity, ignoring duplicates"""
+        vectors = _random_unit(3000, 8)
+        index = VectorIndex(8, lists=0)
+        index.add(list(range(2000)), vectors[:2000])
+        index.add(list(range(1000, 3000)), vectors[1000:])
+
+        assert len(index) == 3000
+        assert np.array_equal(index.vector(2999), vectors[2999])
+
+    def test_exclude_drops_the_query_row(self):
+        """Test that searching by a stored vector can leave that row out"""
+        vectors = _random_unit(10, 8)
+        index = VectorIndex(8, lists=0)
+        index.add(list(range(10)), vectors)
+
+        ids = [analysis_id for analysis_id, _ in index.search(vectors[3], k=10, exclude=3)]
+
+        assert 3 not in ids
+        assert len(ids) == 9
+
+    def test_ivf_search_scans_fewer_rows_with_good_recall(self):
+        """Test that the partitioned index finds most exact neighbours"""
+        vectors = _random_unit(4000, 16, seed=1)
+        index = VectorIndex(16, lists=32, probes=8, ivf_min_rows=1000)
+        index.add(list(range(4000)), vectors)
+        assert index.centroids is None and index.needs_training
+        index.train()
+        assert index.centroids is not None
+
+        found = 0
+        for query in vectors[:50]:
+            exact = set(np.argsort(-(vectors @ query))[:10].tolist())
+            assert len(index._candidates(query)) < 4000
+            found += len(exact & {analysis_id for analysis_id, _ in index.search(query, k=10)})
+
+        assert found / 500 > 0.8
+
+    def test_rows_added_after_training_are_searchable(self):
+        """Test that new rows are bucketed incrementally once IVF is trained"""
+        vectors = _random_unit(1100, 16, seed=2)
+        index = VectorIndex(16, lists=8, probes=8, ivf_min_rows=1000)
+        index.add(list(range(1000)), vectors[:1000])
+        index.train()
+        index.add([5000], vectors[1000:1001])
+
+        assert index.search(vectors[1000], k=1)[0][0] == 5000
+
+    def test_rows_added_while_fitting_are_bucketed_on_install(self):
+        """Test that fit() on a snapshot plus install() covers rows appended meanwhile"""
+        vectors = _random_unit(1200, 16, seed=3)
+        index = VectorIndex(16, lists=8, probes=8, ivf_min_rows=1000)
+        index.add(list(range(1000)), vectors[:1000])
+        fitted = index.fit(1000)
+        index.add(list(range(1000, 1200)), vectors[1000:])
+        index.install(*fitted, 1000)
+
+        assert sum(len(bucket) for bucket in index._buckets) == 1200
+        assert index.search(vectors[1150], k=1)[0][0] == 1150
+
+
+class TestBackgroundTraining:
+    """Test cases for training the shared index off the event loop"""
+
+    async def test_index_analyses_trains_in_a_worker_thread(self, monkeypatch):
+        """Test that crossing the IVF threshold trains via asyncio.to_thread"""
+        import asyncio
+        from app.services import embedding_service
+
+        index = VectorIndex(16, lists=4, probes=4, ivf_min_rows=100)
+        index.add(list(range(100)), _random_unit(100, 16))
+        threads = []
+        real_to_thread = asyncio.to_thread
+
+        async def to_thread(fn, *args):
+            threads.append(fn)
+            return await real_to_thread(fn, *args)
+
+        monkeypatch.setattr(embedding_service.asyncio, "to_thread", to_thread)
+        embedding_service.train_in_background(index)
+        embedding_service.train_in_background(index)  # already running: no second task
+        await asyncio.gather(*embedding_service._training_tasks)
+
+        assert threads == [index.fit]
+        assert index.centroids is not None and not index.training
@@ -0,0 +1,88 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from app.db import models
+from app.db.models import Analysis, start_write_batcher, stop_write_batcher
+from app.db.write_batcher import WRITE_BATCH_SIZE, WriteBatcher
+from app.tests.integration.fixtures import test_db
+
+
+class TestWriteBatcher:
+    """Test cases for the group-commit writer"""
+
+    async def test_rows_share_transactions(self):
+        """Test that concurrent submits are written in few batches, each caller getting its id"""
+        batches = []
+
+        async def write(items):
+            batches.append(list(items))
+            return [item * 10 for item in items]
+
+        batcher = WriteBatcher(write, max_rows=8, max_wait=0.01)
+        batcher.start()
+        ids = await asyncio.gather(*(batcher.submit(i) for i in range(20)))
+        await batcher.stop()
+
+        assert ids == [i * 10 for i in range(20)]
+        assert [len(batch) for batch in batches] == [8, 8, 4]
+
+    async def test_failed_batch_only_fails_the_bad_row(self):
+        """Test that a failing batch is retried row by row"""
+        async def write(items):
+            if "bad" in items:
+                raise ValueError("bad row")
+            return [len(item) for item in items]
+
+        batcher = WriteBatcher(write, max_wait=0.01)
+        batcher.start()
+        results = await asyncio.gather(
+            batcher.submit("a"), batcher.submit("bad"), batcher.submit("ccc"), return_exceptions=True
+        )
+        await batcher.stop()
+
+        assert results[0] == 1 and results[2] == 3
+        assert isinstance(results[1], ValueError)
+
+    async def test_stop_flushes_pending_rows(self):
+        """Test that rows queued before stop() are still committed"""
+        written = []
+
+        async def write(items):
+            written.extend(items)
+            return list(range(len(items)))
+
+        batcher = WriteBatcher(write, max_wait=1.0)
+        batcher.start()
+        pending = [asyncio.ensure_future(batcher.submit(i)) for i in range(3)]
+        await asyncio.sleep(0)
+        await batcher.stop()
+
+        assert written == [0, 1, 2]
+        assert all(task.done() for task in pending)
+        with pytest.raises(RuntimeError):
+            await batcher.submit(4)
+
+
+class TestBatchedSave:
+    """Test cases for Analysis.save() through the group-commit writer"""
+
+    async def test_concurrent_saves_get_distinct_ids(self, test_db):
+        """Test that batched saves persist every row and index its terms"""
+        before = sum(entry[2] for entry in WRITE_BATCH_SIZE.values.values())
+        with patch("app.db.models.DB_WRITE_BATCHING", True):
+            start_write_batcher()
+        try:
+            ids = await asyncio.gather(*(
+                Analysis(input_text=f"text {i}", sentiment="neutral", keywords=[f"word{i}"]).save()
+                for i in range(30)
+            ))
+        finally:
+            await stop_write_batcher()
+
+        assert models._write_batcher is None
+        assert sorted(ids) == list(range(1, 31))
+        assert len(await Analysis.search_by_sentiment("neutral")) == 30
+        assert [a.input_text for a in await Analysis.search_by_keyword("word7")] == ["text 7"]
+        assert sum(entry[2] for entry in WRITE_BATCH_SIZE.values.values()) - before < 30
@@ -0,0 +1,43 @@
+"""Cold import time of the app (`import main`), measured in fresh interpreters.
+
+    python -m benchmarks.bench_import [--runs 10] [--max-seconds 1.0]
+
+Exits non-zero when the median exceeds --max-seconds, so it can gate CI.
+Use `python -X importtime -c "import main"` to see which module regressed.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+
+def measure(runs):
+    env = {**os.environ, "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "bench")}
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "import main"], cwd=REPO_ROOT, env=env, check=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark app import time.")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--max-seconds", type=float, default=None, help="fail if the median is slower")
+    args = parser.parse_args()
+
+    timings = measure(args.runs)
+    median = statistics.median(timings)
+    print(f"import main: median {median * 1000:.0f} ms, min {min(timings) * 1000:.0f} ms, "
+          f"max {max(timings) * 1000:.0f} ms over {args.runs} runs")
+    if args.max_seconds is not None and median > args.max_seconds:
+        raise SystemExit(f"import time {median:.2f}s exceeds {args.max_seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
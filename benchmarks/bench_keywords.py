@@ -0,0 +1,117 @@
+"""Keyword extraction throughput: the original NLTK calls vs KeywordEngine.
+
+    python -m benchmarks.bench_keywords [--docs 2000] [--words 300] [--seed 0]
+
+Runs on the texts from the keyword unit tests and on a synthetic corpus,
+checks that every implementation returns the same keywords, and prints
+docs/sec for each. Needs the punkt_tab and averaged_perceptron_tagger_eng
+NLTK data.
+"""
+import argparse
+import random
+import time
+from collections import Counter
+
+import nltk
+
+from app.services.keyword_engine import KeywordEngine
+
+FIXTURE_TEXTS = [
+    "The cat sat on the mat. The dog ran to the park. The cat played with the ball.",
+    """
+    The artificial intelligence system processes natural language data efficiently.
+    Machine learning algorithms analyze text patterns and extract meaningful information
+    from documents. The system uses advanced neural networks and deep learning
+    techniques to understand context and semantics in natural language processing tasks.
+    """,
+    "Python is a programming language. Python developers use Python for data science. Programming requires practice.",
+    "The quick brown fox jumps",
+    "Run fast!",
+    "",
+]
+
+_SUBJECTS = ["the company", "our team", "the new model", "a customer", "the city council",
+             "researchers", "the market", "this product", "the report", "engineers"]
+_VERBS = ["announced", "reviewed", "improved", "delayed", "praised", "criticized",
+          "launched", "measured", "shipped", "discussed"]
+_OBJECTS = ["quarterly earnings", "the release schedule", "battery life", "data quality",
+            "customer support", "the budget", "network latency", "a new policy",
+            "search results", "the training pipeline"]
+_TAILS = ["last week", "in the morning", "despite concerns", "after the meeting",
+          "for the third time", "with little notice", "ahead of schedule", ""]
+
+
+def legacy_extract(text):
+    """extract_three_most_common_nouns as originally written."""
+    words = nltk.word_tokenize(text.lower())
+    tagged = nltk.pos_tag(words)
+    nouns = [word for word, pos in tagged if pos.startswith("NN")]
+    freq = Counter(nouns)
+    return [word for word, _ in freq.most_common(3)]
+
+
+def legacy_extract_batch(texts):
+    """extract_keywords_batch as originally written."""
+    tokenized = [nltk.word_tokenize(text.lower()) for text in texts]
+    results = []
+    for tagged in nltk.pos_tag_sents(tokenized):
+        nouns = [word for word, pos in tagged if pos.startswith("NN")]
+        freq = Counter(nouns)
+        results.append([word for word, _ in freq.most_common(3)])
+    return results
+
+
+def synthetic_corpus(docs, words, seed):
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(docs):
+        sentences, length = [], 0
+        while length < words:
+            sentence = f"{rng.choice(_SUBJECTS)} {rng.choice(_VERBS)} {rng.choice(_OBJECTS)} {rng.choice(_TAILS)}".strip()
+            sentences.append(sentence.capitalize() + ".")
+            length += len(sentence.split())
+        corpus.append(" ".join(sentences))
+    return corpus
+
+
+def timed(label, texts, fn):
+    start = time.perf_counter()
+    results = fn(texts)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {len(texts) / elapsed:>10.1f} docs/s  ({elapsed:.3f}s)")
+    return results
+
+
+def run(name, texts):
+    print(f"{name}: {len(texts)} docs, {sum(len(t) for t in texts)} chars")
+    # Load models up front so the first timing is not a cold start.
+    legacy_extract("warm up the tagger.")
+    baseline = timed("nltk pos_tag per doc", texts, lambda ts: [legacy_extract(t) for t in ts])
+    batch = timed("nltk pos_tag_sents batch", texts, legacy_extract_batch)
+
+    engine = KeywordEngine()
+    engine.extract("warm up the tagger.")
+    engine._memo.clear()
+    cold = timed("KeywordEngine (cold memo)", texts, engine.extract_many)
+    warm = timed("KeywordEngine (warm memo)", texts, engine.extract_many)
+
+    for label, results in (("batch", batch), ("engine cold", cold), ("engine warm", warm)):
+        if results != baseline:
+            raise SystemExit(f"{label} keywords differ from the original implementation")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark keyword extraction.")
+    parser.add_argument("--docs", type=int, default=2000, help="synthetic corpus size")
+    parser.add_argument("--words", type=int, default=300, help="approximate words per synthetic doc")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat-fixtures", type=int, default=200,
+                        help="times the unit-test texts are repeated")
+    args = parser.parse_args()
+
+    run("unit-test fixtures", FIXTURE_TEXTS * args.repeat_fixtures)
+    run("synthetic corpus", synthetic_corpus(args.docs, args.words, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Microbenchmarks for the per-request hot spots.
+
+    python -m benchmarks.bench_micro [--seconds 1.0] [--output micro.json] [--baseline micro.json]
+
+Times keyword extraction, Analysis._from_row on real sqlite rows, JSON
+encoding/decoding of /analyze and /search payloads, and the two ways of
+turning a page of rows into a /search body: Analysis objects encoded with
+json (the old path) vs. raw rows with the stored topics/keywords spliced in
+and encoded with orjson. Each benchmark runs
+batches of calls for about --seconds and reports per-call percentiles from
+the batch timings. Keyword extraction is skipped when the NLTK data is
+missing.
+"""
+import argparse
+import json
+import sqlite3
+import time
+
+import orjson
+
+from app.db.models import Analysis, SEARCH_FIELDS
+from app.services import nlp_service
+from benchmarks import report
+from benchmarks.bench_keywords import synthetic_corpus
+
+ANALYSIS = {
+    "summary": "The company announced quarterly earnings ahead of schedule after the meeting.",
+    "title": "Quarterly Earnings",
+    "key_topics": ["earnings", "schedule", "company"],
+    "sentiment": "positive",
+    "keywords": ["company", "earnings", "meeting"],
+}
+
+
+def bench(fn, seconds: float, batch: int = 100) -> dict:
+    """Call fn() in batches for ~`seconds`; latencies are per call."""
+    fn()
+    latencies = []
+    calls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        batch_start = time.perf_counter()
+        for _ in range(batch):
+            fn()
+        latencies.append((time.perf_counter() - batch_start) / batch)
+        calls += batch
+    elapsed = time.perf_counter() - start
+    summary = report.summarize(latencies, elapsed)
+    summary["count"] = calls
+    summary["throughput_per_s"] = round(calls / elapsed, 2)
+    return summary
+
+
+def sample_rows(count: int = 50) -> list:
+    """Rows shaped like a /search query's, from an in-memory sqlite database."""
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.execute(f"CREATE TABLE a ({', '.join(SEARCH_FIELDS)})")
+    texts = synthetic_corpus(count, 120, seed=1)
+    conn.executemany("INSERT INTO a VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [
+        (i, text, ANALYSIS["summary"], ANALYSIS["title"], json.dumps(ANALYSIS["key_topics"]),
+         "positive", json.dumps(ANALYSIS["keywords"]), "2025-01-01 00:00:00")
+        for i, text in enumerate(texts)
+    ])
+    return conn.execute("SELECT * FROM a").fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks for analyze/search hot spots.")
+    parser.add_argument("--seconds", type=float, default=1.0, help="time per benchmark")
+    report.add_arguments(parser)
+    args = parser.parse_args()
+
+    results = {}
+    doc = synthetic_corpus(1, 300, seed=0)[0]
+    if nlp_service.missing_nltk_data(nlp_service.NLTK_RESOURCES):
+        print("Skipping keyword extraction: NLTK data is missing")
+    else:
+        results["extract_keywords_300w"] = bench(
+            lambda: nlp_service.extract_three_most_common_nouns(doc), args.seconds, batch=10)
+
+    rows = sample_rows()
+    results["from_row_x50"] = bench(lambda: [Analysis._from_row(row) for row in rows], args.seconds, batch=10)
+
+    page = [{field: row[field] for field in SEARCH_FIELDS} for row in rows]
+    search_body = json.dumps({"data": page, "next_cursor": None})
+    analyze_body = json.dumps(ANALYSIS)
+    results["json_encode_analyze"] = bench(lambda: json.dumps(ANALYSIS), args.seconds)
+    results["json_decode_analyze"] = bench(lambda: json.loads(analyze_body), args.seconds)
+    results["json_encode_search_page"] = bench(lambda: json.dumps({"data": page, "next_cursor": None}), args.seconds)
+    results["json_decode_search_page"] = bench(lambda: json.loads(search_body), args.seconds)
+
+    import main
+
+    def search_body_objects():
+        data = [{field: getattr(a, field) for field in SEARCH_FIELDS} for a in map(Analysis._from_row, rows)]
+        return json.dumps({"data": data, "next_cursor": None}).encode()
+
+    def search_body_passthrough():
+        data = [main._response_row(Analysis._raw_row(row)) for row in rows]
+        return orjson.dumps({"data": data, "next_cursor": None})
+
+    assert json.loads(search_body_objects()) == json.loads(search_body_passthrough())
+    results["search_body_objects_x50"] = bench(search_body_objects, args.seconds, batch=10)
+    results["search_body_passthrough_x50"] = bench(search_body_passthrough, args.seconds, batch=10)
+
+    report.finish(report.build_report(results, suite="micro", seconds=args.seconds), args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Closed-loop load test for /analyze and /search.
+
+    python -m benchmarks.load_test --scenarios analyze,search --concurrency 32 --requests 2000 \\
+        [--db bench.db] [--llm-latency 0.3 --llm-jitter 0.2] [--output load.json] [--baseline load.json]
+
+`--concurrency` workers each send a request, wait for the answer and send
+the next, until `--requests` per scenario have completed. By default the
+app runs in-process (httpx.ASGITransport) against the fake LLM server from
+app/tests/fake_openai_server.py with the given latency, so no network or
+API key is needed. `--db` points at a corpus from benchmarks.seed_corpus;
+otherwise a fresh temporary database is used. `--url` instead drives an
+already running server (start it with OPENAI_BASE_URL pointing at
+`python -m app.tests.fake_openai_server`).
+
+The analyze scenario needs the keyword-extraction NLTK data. Latencies
+include the client, which shares the event loop in in-process mode.
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from typing import Callable, List, Tuple
+
+import httpx
+
+from benchmarks import report
+from benchmarks.seed_corpus import NOUNS, SENTIMENTS, rows
+
+SCENARIOS = ("analyze", "search")
+
+
+def analyze_requests(seed: int, repeat_ratio: float) -> Callable[[], Tuple[str, str, dict]]:
+    """Unique texts, except `repeat_ratio` of requests resend an earlier one (cache hits)."""
+    rng = random.Random(seed)
+    texts = rows(10 ** 9, 80, 1, seed)
+    sent: List[str] = []
+
+    def next_request():
+        if sent and rng.random() < repeat_ratio:
+            text = rng.choice(sent)
+        else:
+            text = next(texts)[0]
+            sent.append(text)
+        return "POST", "/analyze", {"json": {"text": text}}
+    return next_request
+
+
+def search_requests(seed: int) -> Callable[[], Tuple[str, str, dict]]:
+    """A mix of keyword, topic, sentiment and full-text searches."""
+    rng = random.Random(seed)
+
+    def next_request():
+        mode = rng.choice(("keyword", "topic", "sentiment", "q"))
+        value = rng.choice(SENTIMENTS) if mode == "sentiment" else rng.choice(NOUNS)
+        return "GET", "/search", {"params": {mode: value, "limit": 20}}
+    return next_request
+
+
+async def drive(client: httpx.AsyncClient, next_request, total: int, concurrency: int, warmup: int) -> dict:
+    latencies: List[float] = []
+    errors = 0
+    remaining = total
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            method, path, options = next_request()
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, **options)
+                failed = response.status_code != 200 or "error" in response.json()
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - start)
+            errors += failed
+
+    # Untimed warm-up (connections, caches, lazy imports).
+    for _ in range(warmup):
+        method, path, options = next_request()
+        await client.request(method, path, **options)
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return report.summarize(latencies, time.perf_counter() - start, errors=errors, concurrency=concurrency)
+
+
+async def run_in_process(args, scenarios) -> dict:
+    from openai import AsyncOpenAI
+
+    from app.db import connection
+    from app.db.migrator import run_migrations
+    from app.services import nlp_service, openai_service
+    from app.tests.fake_openai_server import FakeServerConfig, create_app
+
+    if args.db:
+        connection.DB_PATH = args.db
+    else:
+        connection.DB_PATH = os.path.join(tempfile.mkdtemp(), "load.db")
+    await run_migrations()
+
+    fake = create_app(FakeServerConfig(latency=args.llm_latency, jitter=args.llm_jitter, seed=args.seed))
+    upstream = httpx.AsyncClient(transport=httpx.ASGITransport(app=fake),
+                                 limits=httpx.Limits(max_connections=None))
+    openai_service.client = AsyncOpenAI(api_key="bench", base_url="http://fake-openai/v1",
+                                        http_client=upstream, max_retries=0)
+
+    import main
+
+    await connection.open_pool()
+    if "analyze" in scenarios:
+        nlp_service.ensure_nltk_data()
+        nlp_service.start_nlp_pool()
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app),
+                                     base_url="http://app", timeout=args.timeout) as client:
+            return await run_scenarios(client, args, scenarios)
+    finally:
+        nlp_service.shutdown_nlp_pool()
+        await connection.close_pool()
+        await upstream.aclose()
+
+
+async def run_scenarios(client: httpx.AsyncClient, args, scenarios) -> dict:
+    results = {}
+    for scenario in scenarios:
+        if scenario == "analyze":
+            next_request = analyze_requests(args.seed, args.repeat_ratio)
+        else:
+            next_request = search_requests(args.seed)
+        print(f"Running {scenario}: {args.requests} requests at concurrency {args.concurrency}", flush=True)
+        results[scenario] = await drive(client, next_request, args.requests, args.concurrency, args.warmup)
+    return results
+
+
+async def run(args) -> dict:
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(unknown)}")
+    if args.url:
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+            return await run_scenarios(client, args, scenarios)
+    return await run_in_process(args, scenarios)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test /analyze and /search.")
+    parser.add_argument("--scenarios", default="analyze,search", help=f"comma-separated: {', '.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=1000, help="timed requests per scenario")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--repeat-ratio", type=float, default=0.0,
+                        help="fraction of /analyze requests that resend an earlier text")
+    parser.add_argument("--db", help="SQLite corpus from benchmarks.seed_corpus (in-process mode)")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="fake LLM seconds per call")
+    parser.add_argument("--llm-jitter", type=float, default=0.1)
+    parser.add_argument("--url", help="drive a running server instead of the in-process app")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    report.add_arguments(parser)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    meta = {key: getattr(args, key) for key in ("concurrency", "requests", "repeat_ratio", "db",
+                                                 "llm_latency", "llm_jitter", "url", "seed")}
+    report.finish(report.build_report(results, suite="load", **meta), args)
+
+
+if __name__ == "__main__":
+    main()
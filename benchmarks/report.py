@@ -0,0 +1,101 @@
+"""Shared result format for the benchmark scripts.
+
+Each script produces {"meta": {...}, "results": {name: summary}} where a
+summary holds latency percentiles in milliseconds and throughput per
+second. `--output` writes it as JSON; `--baseline` compares against an
+earlier file and exits non-zero on a regression beyond `--tolerance`.
+"""
+import json
+import math
+import platform
+import sys
+import time
+from typing import Dict, List, Sequence
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile (q in [0, 100]) of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int = 0, **extra) -> dict:
+    """Percentiles (ms) and throughput for per-operation latencies in seconds."""
+    values = sorted(latencies)
+    count = len(values)
+    return {
+        "count": count,
+        "errors": errors,
+        "p50_ms": round(percentile(values, 50) * 1000, 4),
+        "p95_ms": round(percentile(values, 95) * 1000, 4),
+        "p99_ms": round(percentile(values, 99) * 1000, 4),
+        "max_ms": round(values[-1] * 1000, 4) if values else 0.0,
+        "mean_ms": round(sum(values) / count * 1000, 4) if count else 0.0,
+        "throughput_per_s": round(count / elapsed, 2) if elapsed > 0 else 0.0,
+        **extra,
+    }
+
+
+def build_report(results: Dict[str, dict], **meta) -> dict:
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            **meta,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float = 0.2) -> List[str]:
+    """Regressions of `current` against `baseline` beyond `tolerance` (0.2 = 20%).
+
+    p95 latency may not grow and throughput may not shrink by more than the
+    tolerance; benchmarks missing from either side are ignored.
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        if base.get("p95_ms") and result["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {result['p95_ms']:.3f} ms vs baseline {base['p95_ms']:.3f} ms")
+        if base.get("throughput_per_s") and result["throughput_per_s"] < base["throughput_per_s"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {result['throughput_per_s']:.1f}/s vs baseline {base['throughput_per_s']:.1f}/s"
+            )
+    return regressions
+
+
+def print_table(report: dict) -> None:
+    print(f"{'benchmark':<32} {'count':>8} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'ops/s':>12}")
+    for name, result in report["results"].items():
+        print(f"{name:<32} {result['count']:>8} {result['p50_ms']:>10.3f} {result['p95_ms']:>10.3f} "
+              f"{result['p99_ms']:>10.3f} {result['throughput_per_s']:>12.1f}")
+
+
+def add_arguments(parser) -> None:
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="compare against results written by an earlier --output")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed regression as a fraction (default 0.2 = 20%%)")
+
+
+def finish(report: dict, args) -> None:
+    """Print, optionally save, and optionally gate on the baseline."""
+    print_table(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            raise SystemExit("Regressions against baseline:\n  " + "\n  ".join(regressions))
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
@@ -0,0 +1,116 @@
+"""Build a seeded SQLite corpus for load tests and query benchmarks.
+
+    python -m benchmarks.seed_corpus bench.db --rows 100000 [--words 60] [--days 365] [--seed 0]
+
+Creates the app's schema (FTS, term index and stats triggers included) and
+bulk-inserts `--rows` synthetic analyses spread over the last `--days`
+days. The same seed always produces the same corpus, so results from
+different machines or commits are comparable. Sizes from 10k to 10M rows
+are practical; 10M rows at the default 60 words is roughly 10 GB.
+Embeddings are not generated; run `python -m app.db.backfill --embeddings`
+against the file to benchmark /search/similar.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.db import connection
+from app.db.compression import compress_text, content_hash
+from app.db.migrator import run_migrations
+from benchmarks.bench_keywords import _OBJECTS, _SUBJECTS, _TAILS, _VERBS
+
+NOUNS = sorted({word for phrase in _SUBJECTS + _OBJECTS for word in phrase.split()
+                if word not in ("the", "a", "our", "this", "new")})
+SENTIMENTS = ("positive", "neutral", "negative")
+BATCH_ROWS = 20000
+
+
+def rows(count: int, words: int, days: int, seed: int):
+    """Yield (input_text, summary, title, topics, sentiment, keywords, created_at) tuples."""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    # Zipf-like term popularity, like real keyword distributions.
+    weights = [1 / (rank + 1) for rank in range(len(NOUNS))]
+    for _ in range(count):
+        sentences, length = [], 0
+        while length < words:
+            sentence = f"{rng.choice(_SUBJECTS)} {rng.choice(_VERBS)} {rng.choice(_OBJECTS)} {rng.choice(_TAILS)}".strip()
+            sentences.append(sentence.capitalize() + ".")
+            length += len(sentence.split())
+        keywords = list(dict.fromkeys(rng.choices(NOUNS, weights, k=3)))
+        topics = list(dict.fromkeys(rng.choices(NOUNS, weights, k=2)))
+        created_at = now - timedelta(seconds=rng.randrange(days * 86400))
+        yield (
+            " ".join(sentences),
+            sentences[0],
+            " ".join(keywords).title(),
+            json.dumps(topics),
+            rng.choices(SENTIMENTS, (5, 3, 2))[0],
+            json.dumps(keywords),
+            created_at.strftime("%Y-%m-%d %H:%M:%S"),
+        )
+
+
+def seed(path: str, count: int, words: int, days: int, seed_value: int) -> None:
+    connection.DB_PATH = path
+    asyncio.run(run_migrations())
+
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    start = time.perf_counter()
+    inserted = 0
+    batch = []
+
+    def flush():
+        with conn:
+            conn.executemany("""
+                INSERT OR IGNORE INTO documents (content_hash, body, size) VALUES (?, ?, ?)
+            """, [(content_hash(row[0]), compress_text(row[0]), len(row[0].encode("utf-8"))) for row in batch])
+            conn.executemany("""
+                INSERT INTO analyses (input_text, document_id, summary, title, topics, sentiment, keywords, created_at)
+                VALUES ('', (SELECT id FROM documents WHERE content_hash = ?), ?, ?, ?, ?, ?, ?)
+            """, [(content_hash(row[0]), *row[1:]) for row in batch])
+            last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            first_id = last_id - len(batch) + 1
+            # Rows with a document are indexed by the writer, not by trigger.
+            conn.executemany("INSERT INTO analyses_fts (rowid, input_text, summary) VALUES (?, ?, ?)",
+                             [(first_id + i, row[0], row[1]) for i, row in enumerate(batch)])
+            for table, column in (("analysis_keywords", 5), ("analysis_topics", 3)):
+                conn.executemany(f"""
+                    INSERT OR IGNORE INTO {table} (term, created_at, analysis_id) VALUES (?, ?, ?)
+                """, [(term, row[6], first_id + i) for i, row in enumerate(batch) for term in json.loads(row[column])])
+
+    for row in rows(count, words, days, seed_value):
+        batch.append(row)
+        if len(batch) >= BATCH_ROWS:
+            flush()
+            inserted += len(batch)
+            batch = []
+            rate = inserted / (time.perf_counter() - start)
+            print(f"Inserted {inserted}/{count} rows ({rate:.0f} rows/s)", flush=True)
+    if batch:
+        flush()
+        inserted += len(batch)
+    conn.execute("ANALYZE")
+    conn.close()
+    print(f"Seeded {inserted} rows into {path} in {time.perf_counter() - start:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a synthetic analyses corpus.")
+    parser.add_argument("path", help="SQLite file to create or extend")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--words", type=int, default=60, help="approximate words per text")
+    parser.add_argument("--days", type=int, default=365, help="spread created_at over this many days")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    seed(args.path, args.rows, args.words, args.days, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,89 +1,325 @@
-from typing import Union, Optional
+import asyncio
+import json
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import List, Union, Optional
 
-from fastapi import FastAPI
-from pydantic import BaseModel
-from app.services.openai_service import analyze_text
-from app.services.nlp_service import extract_three_most_common_nouns
-from app.db.models import Analysis
+import orjson
+from fastapi import FastAPI, Query
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field
+from app.services import openai_service
+from app.services.openai_service import close_client, get_client
+from app.services.nlp_service import ensure_nltk_data, start_nlp_pool, shutdown_nlp_pool, warm_up
+from app.services.analysis_service import analyze_and_store, analyze_and_store_many, in_flight
+from app.services.backend_service import ANALYSIS_BACKEND, backend_stats
+from app.services.cache_service import analysis_cache
+from app.services.export_service import iter_ndjson, parse_since
+from app.services.stream_service import analyze_stream
+from app.services import embedding_service, metrics_service
+from app.services.metrics_service import MetricsMiddleware, log_event, mark_parsed, monitor_loop_lag, stage, text_digest
+from app.services.profiler import get_profiler, start_profiler, stop_profiler
+from app.services.job_service import enqueue, start_job_workers, stop_job_workers, watch
+from app.services.local_analysis_service import NLTK_RESOURCES as LOCAL_NLTK_RESOURCES
+from app.db.connection import open_pool, close_pool, pool_is_open
+from app.db.models import Analysis, AnalysisStats, Job, SEARCH_FIELDS, decode_cursor, encode_cursor
+from app.db.models import start_write_batcher, stop_write_batcher
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+  # Each teardown is registered as soon as its resource exists, so a failed
+  # startup releases only what was started, in reverse order.
+  async with AsyncExitStack() as stack:
+    # Fail fast on missing NLTK data rather than downloading it mid-request.
+    ensure_nltk_data()
+    if ANALYSIS_BACKEND != "openai":
+      ensure_nltk_data(LOCAL_NLTK_RESOURCES)
+    await open_pool()
+    stack.push_async_callback(close_pool)
+    stack.push_async_callback(close_client)
+    start_write_batcher()
+    stack.push_async_callback(stop_write_batcher)
+    start_nlp_pool()
+    stack.callback(shutdown_nlp_pool)
+    await asyncio.to_thread(warm_up)
+    # The local backend runs without OPENAI_API_KEY; the client is only
+    # required up front when OpenAI can be used.
+    if ANALYSIS_BACKEND != "local" or embedding_service.EMBEDDING_BACKEND == "openai":
+      get_client()
+    start_job_workers()
+    stack.push_async_callback(stop_job_workers)
+    loop_lag = asyncio.create_task(monitor_loop_lag())
+    stack.callback(loop_lag.cancel)
+    start_profiler()
+    stack.callback(stop_profiler)
+    app.state.ready = True
+    try:
+      yield
+    finally:
+      app.state.ready = False
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+app.state.ready = False
+app.add_middleware(MetricsMiddleware)
 
 
 @app.get("/")
 def read_root():
     return {"Hello": "World"}
 
+@app.get("/ready")
+def ready():
+  """Readiness probe: 200 once startup finished, 503 until then."""
+  checks = {
+    "startup": app.state.ready,
+    "database": pool_is_open(),
+    "llm_circuit": openai_service.breaker.state,
+  }
+  is_ready = checks["startup"] and checks["database"]
+  return JSONResponse({"ready": is_ready, "checks": checks}, status_code=200 if is_ready else 503)
+
 class InputText(BaseModel):
     text: str
+    backend: Optional[str] = None
+
+class ErrorResponse(BaseModel):
+    error: str
+
+class AnalysisResponse(BaseModel):
+    # Backends may add fields of their own; they are passed through.
+    model_config = ConfigDict(extra="allow")
+
+    summary: str
+    title: Optional[str] = None
+    key_topics: List[str]
+    sentiment: str
+    keywords: List[str]
+
+# Responses below are returned as ORJSONResponse directly, so FastAPI does not
+# re-validate or re-encode them; the models document the shape in OpenAPI.
+@app.post("/analyze", response_model=Union[AnalysisResponse, ErrorResponse])
+async def analyze(request: InputText, run_async: bool = Query(False, alias="async")):
+  mark_parsed()
+  log_event("analyze.request", chars=len(request.text), digest=text_digest(request.text),
+            backend=request.backend, run_async=run_async)
+  if run_async:
+    job = await enqueue(request.text, request.backend)
+    return JSONResponse(job, status_code=200 if "error" in job else 202)
+  return ORJSONResponse(await analyze_and_store(request.text, request.backend))
+
+@app.post("/analyze/stream")
+async def analyze_streamed(request: InputText):
+  """Server-sent events: `keywords`, then one `field` per LLM field, then `complete` (or `error`)."""
+  mark_parsed()
+  async def events():
+    async for event, data in analyze_stream(request.text, request.backend):
+      yield _sse(event, data)
+  return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+def _sse(event: str, data: dict) -> str:
+  return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+class BatchInputText(BaseModel):
+    texts: List[str] = Field(..., min_length=1, max_length=1000)
+    backend: Optional[str] = None
+
+@app.post("/analyze/batch")
+async def analyze_batch(request: BatchInputText):
+  mark_parsed()
+  log_event("analyze.batch", texts=len(request.texts), chars=sum(len(text) for text in request.texts),
+            backend=request.backend)
+  return {"data": await analyze_and_store_many(request.texts, request.backend)}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+  job = await Job.get(job_id)
+  return job if job is not None else {"error": "Job not found"}
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+  """Server-sent events: one `status` event per change until the job finishes."""
+  async def events():
+    async for job in watch(job_id):
+      yield _sse("status", job)
+  return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.get("/backends/stats")
+def backends_stats():
+  return backend_stats()
+
+@app.get("/metrics")
+def metrics():
+  return PlainTextResponse(metrics_service.render(), media_type="text/plain; version=0.0.4")
+
+def _cache_metrics():
+  cache = analysis_cache.stats()
+  yield "# TYPE analysis_cache_requests_total counter"
+  for outcome, key in (("memory_hit", "memory_hits"), ("db_hit", "db_hits"), ("miss", "misses")):
+    yield f'analysis_cache_requests_total{{outcome="{outcome}"}} {cache[key]}'
+  flights = in_flight.stats()
+  yield "# TYPE analysis_coalesced_requests_total counter"
+  yield f"analysis_coalesced_requests_total {flights['coalesced']}"
+  yield "# TYPE analysis_in_flight gauge"
+  yield f"analysis_in_flight {flights['in_flight']}"
+
+metrics_service.register_collector(_cache_metrics)
+
+@app.get("/debug/profile")
+def debug_profile(reset: bool = False):
+  """Folded stacks from the sampling profiler (flamegraph.pl / speedscope input)."""
+  profiler = get_profiler()
+  if profiler is None:
+    return {"error": "Profiler is off; start the app with PROFILE_SAMPLER=1"}
+  return PlainTextResponse(profiler.folded(reset=reset))
+
+@app.get("/cache/stats")
+def cache_stats():
+  return {**analysis_cache.stats(), "single_flight": in_flight.stats()}
 
-@app.post("/analyze")
-async def analyze(request: InputText):
-  print("request.text", request.text)
-  openai_response = analyze_text(request.text)
-  
-  if "error" in openai_response:
-    return {"error": openai_response["error"]}
-  
-  nlp_response = extract_three_most_common_nouns(request.text)
-
-  # Save to database
-  analysis = Analysis(
-    input_text=request.text,
-    summary=openai_response.get("summary", ""),
-    title=openai_response.get("title", ""),
-    topics=openai_response.get("key_topics", []),
-    sentiment=openai_response.get("sentiment", ""),
-    keywords=nlp_response
-  )
-  await analysis.save()
-
-  response = {
-     **openai_response,
-     "keywords": nlp_response,
+class SearchResult(BaseModel):
+    """One analysis; only the requested `fields` are present."""
+    id: Optional[int] = None
+    input_text: Optional[str] = None
+    summary: Optional[str] = None
+    title: Optional[str] = None
+    topics: Optional[List[str]] = None
+    sentiment: Optional[str] = None
+    keywords: Optional[List[str]] = None
+    created_at: Optional[str] = None
+
+class TextSearchResult(SearchResult):
+    rank: float
+    snippet: str
+
+class SearchResponse(BaseModel):
+    data: List[Union[TextSearchResult, SearchResult]]
+    next_cursor: Optional[str] = None
+
+class SimilarResult(SearchResult):
+    score: float
+
+class SimilarResponse(BaseModel):
+    data: List[SimilarResult]
+
+def _response_row(row: dict, fields=SEARCH_FIELDS, **extra) -> dict:
+  """Response object for a raw row (Analysis._fetch with raw=True).
+
+  topics/keywords are spliced in as the JSON text stored in the database
+  instead of being decoded and re-encoded.
+  """
+  item = {
+    field: orjson.Fragment(row[field] or "[]") if field in ("topics", "keywords") else row[field]
+    for field in fields
   }
-  
-  return response
+  item.update(extra)
+  return item
 
-@app.get("/search")
+@app.get("/search", response_model=Union[SearchResponse, ErrorResponse])
 async def search(
   keyword: Optional[str] = None,
-  sentiment: Optional[str] = None
+  sentiment: Optional[str] = None,
+  topic: Optional[str] = None,
+  q: Optional[str] = None,
+  limit: int = Query(50, ge=1, le=500),
+  cursor: Optional[str] = None,
+  fields: Optional[str] = None
+):
+  selected = SEARCH_FIELDS
+  if fields:
+    selected = tuple(field.strip() for field in fields.split(",") if field.strip())
+    unknown = [field for field in selected if field not in SEARCH_FIELDS]
+    if unknown:
+      return {"error": f"Unknown fields: {', '.join(unknown)}"}
+
+  after = None
+  if cursor:
+    try:
+      after = decode_cursor(cursor)
+    except ValueError:
+      return {"error": "Invalid cursor"}
+
+  # Fetch one extra row to learn whether there is a next page.
+  options = {"limit": limit + 1, "after": after, "fields": selected, "raw": True}
+  if q:
+    with stage("search_text"):
+      analyses = await Analysis.search_text(q, **options)
+  elif keyword:
+    with stage("search_keyword"):
+      analyses = await Analysis.search_by_keyword(keyword, **options)
+  elif topic:
+    with stage("search_topic"):
+      analyses = await Analysis.search_by_topic(topic, **options)
+  elif sentiment:
+    with stage("search_sentiment"):
+      analyses = await Analysis.search_by_sentiment(sentiment, **options)
+  else:
+    return {"error": "No keyword or sentiment provided"}
+
+  next_cursor = None
+  if len(analyses) > limit:
+    analyses = analyses[:limit]
+    last = analyses[-1]
+    next_cursor = encode_cursor(last["rank"] if q else last["created_at"], last["id"])
+
+  if q:
+    data = [_response_row(row, selected, rank=row["rank"], snippet=row["snippet"]) for row in analyses]
+  else:
+    data = [_response_row(row, selected) for row in analyses]
+  return ORJSONResponse({"data": data, "next_cursor": next_cursor})
+
+
+@app.get("/search/similar", response_model=Union[SimilarResponse, ErrorResponse])
+async def search_similar(
+  text: Optional[str] = None,
+  id: Optional[int] = None,
+  limit: int = Query(10, ge=1, le=100),
+  fields: Optional[str] = None
+):
+  selected = SEARCH_FIELDS
+  if fields:
+    selected = tuple(field.strip() for field in fields.split(",") if field.strip())
+    unknown = [field for field in selected if field not in SEARCH_FIELDS]
+    if unknown:
+      return {"error": f"Unknown fields: {', '.join(unknown)}"}
+
+  if id is not None:
+    with stage("search_similar"):
+      matches = await embedding_service.similar_to_id(id, limit)
+    if matches is None:
+      return {"error": "Analysis not found or not indexed"}
+  elif text:
+    with stage("search_similar"):
+      matches = await embedding_service.similar_to_text(text, limit)
+    if matches is None:
+      return {"error": "Failed to embed text"}
+  else:
+    return {"error": "No text or id provided"}
+
+  scores = dict(matches)
+  rows = await Analysis.get_many([analysis_id for analysis_id, _ in matches], fields=selected, raw=True)
+  return ORJSONResponse({"data": [_response_row(row, selected, score=scores[row["id"]]) for row in rows]})
+
+
+@app.get("/stats")
+async def stats(
+  days: int = Query(30, ge=1, le=366),
+  interval: str = "day",
+  top: int = Query(10, ge=1, le=100)
 ):
-  
-  if keyword:
-    analyses = await Analysis.search_by_keyword(keyword)
-    return {
-      "data": [
-        {
-          "id": analysis.id,
-          "input_text": analysis.input_text,
-          "summary": analysis.summary,
-          "title": analysis.title,
-          "topics": analysis.topics,
-          "sentiment": analysis.sentiment,
-          "keywords": analysis.keywords,
-          "created_at": analysis.created_at
-        }
-        for analysis in analyses
-      ]
-    }
-  
-  if sentiment:
-    analyses = await Analysis.search_by_sentiment(sentiment)
-    return {
-      "data": [
-        {
-          "id": analysis.id,
-          "input_text": analysis.input_text,
-          "summary": analysis.summary,
-          "title": analysis.title,
-          "topics": analysis.topics,
-          "sentiment": analysis.sentiment,
-          "keywords": analysis.keywords,
-          "created_at": analysis.created_at
-        }
-        for analysis in analyses
-      ]
-    }
-  
-  return {"error": "No keyword or sentiment provided"}
\ No newline at end of file
+  if interval not in AnalysisStats.INTERVALS:
+    return {"error": f"Unknown interval: {interval}"}
+  if interval == "hour" and days > 31:
+    return {"error": "Hourly counts are limited to 31 days"}
+  return await AnalysisStats.summary(days, interval, top)
+
+
+@app.get("/export")
+async def export(since: Optional[str] = None, gzip: bool = False):
+  stream = iter_ndjson(since=parse_since(since), gzip=gzip)
+  if gzip:
+    return StreamingResponse(
+      stream,
+      media_type="application/gzip",
+      headers={"Content-Disposition": 'attachment; filename="analyses.ndjson.gz"'}
+    )
+  return StreamingResponse(stream, media_type="application/x-ndjson")